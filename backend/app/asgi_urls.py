@@ -0,0 +1,14 @@
+"""
+URL configuration of requests served over ASGI.
+
+The URL patterns of app.urls, with every view made async, so none waits
+on the one thread Django 3.2 runs synchronous views on per process.
+Served over WSGI, the views stay synchronous, as async views would only
+add an event loop per request there.
+"""
+
+from app import urls
+from core.asyncdb import async_urlpatterns
+
+
+urlpatterns = async_urlpatterns(urls.urlpatterns)
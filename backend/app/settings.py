@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
     "rest_framework",
     "rest_framework.authtoken",
@@ -47,6 +48,9 @@ INSTALLED_APPS = [
     "user",
     "cities_light",
     "loan_profile",
+    "transaction",
+    "stats",
+    "geo",
     "corsheaders",
 ]
 
@@ -59,10 +63,18 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ReplicaPinMiddleware",
 ]
 
+# Per-request timings in Server-Timing headers and /metrics/.
+REQUEST_METRICS = bool(int(os.environ.get("REQUEST_METRICS", 0)))
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, "core.middleware.RequestMetricsMiddleware")
+
 
 ROOT_URLCONF = "app.urls"
+# The URL configuration of requests served by core.asgi.ASGIHandler.
+ASGI_URLCONF = "app.asgi_urls"
 
 TEMPLATES = [
     {
@@ -88,14 +100,133 @@ WSGI_APPLICATION = "app.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "core.db.postgresql",
         "HOST": os.environ.get("DB_HOST"),
+        "PORT": os.environ.get("DB_PORT", ""),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
+        # Seconds a connection is kept open for later requests; 0 opens
+        # one for every request.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        # Check a kept connection before the first query of a request.
+        # See core/db/postgresql/base.py.
+        "CONN_HEALTH_CHECKS": bool(
+            int(os.environ.get("DB_CONN_HEALTH_CHECKS", 1))
+        ),
+        # Set when connecting through PgBouncer in transaction pooling
+        # mode, which cannot keep a cursor open across transactions.
+        "DISABLE_SERVER_SIDE_CURSORS": bool(
+            int(os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS", 0))
+        ),
     }
 }
 
+# Read replicas, as comma-separated host[:port][/name] entries. Views
+# using core.replicas.ReplicaReadMixin read from them.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.environ.get("DB_REPLICAS", "").split(",")), 1
+):
+    address, _, name = replica.strip().partition("/")
+    host, _, port = address.partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port,
+        "NAME": name or DATABASES["default"]["NAME"],
+        # Tests read the test database through the replicas.
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+
+# Replicas lagging more seconds than REPLICA_MAX_LAG are not read from,
+# measured every REPLICA_LAG_CHECK_INTERVAL seconds. A client that writes
+# reads from the primary for REPLICA_PIN_SECONDS.
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(
+    os.environ.get("REPLICA_LAG_CHECK_INTERVAL", 5)
+)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+# Threads per process running the database work of async views; 0 runs
+# it on the request's thread instead. See core/asyncdb.py.
+ASYNC_DB_THREADS = int(os.environ.get("ASYNC_DB_THREADS", 0))
+
+# Cache alias and lifetime in seconds of anonymous loan profile list pages.
+LOAN_PROFILE_LIST_CACHE_ALIAS = "default"
+LOAN_PROFILE_LIST_CACHE_TIMEOUT = int(
+    os.environ.get("LOAN_PROFILE_LIST_CACHE_TIMEOUT", 60)
+)
+
+# Cache alias and lifetime in seconds of authentication tokens and users.
+AUTH_TOKEN_CACHE_ALIAS = "default"
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 60))
+
+# Cache alias and lifetime in seconds of the platform statistics, which
+# refresh_stats invalidates.
+STATS_CACHE_ALIAS = "default"
+STATS_CACHE_TIMEOUT = int(os.environ.get("STATS_CACHE_TIMEOUT", 300))
+# Seconds the statistics are refreshed after the funding data changes,
+# batching the changes in between into one refresh.
+STATS_REFRESH_DELAY = int(os.environ.get("STATS_REFRESH_DELAY", 300))
+
+# Largest number of cities held in the in-process geo index, most
+# populous first, and how long clients may cache geographic data.
+GEO_INDEX_MAX_CITIES = int(os.environ.get("GEO_INDEX_MAX_CITIES", 200000))
+GEO_CACHE_MAX_AGE = int(os.environ.get("GEO_CACHE_MAX_AGE", 86400))
+# Cache alias of the geo index version, which a process checks every
+# GEO_INDEX_CHECK_INTERVAL seconds to rebuild its index after a change.
+GEO_INDEX_CACHE_ALIAS = "default"
+GEO_INDEX_CHECK_INTERVAL = float(
+    os.environ.get("GEO_INDEX_CHECK_INTERVAL", 5)
+)
+
+# Largest number of transactions accepted by one bulk request.
+TRANSACTION_BATCH_MAX_SIZE = int(
+    os.environ.get("TRANSACTION_BATCH_MAX_SIZE", 10000)
+)
+
+
+# Passwords are hashed on a pool of PASSWORD_HASH_CONCURRENCY threads per
+# process, with at most PASSWORD_HASH_QUEUE_DEPTH more hashes waiting;
+# further sign-ups and logins get a 503 asking to retry after
+# PASSWORD_HASH_RETRY_AFTER seconds. Changing PASSWORD_HASH_ITERATIONS
+# rehashes each password on its next login. See core/hashing.py.
+PASSWORD_HASHERS = [
+    "core.hashing.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+PASSWORD_HASH_CONCURRENCY = int(
+    os.environ.get("PASSWORD_HASH_CONCURRENCY", os.cpu_count() or 1)
+)
+PASSWORD_HASH_QUEUE_DEPTH = int(
+    os.environ.get("PASSWORD_HASH_QUEUE_DEPTH", 16)
+)
+PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 260000)
+)
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -146,6 +277,16 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Default and maximum ?page_size= of the loan profile list.
+LOAN_PROFILE_PAGE_SIZE = int(os.environ.get("LOAN_PROFILE_PAGE_SIZE", 20))
+LOAN_PROFILE_MAX_PAGE_SIZE = int(
+    os.environ.get("LOAN_PROFILE_MAX_PAGE_SIZE", 100)
+)
+
+# Default and maximum ?page_size= of the lender portfolio history.
+PORTFOLIO_PAGE_SIZE = int(os.environ.get("PORTFOLIO_PAGE_SIZE", 20))
+PORTFOLIO_MAX_PAGE_SIZE = int(os.environ.get("PORTFOLIO_MAX_PAGE_SIZE", 100))
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1",
@@ -155,3 +296,14 @@ CORS_ALLOWED_ORIGINS = [
 ALLOWED_HOSTS = ["backend", "localhost", "127.0.0.1"]
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Background jobs; see core/jobs.py. Failed jobs are retried after
+# JOB_RETRY_BACKOFF seconds, doubling up to JOB_RETRY_MAX_BACKOFF, until
+# they ran JOB_MAX_ATTEMPTS times. Jobs running longer than JOB_TIMEOUT
+# seconds are presumed lost and retried.
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 4))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 1))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BACKOFF = int(os.environ.get("JOB_RETRY_BACKOFF", 10))
+JOB_RETRY_MAX_BACKOFF = int(os.environ.get("JOB_RETRY_MAX_BACKOFF", 3600))
+JOB_TIMEOUT = int(os.environ.get("JOB_TIMEOUT", 600))
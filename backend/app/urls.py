@@ -21,6 +21,8 @@ from drf_spectacular.views import (
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("schema/", SpectacularAPIView.as_view(), name="api-schema"),
@@ -29,6 +31,10 @@ urlpatterns = [
         SpectacularSwaggerView.as_view(url_name="api-schema"),
         name="api-docs",
     ),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("user/", include("user.urls")),
+    path("transaction/", include("transaction.urls")),
+    path("stats/", include("stats.urls")),
+    path("geo/", include("geo.urls")),
     path("", include("loan_profile.urls")),
 ]
@@ -0,0 +1,23 @@
+"""
+Uvicorn worker for gunicorn, tuned for the app.
+"""
+
+import os
+
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Uvicorn worker answering 503 beyond ASGI_LIMIT_CONCURRENCY open
+    connections and requests per worker, instead of queueing them.
+    Django 3.2 does not implement the ASGI lifespan protocol.
+    """
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "lifespan": "off",
+        "limit_concurrency": int(
+            os.environ.get("ASGI_LIMIT_CONCURRENCY", 1000)
+        ),
+    }
@@ -4,6 +4,7 @@ Django admin customization.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from core import models
@@ -71,13 +72,45 @@ class LoanProfileAdmin(admin.ModelAdmin):
         "__str__",
         "total_amount_required",
         "amount_lended_to_date",
+        "lender_count",
     )
-    readonly_fields = ("amount_lended_to_date",)
+    readonly_fields = models.LoanProfile.FUNDING_FIELDS
+    list_select_related = ("user",)
 
-    def amount_lended_to_date(self, obj):
-        return obj.amount_lended_to_date
+
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = (
+        "__str__",
+        "amount",
+        "status",
+        "created_at",
+        "status_changed_at",
+    )
+    list_filter = ("status",)
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "status_changed_at")
+    list_select_related = ("user", "loan_profile__user")
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "attempts", "run_at", "created_at")
+    list_filter = ("status", "task")
+    readonly_fields = ("attempts", "started_at", "last_error", "created_at")
+    actions = ("retry",)
+
+    @admin.action(description="Retry selected jobs")
+    def retry(self, request, queryset):
+        # Without their unique key, which a queued job may hold by now.
+        queryset.filter(status=models.JobStatus.DEAD).update(
+            status=models.JobStatus.QUEUED,
+            unique_key=None,
+            attempts=0,
+            run_at=timezone.now(),
+        )
 
 
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.LoanProfile, LoanProfileAdmin)
-admin.site.register(models.Transaction)
+admin.site.register(models.Transaction, TransactionAdmin)
+admin.site.register(models.Job, JobAdmin)
@@ -0,0 +1,124 @@
+"""
+The ASGI handler of the app.
+
+Requests are resolved with ASGI_URLCONF, whose views are all async.
+Django 3.2 iterates over the content of a streaming response on the
+event loop, where the database cannot be used, so a streaming response
+reading the database, like the ledger export, fails once its headers are
+sent. ASGIHandler iterates over it where run_in_db_thread() would run
+database work instead: on the request's thread-sensitive thread with
+ASYNC_DB_THREADS = 0, and otherwise on a thread of its own, which keeps
+one connection, as a server-side cursor requires, until the response is
+closed.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers import asgi
+from django.db import connections
+
+
+class _StreamThread:
+    """A thread to iterate over a streaming response on."""
+
+    def __init__(self):
+        self._executor = None
+        if settings.ASYNC_DB_THREADS:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="asgi-stream"
+            )
+
+    async def run(self, func, *args):
+        if self._executor is None:
+            return await sync_to_async(func, thread_sensitive=True)(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def close(self, response):
+        """Close the response, and the connections of the thread."""
+        if self._executor is None:
+            await self.run(response.close)
+            return
+        try:
+            await self.run(_close, response)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def _close(response):
+    try:
+        response.close()
+    finally:
+        connections.close_all()
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    ASGI handler resolving requests with ASGI_URLCONF, and iterating over
+    streaming responses off the loop.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": self.response_headers(response),
+            }
+        )
+        thread = _StreamThread()
+        try:
+            parts = iter(response)
+            while True:
+                part = await thread.run(next, parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": True,
+                        }
+                    )
+            await send({"type": "http.response.body"})
+        finally:
+            await thread.close(response)
+
+    @staticmethod
+    def response_headers(response):
+        """Return the headers and cookies of a response, as Django does."""
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append(
+                (
+                    b"Set-Cookie",
+                    cookie.output(header="").encode("ascii").strip(),
+                )
+            )
+        return headers
+
+
+def get_asgi_application():
+    """Set up Django and return the ASGI handler."""
+    django.setup(set_prefix=False)
+    return ASGIHandler()
@@ -0,0 +1,159 @@
+"""
+Async views over the synchronous ORM and DRF views.
+
+Django 3.2 runs every synchronous view served over ASGI on one shared
+thread per process, so a worker serves one request at a time however
+many connections it holds. async_view() turns a DRF view into an async
+view whose database work runs through run_in_db_thread():
+
+* With ASYNC_DB_THREADS = 0, the work runs on the request's
+  thread-sensitive thread, as Django runs synchronous views. This is
+  the setting for WSGI, where there is nothing to gain, and for tests,
+  whose transaction lives on that thread.
+* Otherwise it runs on a pool of that many threads, each keeping its own
+  database connection for CONN_MAX_AGE, so a worker serves up to
+  ASYNC_DB_THREADS requests at once while waiting on slow clients costs
+  no thread at all. gunicorn.conf.py enables it for the ASGI server.
+
+warm_up() opens the connections async views will use before the first
+request; app/asgi.py calls it through core.startup.
+
+app/asgi_urls.py makes every view async with async_urlpatterns() for
+requests served over ASGI.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import SyncToAsync, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.urls import URLPattern, URLResolver
+
+from core import metrics
+
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the database thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_DB_THREADS,
+                    thread_name_prefix="async-db",
+                )
+    return _executor
+
+
+def _connect(using):
+    connections[using].ensure_connection()
+
+
+def warm_up(using=DEFAULT_DB_ALIAS):
+    """
+    Open a database connection on every thread run_in_db_thread() uses
+    and return their number.
+    """
+    threads = settings.ASYNC_DB_THREADS
+    if not threads:
+        # Outside async_to_sync(), as when served over ASGI, thread-
+        # sensitive code runs on this executor's thread.
+        SyncToAsync.single_thread_executor.submit(_connect, using).result()
+        return 1
+    # Every task waits for the others, so each runs on its own thread.
+    barrier = threading.Barrier(threads, timeout=30)
+
+    def connect():
+        barrier.wait()
+        _connect(using)
+
+    futures = [get_executor().submit(connect) for _ in range(threads)]
+    for future in futures:
+        future.result()
+    return threads
+
+
+def _call(func, args, kwargs):
+    """Call func, counting its queries towards the current request."""
+    request_metrics = metrics.current()
+    with ExitStack() as stack:
+        if request_metrics is not None:
+            for connection in connections.all():
+                # Served over WSGI, the middleware already counts the
+                # queries of the request thread.
+                if request_metrics not in connection.execute_wrappers:
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics)
+                    )
+        return func(*args, **kwargs)
+
+
+def _call_in_pool(func, args, kwargs):
+    """Call func on a pool thread, as Django would for a request."""
+    close_old_connections()
+    try:
+        return _call(func, args, kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Return func(*args, **kwargs), run where it may use the database."""
+    if not settings.ASYNC_DB_THREADS:
+        return await sync_to_async(_call, thread_sensitive=True)(
+            func, args, kwargs
+        )
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(context.run, _call_in_pool, func, args, kwargs),
+    )
+
+
+def async_view(view):
+    """
+    Return an async view running view, and rendering its response, with
+    run_in_db_thread(). Attributes such as csrf_exempt are kept.
+    """
+
+    def respond(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        return response
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_in_db_thread(respond, request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_urlpatterns(patterns):
+    """Return the URL patterns, included ones too, with async views."""
+    return [
+        URLResolver(
+            pattern.pattern,
+            async_urlpatterns(pattern.url_patterns),
+            pattern.default_kwargs,
+            pattern.app_name,
+            pattern.namespace,
+        )
+        if isinstance(pattern, URLResolver)
+        else URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        for pattern in patterns
+    ]
@@ -0,0 +1,194 @@
+"""
+Query-count and latency benchmarks for the REST API.
+
+The benchmarks seed a dataset with generate_sample_data, call each
+endpoint through the Django test client and record the number of
+queries, the p50 and p95 latency and the response size. Results are
+compared against a JSON baseline by the benchmark_api command.
+
+The test client leaves database connections open between requests. To
+measure the connection overhead per request, the *-new-connection
+scenario connects for every request, as with CONN_MAX_AGE = 0, while
+the *-kept-connection one keeps and checks its connection as a server
+does with the DATABASES setting.
+"""
+
+import gc
+import itertools
+import json
+import math
+import time
+
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import models
+from core.management.commands.generate_sample_data import SAMPLE_PASSWORD
+from loan_profile import cache
+
+
+def seed(size, seed=0, stdout=None):
+    """Seed size lenders, size borrowers and 5 * size transactions."""
+    call_command(
+        "generate_sample_data",
+        str(size),
+        str(size),
+        "--transactions",
+        str(size * 5),
+        "--seed",
+        str(seed),
+        stdout=stdout,
+    )
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of values."""
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def endpoints():
+    """
+    Return (name, request) pairs, where request is a function of a
+    test client and an iteration number returning a response.
+    """
+    lender = models.User.objects.filter(role=models.UserRole.LENDER).first()
+    loan_profile = models.LoanProfile.objects.order_by("-pk").first()
+    token = Token.objects.get_or_create(user=lender)[0]
+    auth = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+    list_url = reverse("loan_profile:loanprofile-list")
+    detail_url = reverse(
+        "loan_profile:loanprofile-detail", args=[loan_profile.pk]
+    )
+    emails = (f"benchmark{n}@example.com" for n in itertools.count())
+
+    def uncached_list(client, i):
+        cache.invalidate_list_pages()
+        return client.get(list_url)
+
+    def new_connection(client, i):
+        connection.close()
+        return client.get(detail_url, **auth)
+
+    def kept_connection(client, i):
+        # What request_started and request_finished do.
+        close_old_connections()
+        response = client.get(detail_url, **auth)
+        close_old_connections()
+        return response
+
+    return [
+        ("loanprofile-list", uncached_list),
+        ("loanprofile-list-cached", lambda client, i: client.get(list_url)),
+        (
+            "loanprofile-list-authenticated",
+            lambda client, i: client.get(list_url, **auth),
+        ),
+        (
+            "loanprofile-detail",
+            lambda client, i: client.get(detail_url, **auth),
+        ),
+        ("loanprofile-detail-new-connection", new_connection),
+        ("loanprofile-detail-kept-connection", kept_connection),
+        (
+            "user-create",
+            lambda client, i: client.post(
+                reverse("user:create"),
+                {
+                    "email": next(emails),
+                    "password": SAMPLE_PASSWORD,
+                    "name": "Benchmark User",
+                },
+            ),
+        ),
+        (
+            "user-token",
+            lambda client, i: client.post(
+                reverse("user:token"),
+                {"email": lender.email, "password": SAMPLE_PASSWORD},
+            ),
+        ),
+        ("user-me", lambda client, i: client.get(reverse("user:me"), **auth)),
+    ]
+
+
+def run(iterations=20):
+    """
+    Benchmark every endpoint and return the results by name. Like
+    timeit, garbage collection is paused while requests are timed.
+    """
+    client = APIClient()
+    results = {}
+    for name, request in endpoints():
+        gc.collect()
+        # Warm up code paths and connection state before timing.
+        request(client, -1)
+        timings = []
+        for i in range(iterations):
+            gc.disable()
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = request(client, i)
+                    timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                gc.enable()
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"{name} returned {response.status_code}: "
+                    f"{response.content[:200]!r}"
+                )
+        results[name] = {
+            "queries": len(queries),
+            "p50_ms": round(percentile(timings, 0.5), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "bytes": len(response.content),
+        }
+    return results
+
+
+def compare(results, baseline, latency_tolerance, latency_floor_ms=5.0):
+    """
+    Return a message for every endpoint whose query count exceeds the
+    baseline or whose p95 latency exceeds it by more than the tolerance.
+    Latency within latency_floor_ms of the baseline is treated as noise.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries, "
+                f"baseline {expected['queries']}"
+            )
+        allowed_ms = max(
+            expected["p95_ms"] * (1 + latency_tolerance),
+            expected["p95_ms"] + latency_floor_ms,
+        )
+        if result["p95_ms"] > allowed_ms:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']}ms, "
+                f"allowed {allowed_ms:.2f}ms"
+            )
+    return regressions
+
+
+def load_baseline(path):
+    """Return the baseline stored at path."""
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path, results):
+    """Store results as the baseline at path."""
+    with open(path, "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
@@ -0,0 +1,50 @@
+"""
+PostgreSQL backend with health checks of persistent connections.
+
+With CONN_MAX_AGE, a connection outlives the request that opened it, and
+may be broken by the time the next request uses it: closed by a database
+restart, a failover or an idle timeout of PgBouncer. Django 3.2 only
+notices once a query fails. With CONN_HEALTH_CHECKS, as in Django 4.1,
+the first query of each request checks the connection it reuses and
+replaces it if it is no longer usable.
+"""
+
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get(
+            "CONN_HEALTH_CHECKS", False
+        )
+        self.health_check_done = False
+
+    def connect(self):
+        super().connect()
+        # A new connection needs no check.
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called when a request starts and finishes.
+        if self.connection is not None:
+            self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it has not been checked and is broken."""
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+            # Reconnecting would lose the transaction.
+            or self.in_atomic_block
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
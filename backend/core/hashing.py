@@ -0,0 +1,108 @@
+"""
+Password hashing on a bounded pool.
+
+PBKDF2 takes tens of milliseconds of CPU per password by design, and a
+burst of sign-ups or logins would otherwise hash on every request worker
+at once. PooledPBKDF2PasswordHasher, the first entry of PASSWORD_HASHERS,
+runs every hash on a pool of PASSWORD_HASH_CONCURRENCY threads;
+hashlib.pbkdf2_hmac releases the GIL, so the threads hash in parallel.
+At most PASSWORD_HASH_QUEUE_DEPTH more hashes wait for a thread; beyond
+that, hashing fails fast with HashingBusy, a 503 with Retry-After.
+
+The hasher keeps the pbkdf2_sha256 algorithm name, so existing hashes
+stay valid; it replaces Django's PBKDF2PasswordHasher, which would
+otherwise claim those hashes. Its iteration count is
+PASSWORD_HASH_ITERATIONS; when that changes, Django rehashes each
+password on the user's next login.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core import metrics
+
+
+class HashingBusy(APIException):
+    """Raised when the password hashing pool is full."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many sign-ins in progress, try again shortly.")
+    default_code = "hashing_busy"
+
+    def __init__(self):
+        super().__init__()
+        # Sent as the Retry-After header by the DRF exception handler.
+        self.wait = settings.PASSWORD_HASH_RETRY_AFTER
+
+
+class HashingPool:
+    """
+    A thread pool running at most workers hashes at a time, with at most
+    queue_depth more waiting.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def run(self, func, *args):
+        """
+        Return func(*args), run on the pool, and record the time it
+        waited and ran in the request metrics.
+        """
+        if not self.slots.acquire(blocking=False):
+            raise HashingBusy()
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        try:
+            future = self.executor.submit(timed)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        result, wait, duration = future.result()
+        metrics.record_password_hash(wait, duration)
+        return result
+
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process's hashing pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASH_CONCURRENCY,
+                    settings.PASSWORD_HASH_QUEUE_DEPTH,
+                )
+    return _pool
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher hashing on the bounded pool."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def encode(self, password, salt, iterations=None):
+        # verify() and harden_runtime() hash through encode() as well.
+        return get_pool().run(super().encode, password, salt, iterations)
@@ -0,0 +1,241 @@
+"""
+Background jobs, queued in the core_job table.
+
+A task is a function registered with @task. The run_worker command runs
+it with the keyword arguments it was enqueued with:
+
+    @task
+    def send_receipt(transaction_id):
+        ...
+
+    enqueue(send_receipt, {"transaction_id": 1})
+
+enqueue() inserts the job in the current transaction, so it only runs
+if the transaction commits. Workers claim due jobs with SELECT ... FOR
+UPDATE SKIP LOCKED, so they neither wait on each other nor claim the
+same job. A job that raises is retried after an exponential backoff
+until it has run max_attempts times, then kept as dead for inspection
+in the admin. A job still running after JOB_TIMEOUT seconds is presumed
+lost with its worker and retried, so tasks should be idempotent. Jobs
+are deleted once they succeed.
+"""
+
+import logging
+import random
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    IntegrityError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from core.models import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(func=None, *, name=None):
+    """
+    Register a function as a task, under its dotted path unless a name
+    is given.
+    """
+    if func is None:
+        return lambda func: task(func, name=name)
+    func.task_name = name or f"{func.__module__}.{func.__qualname__}"
+    _tasks[func.task_name] = func
+    return func
+
+
+def enqueue(func, kwargs=None, delay=0, unique_key=None, max_attempts=None):
+    """
+    Queue a task to run with kwargs in delay seconds, and return the
+    job. With a unique_key, nothing is queued while a job of the task
+    with that key is already queued, and None is returned.
+    """
+    job = Job(
+        task=func.task_name,
+        kwargs=kwargs or {},
+        unique_key=unique_key,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+    if unique_key is None:
+        job.save()
+        return job
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+    return None
+
+
+def claim(count=1):
+    """Start up to count due jobs, oldest first, and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=JobStatus.QUEUED, run_at__lte=now)
+            .order_by("run_at")[:count]
+        )
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=JobStatus.RUNNING,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status = JobStatus.RUNNING
+        job.started_at = now
+        job.attempts += 1
+    return jobs
+
+
+def backoff(attempts):
+    """Return the seconds to wait before retrying a job that failed."""
+    delay = min(
+        settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_BACKOFF,
+    )
+    # Jitter spreads out the retries of jobs that failed together.
+    return random.uniform(delay / 2, delay)
+
+
+def run(job):
+    """
+    Run a started job. Delete it if it succeeds, and schedule a retry or
+    mark it dead if it fails. Return whether it succeeded.
+    """
+    # The job may have been retried elsewhere if it ran past JOB_TIMEOUT.
+    attempt = Job.objects.filter(
+        pk=job.pk, status=JobStatus.RUNNING, started_at=job.started_at
+    )
+    try:
+        func = _tasks.get(job.task)
+        if func is None:
+            raise LookupError(f"Unknown task {job.task}.")
+        func(**job.kwargs)
+    except Exception:
+        logger.exception("Job %s failed on attempt %d", job, job.attempts)
+        if job.attempts >= job.max_attempts:
+            changes = {"status": JobStatus.DEAD}
+        else:
+            changes = {
+                "status": JobStatus.QUEUED,
+                "run_at": timezone.now()
+                + timedelta(seconds=backoff(job.attempts)),
+            }
+        try:
+            with transaction.atomic():
+                attempt.update(last_error=traceback.format_exc(), **changes)
+        except IntegrityError:
+            # A job with the same unique key was queued while this one
+            # ran, and runs in its place.
+            attempt.delete()
+        return False
+    attempt.delete()
+    return True
+
+
+def requeue_stalled():
+    """
+    Retry, or mark dead, the jobs running for longer than JOB_TIMEOUT,
+    and return their number.
+    """
+    now = timezone.now()
+    stalled = Job.objects.filter(
+        status=JobStatus.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+    error = f"Timed out after {settings.JOB_TIMEOUT} seconds."
+    # A job queued since with the same unique key runs in their place.
+    superseded, _ = stalled.filter(
+        Exists(
+            Job.objects.filter(
+                status=JobStatus.QUEUED,
+                task=OuterRef("task"),
+                unique_key=OuterRef("unique_key"),
+            )
+        )
+    ).delete()
+    dead = stalled.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.DEAD, last_error=error
+    )
+    retried = stalled.update(
+        status=JobStatus.QUEUED, run_at=now, last_error=error
+    )
+    return superseded + dead + retried
+
+
+class Worker:
+    """
+    Threads running jobs until stopped. In burst mode, each thread stops
+    once no job is due instead of polling for more.
+    """
+
+    def __init__(self, concurrency, poll_interval, burst=False):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.succeeded = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def run(self):
+        """Run jobs until stopped, or until none is due in burst mode."""
+        threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # A timeout keeps the main thread responsive to signals.
+            while thread.is_alive():
+                thread.join(timeout=1)
+
+    def stop(self):
+        """Stop once the running jobs finish."""
+        self._stopping.set()
+
+    def _loop(self):
+        try:
+            while not self._stopping.is_set():
+                # Between jobs as between requests, drop connections past
+                # CONN_MAX_AGE and check the others.
+                close_old_connections()
+                try:
+                    jobs = claim()
+                    requeued = not jobs and requeue_stalled()
+                except DatabaseError:
+                    logger.exception("Could not claim jobs")
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                if jobs:
+                    try:
+                        succeeded = run(jobs[0])
+                    except DatabaseError:
+                        # The job is retried once it times out.
+                        logger.exception("Could not finish job %s", jobs[0])
+                        succeeded = False
+                    with self._lock:
+                        if succeeded:
+                            self.succeeded += 1
+                        else:
+                            self.failed += 1
+                elif requeued:
+                    continue
+                elif self.burst:
+                    return
+                else:
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            connections.close_all()
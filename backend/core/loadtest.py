@@ -0,0 +1,130 @@
+"""
+Concurrent-connection load test for a running server.
+
+Each simulated client holds one keep-alive HTTP/1.1 connection and sends
+its next request as soon as the previous response arrives, so the number
+of connections is the number of requests in flight. Slow clients trickle
+a request header every second and never finish, like clients on poor
+networks or holding long polls. Used by the load_test command to compare
+the WSGI and ASGI servers.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from core.benchmarks import percentile
+
+
+def build_request(url, headers=()):
+    """Return the host, port and bytes of a GET request for url."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    lines = [
+        f"GET {path} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Connection: keep-alive",
+        *headers,
+    ]
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return parts.hostname, parts.port or 80, request
+
+
+async def _read_response(reader):
+    """Read one response and return its status code."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    parts = status_line.split()
+    if len(parts) < 2:
+        raise ValueError(f"Malformed status line: {status_line!r}")
+    return int(parts[1])
+
+
+async def _client(host, port, request, deadline, results):
+    """Send requests over one connection until the deadline."""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            status = await _read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            results["errors"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        results["latencies"].append((time.perf_counter() - start) * 1000)
+        if status >= 400:
+            results["errors"] += 1
+    if writer is not None:
+        writer.close()
+
+
+async def _slow_client(host, port, request, deadline):
+    """Hold a connection sending an unfinished request until deadline."""
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+        writer.write(request.split(b"\r\n", 1)[0] + b"\r\n")
+        while time.monotonic() < deadline:
+            await writer.drain()
+            await asyncio.sleep(1)
+            writer.write(b"X-Slow: 1\r\n")
+        writer.close()
+    except OSError:
+        pass
+
+
+async def _run(url, connections, duration, headers, slow_clients):
+    host, port, request = build_request(url, headers)
+    results = {"latencies": [], "errors": 0}
+    start = time.monotonic()
+    slow = [
+        asyncio.ensure_future(
+            _slow_client(host, port, request, start + duration)
+        )
+        for _ in range(slow_clients)
+    ]
+    # Let the slow clients connect first.
+    await asyncio.sleep(0.5 if slow_clients else 0)
+    await asyncio.gather(
+        *(
+            _client(host, port, request, start + duration, results)
+            for _ in range(connections)
+        )
+    )
+    await asyncio.gather(*slow)
+    elapsed = time.monotonic() - start
+    latencies = results["latencies"] or [0]
+    return {
+        "connections": connections,
+        "requests": len(results["latencies"]),
+        "errors": results["errors"],
+        "requests_per_second": round(len(results["latencies"]) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def run(url, connections, duration, headers=(), slow_clients=0):
+    """
+    Load url from connections concurrent connections for duration
+    seconds, alongside slow_clients slow clients, and return the
+    throughput, errors and latency percentiles.
+    """
+    return asyncio.run(
+        _run(url, connections, duration, headers, slow_clients)
+    )
@@ -0,0 +1,93 @@
+"""
+Django command to benchmark the REST API against a recorded baseline.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from core import benchmarks
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+class Command(BaseCommand):
+    """Django command to record or check API performance"""
+
+    help = (
+        "Seed a throwaway test database, benchmark the REST API and "
+        "compare query counts and latency against a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=200,
+            help="The number of lenders and of borrowers to seed",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="The number of requests per endpoint",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=DEFAULT_BASELINE,
+            help="The JSON baseline to compare against or record",
+        )
+        parser.add_argument(
+            "--record",
+            action="store_true",
+            help="Store the results as the new baseline",
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed p95 latency increase over the baseline, e.g. 0.5",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(f"Seeding {options['size']} lenders/borrowers")
+            benchmarks.seed(options["size"])
+            results = benchmarks.run(options["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+        if options["record"]:
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            benchmarks.save_baseline(options["baseline"], results)
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline saved to {options['baseline']}")
+            )
+            return
+
+        regressions = benchmarks.compare(
+            results,
+            benchmarks.load_baseline(options["baseline"]),
+            options["latency_tolerance"],
+        )
+        if regressions:
+            raise CommandError(
+                "Performance regressed:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS("No performance regressions."))
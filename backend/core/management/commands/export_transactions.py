@@ -0,0 +1,74 @@
+"""
+Django command to export the transaction ledger.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.models import TransactionStatus
+from transaction import export
+
+
+class Command(BaseCommand):
+    """Django command to stream the ledger as CSV or NDJSON"""
+
+    help = (
+        "Write transactions with their lender and loan profile as CSV or "
+        "NDJSON, streamed from the database in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=export.FORMATS,
+            default="csv",
+            help="The output format",
+        )
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Only export transactions made on or after YYYY-MM-DD",
+        )
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            help="Only export transactions made on or before YYYY-MM-DD",
+        )
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=[status.name.lower() for status in TransactionStatus],
+            help="Only export transactions with this status, repeatable",
+        )
+        parser.add_argument(
+            "--output", help="The file to write instead of stdout"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="The number of rows fetched and written at a time",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        queryset = export.ledger(
+            since=options["since"],
+            until=options["until"],
+            statuses=[
+                TransactionStatus[name.upper()]
+                for name in options["status"] or ()
+            ],
+        )
+        _, write = export.FORMATS[options["format"]]
+        chunks = write(queryset, options["chunk_size"])
+
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -1,14 +1,57 @@
-from django.core.management.base import BaseCommand
-from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 
 from faker import Faker
+from cities_light.models import City
 from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+import random
 
 from core import models
 
 
+SAMPLE_PASSWORD = "samplepass123"
+
+LOAN_PROFILE_STATUS_WEIGHTS = {
+    models.LoanProfileStatus.APPROVED: 80,
+    models.LoanProfileStatus.PENDING: 15,
+    models.LoanProfileStatus.REJECTED: 5,
+}
+
+
+def batched(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def parse_status_weights(value):
+    """
+    Parse transaction status weights such as "completed=80,pending=20"
+    into a {TransactionStatus: weight} dict.
+    """
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        try:
+            status = models.TransactionStatus[name.strip().upper()]
+            weights[status] = int(weight)
+        except (KeyError, ValueError):
+            raise CommandError(f"Invalid transaction status weight: {item}")
+    if not any(weights.values()):
+        raise CommandError("At least one status weight must be positive.")
+    return weights
+
+
 class Command(BaseCommand):
-    help = "Generate fake data for User, LoanProfile, and Transaction Model."
+    help = (
+        "Generate fake data for User, LoanProfile, and Transaction Model. "
+        f'Every generated user has the password "{SAMPLE_PASSWORD}".'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -19,86 +62,237 @@ class Command(BaseCommand):
             type=int,
             help="The number of borrowers with loan profiles",
         )
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            help="The number of transactions (default: 5 per lender)",
+        )
+        parser.add_argument(
+            "--status-weights",
+            type=parse_status_weights,
+            default="completed=80,pending=10,failed=5,refunded=5",
+            help=(
+                "Relative weights of the transaction statuses, "
+                'e.g. "completed=80,pending=20"'
+            ),
+        )
+        parser.add_argument(
+            "--with-locations",
+            action="store_true",
+            help="Assign users a random city loaded by cities_light",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="The number of rows inserted per query",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Seed for reproducible data"
+        )
 
     def handle(self, *args, **kwargs):
-        fake = Faker()
+        self.batch_size = kwargs["batch_size"]
+        self.random = random.Random(kwargs["seed"])
+        self.fake = Faker()
+        self.fake.seed_instance(kwargs["seed"])
+        # Hashing is deliberately slow, so every user shares one hash.
+        self.password = make_password(SAMPLE_PASSWORD)
+        self.cities = self.load_cities() if kwargs["with_locations"] else []
+        self.first_user_number = (
+            models.User.objects.order_by("-pk").values_list("pk", flat=True)
+        ).first() or 0
 
         LENDER_COUNT = kwargs["lender_count"]
         BORROWER_COUNT = kwargs["borrower_count"]
-        LOAN_PERIOD = timedelta(days=500)
-
-        # fake-lenders
-        for _ in range(LENDER_COUNT):
-            name = fake.name()
-            first, last = list(map(str.lower, name.split()))
+        TRANSACTION_COUNT = kwargs["transactions"]
+        if TRANSACTION_COUNT is None:
+            TRANSACTION_COUNT = LENDER_COUNT * 5
 
-            user = get_user_model().objects.create_user(
-                name=name,
-                email=f"{first}.{last}@example.com",
-                password=fake.name(),
-                role=models.UserRole.LENDER,
+        with transaction.atomic():
+            lender_ids = self.create_users(
+                LENDER_COUNT, models.UserRole.LENDER
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"{LENDER_COUNT} lender(s) created.")
             )
 
-        self.stdout.write(
-            self.style.SUCCESS(f"{LENDER_COUNT} lender(s) created.")
-        )
-
-        # fake-borrowers & loan-profiles
-        for _ in range(BORROWER_COUNT):
-            name = fake.name()
-            first, last = list(map(str.lower, name.split()))
+            borrower_ids = self.create_users(
+                BORROWER_COUNT, models.UserRole.BORROWER
+            )
+            loan_profile_ids, remaining = self.create_loan_profiles(
+                borrower_ids
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{BORROWER_COUNT} borrower(s) with loan profiles "
+                    "created."
+                )
+            )
 
-            user = get_user_model().objects.create_user(
-                name=name,
-                email=f"{first}.{last}@example.com",
-                password=fake.name(),
+            self.create_transactions(
+                TRANSACTION_COUNT,
+                lender_ids,
+                remaining,
+                kwargs["status_weights"],
             )
-            models.LoanProfile.objects.create(
-                user=user,
-                photoURL=fake.image_url(width=640, height=480),
-                title=fake.company(),
-                description=fake.paragraph(nb_sentences=4),
-                business_type="",
-                loan_duration_months=fake.random_number(digits=2),
-                total_amount_required=fake.pydecimal(
-                    left_digits=4, right_digits=2, positive=True
-                ),
-                deadline_to_receive_loan=fake.date_between(
-                    start_date="today", end_date=LOAN_PERIOD
-                ),
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {TRANSACTION_COUNT} sample transactions "
+                    "between lenders and borrowers."
+                )
             )
 
+            if loan_profile_ids:
+                created = models.LoanProfile.objects.filter(
+                    pk__in=loan_profile_ids
+                )
+                created.recompute_funding_totals()
+                created.update_search_vector()
+
         self.stdout.write(
-            self.style.SUCCESS(
-                f"{BORROWER_COUNT} borrower(s) with loan profiles created."
-            )
+            self.style.SUCCESS("Successfully generated samples.")
         )
 
-        random_lenders = models.User.objects.filter(
-            role=models.UserRole.LENDER
-        ).order_by("?")[:LENDER_COUNT]
-        random_loan_profiles = models.LoanProfile.objects.order_by("?")[
-            :BORROWER_COUNT
-        ]
-
-        for lender in random_lenders:
-            for loan_profile in random_loan_profiles:
-                for n in range(fake.random_number(digits=1)):
-                    models.Transaction.objects.create_transaction(
-                        lender=lender,
-                        borrower=loan_profile,
-                        amount=fake.pydecimal(
-                            left_digits=3, right_digits=2, positive=True
-                        ),
-                        status=models.TransactionStatus.COMPLETED,
+    def load_cities(self):
+        """Return the (id, country id) of every cities_light city."""
+        cities = list(City.objects.values_list("pk", "country_id"))
+        if not cities:
+            self.stdout.write(
+                self.style.WARNING(
+                    "No cities found, run cities_light to load them. "
+                    "Users are created without a location."
+                )
+            )
+        return cities
+
+    def report_progress(self, label, done, total):
+        """Write the progress of a bulk insert."""
+        self.stdout.write(f"{label}: {done}/{total}")
+
+    def create_users(self, count, role):
+        """Bulk create users with the given role and return their ids."""
+        ids = []
+
+        def build():
+            for _ in range(count):
+                self.first_user_number += 1
+                city_id, country_id = (
+                    self.random.choice(self.cities)
+                    if self.cities
+                    else (None, None)
+                )
+                yield models.User(
+                    name=self.fake.name(),
+                    email=f"{role}{self.first_user_number}@example.com",
+                    password=self.password,
+                    role=role,
+                    country_id=country_id,
+                    city_id=city_id,
+                    story=self.fake.paragraph(nb_sentences=3),
+                )
+
+        for batch in batched(build(), self.batch_size):
+            ids += [
+                user.pk
+                for user in models.User.objects.bulk_create(
+                    batch, batch_size=self.batch_size
+                )
+            ]
+            self.report_progress(f"{role.label}s", len(ids), count)
+        return ids
+
+    def create_loan_profiles(self, borrower_ids):
+        """
+        Bulk create a loan profile for each borrower and return their
+        ids, and the remaining amount required by the approved ones, by
+        id.
+        """
+        LOAN_PERIOD = timedelta(days=500)
+        statuses = list(LOAN_PROFILE_STATUS_WEIGHTS)
+        weights = list(LOAN_PROFILE_STATUS_WEIGHTS.values())
+        ids = []
+        remaining = {}
+
+        def build():
+            for user_id in borrower_ids:
+                yield models.LoanProfile(
+                    user_id=user_id,
+                    photoURL=self.fake.image_url(width=640, height=480),
+                    title=self.fake.company(),
+                    description=self.fake.paragraph(nb_sentences=4),
+                    business_type=self.fake.bs().split()[-1],
+                    loan_duration_months=self.random.randint(1, 60),
+                    total_amount_required=Decimal(
+                        self.random.randint(10000, 999999)
                     )
+                    / 100,
+                    deadline_to_receive_loan=self.fake.date_between(
+                        start_date="today", end_date=LOAN_PERIOD
+                    ),
+                    status=self.random.choices(statuses, weights)[0],
+                )
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                "Created sample transactions between lenders and borrowers."
+        for batch in batched(build(), self.batch_size):
+            for loan_profile in models.LoanProfile.objects.bulk_create(
+                batch, batch_size=self.batch_size
+            ):
+                ids.append(loan_profile.pk)
+                if loan_profile.status == models.LoanProfileStatus.APPROVED:
+                    remaining[loan_profile.pk] = (
+                        loan_profile.total_amount_required
+                    )
+            self.report_progress(
+                "Loan profiles", len(ids), len(borrower_ids)
             )
-        )
+        return ids, remaining
 
-        self.stdout.write(
-            self.style.SUCCESS("Successfully generated samples.")
-        )
+    def create_transactions(self, count, lender_ids, remaining, weights):
+        """
+        Bulk create transactions from random lenders to random approved
+        loan profiles, never completing more than a profile requires.
+        """
+        if not count:
+            return
+        if not lender_ids or not remaining:
+            raise CommandError(
+                "Transactions need at least one lender and one approved "
+                "loan profile."
+            )
+        statuses = list(weights)
+        status_weights = list(weights.values())
+        fallback_statuses = [
+            status
+            for status in statuses
+            if status != models.TransactionStatus.COMPLETED
+        ] or [models.TransactionStatus.PENDING]
+        loan_profile_ids = list(remaining)
+        payment_methods = models.PaymentMethod.values
+        created = 0
+
+        def build():
+            for _ in range(count):
+                loan_profile_id = self.random.choice(loan_profile_ids)
+                amount = Decimal(self.random.randint(100, 50000)) / 100
+                status = self.random.choices(statuses, status_weights)[0]
+                if status == models.TransactionStatus.COMPLETED:
+                    amount = min(amount, remaining[loan_profile_id])
+                    if amount <= 0:
+                        status = self.random.choice(fallback_statuses)
+                        amount = Decimal("10.00")
+                    else:
+                        remaining[loan_profile_id] -= amount
+                yield models.Transaction(
+                    user_id=self.random.choice(lender_ids),
+                    loan_profile_id=loan_profile_id,
+                    amount=amount,
+                    payment_method=self.random.choice(payment_methods),
+                    status=status,
+                )
+
+        for batch in batched(build(), self.batch_size):
+            models.Transaction.objects.bulk_create(
+                batch, batch_size=self.batch_size
+            )
+            created += len(batch)
+            self.report_progress("Transactions", created, count)
@@ -0,0 +1,68 @@
+"""
+Django command to load test a running server.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import loadtest
+
+
+class Command(BaseCommand):
+    """Django command to measure throughput under concurrent connections"""
+
+    help = (
+        "Send GET requests to a running server from many concurrent "
+        "keep-alive connections and report throughput and latency. Run "
+        "it against the WSGI and the ASGI server to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="The URL to request")
+        parser.add_argument(
+            "--connections",
+            type=int,
+            action="append",
+            help=(
+                "The number of concurrent connections; repeat to run "
+                "several rounds (default: 1, 10, 50, 200)"
+            ),
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10,
+            help="The number of seconds each round lasts",
+        )
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=0,
+            help="The number of slow clients holding connections open",
+        )
+        parser.add_argument(
+            "--token",
+            help="An auth token to send in the Authorization header",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        headers = []
+        if options["token"]:
+            headers.append(f"Authorization: Token {options['token']}")
+        self.stdout.write(
+            f"{'connections':>11} {'req/s':>9} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for connections in options["connections"] or (1, 10, 50, 200):
+            result = loadtest.run(
+                options["url"],
+                connections,
+                options["duration"],
+                headers,
+                options["slow_clients"],
+            )
+            self.stdout.write(
+                f"{connections:>11} {result['requests_per_second']:>9} "
+                f"{result['p50_ms']:>9} {result['p95_ms']:>9} "
+                f"{result['p99_ms']:>9} {result['errors']:>7}"
+            )
@@ -0,0 +1,73 @@
+"""
+Django command to partition the transaction ledger by month.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core import partitioning
+
+
+class Command(BaseCommand):
+    """Django command to convert and extend the partitioned ledger"""
+
+    help = (
+        "Create the monthly partitions of the transaction table for the "
+        "coming months. With --convert, first rebuild an unpartitioned "
+        "table as a partitioned one; this locks the table while its rows "
+        "are copied. Safe to run repeatedly, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help=(
+                "Convert the table if it is not partitioned by the "
+                "partition key yet"
+            ),
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="The number of future months to create partitions for",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        this_month = timezone.localdate().replace(day=1)
+        last_month = partitioning.add_months(
+            this_month, options["months_ahead"]
+        )
+        with connection.cursor() as cursor:
+            key = partitioning.partition_key(cursor)
+            if key == partitioning.PARTITION_KEY:
+                created = partitioning.create_partitions(
+                    cursor, this_month, last_month
+                )
+            elif options["convert"]:
+                self.stdout.write(f"Converting {partitioning.TABLE}...")
+                created = partitioning.convert(cursor, last_month)
+            elif key:
+                raise CommandError(
+                    f"{partitioning.TABLE} is partitioned by {key}, not "
+                    f"{partitioning.PARTITION_KEY}. Run with --convert to "
+                    "re-partition it."
+                )
+            else:
+                raise CommandError(
+                    f"{partitioning.TABLE} is not partitioned. Run with "
+                    "--convert to convert it."
+                )
+
+        for name in created:
+            self.stdout.write(f"Created partition {name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(created)} partition(s) created."
+                if created
+                else "No partitions to create."
+            )
+        )
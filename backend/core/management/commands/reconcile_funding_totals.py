@@ -0,0 +1,61 @@
+"""
+Django command to reconcile the stored loan profile funding totals
+with the transaction ledger.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.models import LoanProfile
+
+
+class Command(BaseCommand):
+    """Django command to report and repair funding total drift"""
+
+    help = (
+        "Recompute amount lended to date, lender count and completed "
+        "transaction count of every loan profile from its transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without updating the loan profiles.",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        drifted = LoanProfile.objects.with_funding_drift().order_by("pk")
+        drifted_ids = []
+        for loan_profile in drifted.iterator():
+            drifted_ids.append(loan_profile.pk)
+            self.stdout.write(
+                f"Loan profile {loan_profile.pk}: "
+                f"amount {loan_profile.amount_lended_to_date} -> "
+                f"{loan_profile.funding_total}, "
+                f"lenders {loan_profile.lender_count} -> "
+                f"{loan_profile.funding_lender_count}, "
+                f"transactions {loan_profile.completed_transaction_count} -> "
+                f"{loan_profile.funding_transaction_count}"
+            )
+
+        if not drifted_ids:
+            self.stdout.write(
+                self.style.SUCCESS("Funding totals are in sync.")
+            )
+            return
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(drifted_ids)} loan profile(s) out of sync."
+                )
+            )
+            return
+
+        updated = LoanProfile.objects.filter(
+            pk__in=drifted_ids
+        ).recompute_funding_totals()
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {updated} loan profile(s).")
+        )
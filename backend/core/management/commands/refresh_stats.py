@@ -0,0 +1,22 @@
+"""
+Django command to refresh the platform statistics.
+"""
+
+from django.core.management.base import BaseCommand
+
+from stats.tasks import refresh_stats
+
+
+class Command(BaseCommand):
+    """Django command to refresh the statistics materialized views"""
+
+    help = (
+        "Recompute the platform and per-country statistics served by "
+        "/stats/. Reads are not blocked while the views refresh. Run it "
+        "on a schedule, e.g. every few minutes from cron."
+    )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        refresh_stats()
+        self.stdout.write(self.style.SUCCESS("Statistics refreshed."))
@@ -0,0 +1,68 @@
+"""
+Django command to run background jobs.
+"""
+
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    """Django command to run the jobs queued with core.jobs.enqueue()"""
+
+    help = (
+        "Run queued background jobs on several threads until stopped by "
+        "SIGINT or SIGTERM, which let the running jobs finish. Tasks are "
+        "loaded from the tasks module of every installed app. Run as many "
+        "workers as needed; they never claim the same job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help="The number of jobs to run at once",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds to wait for new jobs when the queue is empty",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        autodiscover_modules("tasks")
+        worker = jobs.Worker(
+            options["concurrency"],
+            options["poll_interval"],
+            burst=options["burst"],
+        )
+        handlers = {
+            signum: signal.signal(signum, lambda signum, frame: worker.stop())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        self.stdout.write(
+            f"Running jobs on {options['concurrency']} thread(s)..."
+        )
+        try:
+            worker.run()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Worker stopped: {worker.succeeded} job(s) succeeded, "
+                f"{worker.failed} failed."
+            )
+        )
@@ -0,0 +1,303 @@
+"""
+In-process request metrics.
+
+RequestMetricsMiddleware collects a RequestMetrics for every request
+and records it in the module registry, which keeps per-route
+histograms and renders them in the Prometheus text format. The
+registry lives in process memory, so each worker reports its own
+metrics. Apps may also expose counters of their own, read on every
+scrape, with register_counter().
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+from rest_framework.fields import empty
+
+
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+METRICS = {
+    "http_request_duration_seconds": (
+        "Wall time spent handling the request.",
+        DURATION_BUCKETS,
+    ),
+    "http_request_db_duration_seconds": (
+        "Time spent executing database queries.",
+        DURATION_BUCKETS,
+    ),
+    "http_request_db_queries": (
+        "Number of database queries.",
+        COUNT_BUCKETS,
+    ),
+    "http_request_db_duplicate_queries": (
+        "Number of queries repeating an earlier query and parameters.",
+        COUNT_BUCKETS,
+    ),
+    "http_request_serializer_duration_seconds": (
+        "Time spent serializing and validating data.",
+        DURATION_BUCKETS,
+    ),
+    "http_request_password_hash_duration_seconds": (
+        "Time spent hashing passwords in the password hashing pool.",
+        DURATION_BUCKETS,
+    ),
+    "http_request_password_hash_wait_seconds": (
+        "Time spent waiting for a password hashing pool worker.",
+        DURATION_BUCKETS,
+    ),
+}
+
+# Counters registered by apps: {name: (help, function reading it)}.
+COUNTERS = {}
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Query and serializer timings of one request. An instance is a
+    database execute wrapper counting every query it runs.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.password_hash_time = 0.0
+        self.password_hash_wait = 0.0
+        self.statements = Counter()
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicate_queries(self):
+        """Return the number of queries repeating an earlier one."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def most_duplicated(self):
+        """Return the SQL of the most repeated query."""
+        (sql, _), _ = self.statements.most_common(1)[0]
+        return sql
+
+    def server_timing(self, duration):
+        """Return a Server-Timing header value for the request."""
+        return (
+            f"total;dur={duration * 1000:.2f}, "
+            f"db;dur={self.db_time * 1000:.2f};"
+            f'desc="{self.queries} queries, '
+            f'{self.duplicate_queries} duplicate", '
+            f"hash;dur={self.password_hash_time * 1000:.2f}, "
+            f"serializer;dur={self.serializer_time * 1000:.2f}"
+        )
+
+
+def start_request():
+    """Start collecting metrics for the current request."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    """Stop collecting metrics for the current request."""
+    _current.reset(token)
+
+
+def current():
+    """Return the metrics of the current request, if collected."""
+    return _current.get()
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Count the enclosed block towards the serializer time of the current
+    request. Nested serializers are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics.serializer_depth:
+        yield
+        return
+    metrics.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializer_depth -= 1
+
+
+def record_password_hash(wait, duration):
+    """
+    Count a password hash towards the current request, with the time it
+    waited for a worker.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.password_hash_wait += wait
+        metrics.password_hash_time += duration
+
+
+class TimedSerializerMixin:
+    """Count representation and validation towards serializer time."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+    def run_validation(self, data=empty):
+        with serializer_timer():
+            return super().run_validation(data)
+
+
+class Histogram:
+    """A cumulative histogram with fixed bucket upper bounds."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class Registry:
+    """Histograms of every metric by route and method."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, route, method, values):
+        """Record a {metric name: value} dict for a request."""
+        with self._lock:
+            for name, value in values.items():
+                key = (name, route, method)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(METRICS[name][1])
+                self._histograms[key].observe(value)
+
+    def record(self, route, method, metrics, duration):
+        """Record the metrics of a request."""
+        self.observe(
+            route,
+            method,
+            {
+                "http_request_duration_seconds": duration,
+                "http_request_db_duration_seconds": metrics.db_time,
+                "http_request_db_queries": metrics.queries,
+                "http_request_db_duplicate_queries": (
+                    metrics.duplicate_queries
+                ),
+                "http_request_serializer_duration_seconds": (
+                    metrics.serializer_time
+                ),
+                "http_request_password_hash_duration_seconds": (
+                    metrics.password_hash_time
+                ),
+                "http_request_password_hash_wait_seconds": (
+                    metrics.password_hash_wait
+                ),
+            },
+        )
+
+    def snapshot(self):
+        """Return every histogram, grouped by metric name."""
+        snapshot = {name: [] for name in METRICS}
+        with self._lock:
+            for (name, route, method), histogram in sorted(
+                self._histograms.items()
+            ):
+                snapshot[name].append(
+                    {"route": route, "method": method}
+                    | histogram.snapshot()
+                )
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def _escape(value):
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def register_counter(name, help_text, read):
+    """Expose a counter whose current value read() returns."""
+    COUNTERS[name] = (help_text, read)
+
+
+def read_counters():
+    """Return the current value of every registered counter."""
+    return {name: read() for name, (_, read) in COUNTERS.items()}
+
+
+def render(snapshot):
+    """
+    Render a registry snapshot, and the counters read with it, in the
+    Prometheus text format.
+    """
+    lines = []
+    for name, samples in snapshot.items():
+        if name in COUNTERS:
+            lines.append(f"# HELP {name} {COUNTERS[name][0]}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {samples}")
+            continue
+        lines.append(f"# HELP {name} {METRICS[name][0]}")
+        lines.append(f"# TYPE {name} histogram")
+        for sample in samples:
+            labels = (
+                f'route="{_escape(sample["route"])}",'
+                f'method="{_escape(sample["method"])}"'
+            )
+            for bound, count in sample["buckets"].items():
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(f"{name}_sum{{{labels}}} {sample['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
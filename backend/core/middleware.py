@@ -0,0 +1,104 @@
+"""
+Middleware for the app.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from core import metrics, replicas
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the wall time, database queries and serializer time of every
+    request in the metrics registry and a Server-Timing header.
+    Enabled with the REQUEST_METRICS environment variable.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark this instance as a coroutine function, so Django
+            # keeps the middleware chain async.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        request_metrics, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, request_metrics, start, response)
+
+    async def __acall__(self, request):
+        # The queries of async views are counted where they run, through
+        # the current request metrics; see core.asyncdb.
+        request_metrics, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, request_metrics, start, response)
+
+    def finish(self, request, request_metrics, start, response):
+        """Record the metrics of a request and return its response."""
+        duration = time.perf_counter() - start
+        route = self.get_route(request)
+        metrics.registry.record(
+            route, request.method, request_metrics, duration
+        )
+        if request_metrics.duplicate_queries:
+            logger.warning(
+                "%s %s ran %d duplicate queries, most often: %s",
+                request.method,
+                route,
+                request_metrics.duplicate_queries,
+                request_metrics.most_duplicated(),
+            )
+        response["Server-Timing"] = request_metrics.server_timing(duration)
+        return response
+
+    def get_route(self, request):
+        """Return the URL name of the request, bounding label values."""
+        match = getattr(request, "resolver_match", None)
+        return match.view_name if match else "unmatched"
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    Pin a client that writes to the primary database for
+    REPLICA_PIN_SECONDS, so it reads its own writes; see core.replicas.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                replicas.PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
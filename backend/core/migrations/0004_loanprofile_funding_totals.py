@@ -0,0 +1,66 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:46
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+COMPLETED = 2
+
+
+def backfill_funding_totals(apps, schema_editor):
+    LoanProfile = apps.get_model('core', 'LoanProfile')
+    Transaction = apps.get_model('core', 'Transaction')
+    completed = Transaction.objects.filter(
+        loan_profile=models.OuterRef('pk'), status=COMPLETED,
+    ).order_by().values('loan_profile')
+
+    def total(aggregate, output_field):
+        return Coalesce(
+            models.Subquery(
+                completed.annotate(total=aggregate).values('total'),
+                output_field=output_field,
+            ),
+            models.Value(0),
+            output_field=output_field,
+        )
+
+    LoanProfile.objects.using(schema_editor.connection.alias).update(
+        amount_lended_to_date=total(
+            models.Sum('amount'),
+            models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+        lender_count=total(
+            models.Count('user', distinct=True), models.IntegerField()
+        ),
+        completed_transaction_count=total(
+            models.Count('pk'), models.IntegerField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_loanprofile_deadline_to_receive_loan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanprofile',
+            name='amount_lended_to_date',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='The sum of the completed transactions for the loan.', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='loanprofile',
+            name='completed_transaction_count',
+            field=models.PositiveIntegerField(default=0, help_text='The number of completed transactions for the loan.'),
+        ),
+        migrations.AddField(
+            model_name='loanprofile',
+            name='lender_count',
+            field=models.PositiveIntegerField(default=0, help_text='The number of lenders with completed transactions.'),
+        ),
+        migrations.RunPython(
+            backfill_funding_totals, migrations.RunPython.noop
+        ),
+    ]
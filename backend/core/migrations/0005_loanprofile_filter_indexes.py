@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:48
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_loanprofile_funding_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanprofile',
+            index=models.Index(fields=['status', 'deadline_to_receive_loan'], name='loanprofile_status_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='loanprofile',
+            index=models.Index(fields=['business_type', 'status'], name='loanprofile_btype_status'),
+        ),
+        migrations.AddIndex(
+            model_name='loanprofile',
+            index=models.Index(condition=models.Q(('status', 2)), fields=['deadline_to_receive_loan'], name='loanprofile_approved_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='loanprofile',
+            index=models.Index(django.db.models.expressions.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.F('total_amount_required'), '-', django.db.models.expressions.F('amount_lended_to_date')), output_field=models.DecimalField(decimal_places=2, max_digits=12)), name='loanprofile_amount_remaining'),
+        ),
+    ]
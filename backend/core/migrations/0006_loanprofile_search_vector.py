@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+from django.contrib.postgres.search import SearchVector
+
+SEARCH_CONFIG = 'english'
+
+
+def backfill_search_vector(apps, schema_editor):
+    LoanProfile = apps.get_model('core', 'LoanProfile')
+    User = apps.get_model('core', 'User')
+    owner = User.objects.filter(pk=models.OuterRef('user_id'))
+
+    def owner_field(name):
+        return models.Subquery(
+            owner.values(name), output_field=models.TextField()
+        )
+
+    LoanProfile.objects.using(schema_editor.connection.alias).update(
+        search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector(
+                'description', owner_field('business_name'),
+                weight='B', config=SEARCH_CONFIG,
+            )
+            + SearchVector(
+                owner_field('story'), owner_field('interests'),
+                weight='C', config=SEARCH_CONFIG,
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_loanprofile_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='The full-text search document of the loan profile.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='loanprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='loanprofile_search_vector'),
+        ),
+        migrations.RunPython(
+            backfill_search_vector, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loanprofile_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='A client-supplied key, such as a payment reference. Retried creations with the same key return the original transaction.', max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_created_at(apps, schema_editor):
+    # transaction_date is the closest record of when existing
+    # transactions were created and last changed status.
+    Transaction = apps.get_model('core', 'Transaction')
+    Transaction.objects.using(schema_editor.connection.alias).update(
+        created_at=models.F('transaction_date'),
+        status_changed_at=models.F('transaction_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_transaction_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='created_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='status_changed_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='transaction',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='The date and time when the transaction was created.'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='The date and time when the status last changed.'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_date',
+            field=models.DateTimeField(auto_now=True, help_text='The date and time when the transaction was last saved.'),
+        ),
+        migrations.AlterModelOptions(
+            name='transaction',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Transaction', 'verbose_name_plural': 'Transactions'},
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='loan_profile',
+            field=models.ForeignKey(db_index=False, help_text='The borrower (loan profile) for the transaction.', on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='core.loanprofile'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(db_index=False, help_text='The lender for the transaction.', on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='core.user'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['loan_profile', 'status', 'created_at'], include=('user', 'amount'), name='transaction_profile_history'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'created_at'], include=('loan_profile', 'status', 'amount'), name='transaction_lender_history'),
+        ),
+    ]
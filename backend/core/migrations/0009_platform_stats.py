@@ -0,0 +1,106 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+APPROVED = 2
+COMPLETED = 2
+
+PLATFORM_STATS = f"""
+CREATE MATERIALIZED VIEW core_platform_stats AS
+SELECT
+    1 AS id,
+    (SELECT coalesce(sum(amount_lended_to_date), 0)
+     FROM core_loanprofile) AS total_funded,
+    (SELECT count(*) FROM core_loanprofile
+     WHERE status = {APPROVED}
+       AND deadline_to_receive_loan >= current_date) AS active_profiles,
+    (SELECT count(DISTINCT user_id) FROM core_transaction
+     WHERE status = {COMPLETED}) AS lenders,
+    now() AS refreshed_at;
+
+CREATE UNIQUE INDEX core_platform_stats_id ON core_platform_stats (id);
+"""
+
+COUNTRY_STATS = f"""
+CREATE MATERIALIZED VIEW core_country_stats AS
+WITH profiles AS (
+    SELECT
+        borrower.country_id,
+        sum(profile.amount_lended_to_date) AS total_funded,
+        count(*) FILTER (
+            WHERE profile.status = {APPROVED}
+              AND profile.deadline_to_receive_loan >= current_date
+        ) AS active_profiles
+    FROM core_loanprofile profile
+    JOIN core_user borrower ON borrower.id = profile.user_id
+    WHERE borrower.country_id IS NOT NULL
+    GROUP BY borrower.country_id
+), lenders AS (
+    SELECT borrower.country_id, count(DISTINCT funding.user_id) AS lenders
+    FROM core_transaction funding
+    JOIN core_loanprofile profile ON profile.id = funding.loan_profile_id
+    JOIN core_user borrower ON borrower.id = profile.user_id
+    WHERE funding.status = {COMPLETED}
+      AND borrower.country_id IS NOT NULL
+    GROUP BY borrower.country_id
+)
+SELECT
+    profiles.country_id,
+    profiles.total_funded,
+    profiles.active_profiles,
+    coalesce(lenders.lenders, 0) AS lenders
+FROM profiles
+LEFT JOIN lenders USING (country_id);
+
+CREATE UNIQUE INDEX core_country_stats_country_id
+ON core_country_stats (country_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cities_light', '0011_alter_city_country_alter_city_region_and_more'),
+        ('core', '0008_transaction_created_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            PLATFORM_STATS,
+            'DROP MATERIALIZED VIEW core_platform_stats',
+        ),
+        migrations.RunSQL(
+            COUNTRY_STATS,
+            'DROP MATERIALIZED VIEW core_country_stats',
+        ),
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('total_funded', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('active_profiles', models.IntegerField()),
+                ('lenders', models.IntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Platform stats',
+                'db_table': 'core_platform_stats',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CountryStats',
+            fields=[
+                ('country', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='cities_light.country')),
+                ('total_funded', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('active_profiles', models.IntegerField()),
+                ('lenders', models.IntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Country stats',
+                'db_table': 'core_country_stats',
+                'managed': False,
+            },
+        ),
+    ]
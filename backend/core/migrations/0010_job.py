@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_platform_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(help_text='The name of the task to run.', max_length=255)),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='The keyword arguments of the task.')),
+                ('unique_key', models.CharField(blank=True, help_text='At most one queued job of the task has this key.', max_length=255, null=True)),
+                ('status', models.IntegerField(choices=[(1, 'Queued'), (2, 'Running'), (3, 'Dead')], default=1)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='The number of times the job was started.')),
+                ('max_attempts', models.PositiveIntegerField(help_text='The number of attempts after which the job is dead.')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='The time from which the job may run.')),
+                ('started_at', models.DateTimeField(blank=True, help_text='The time the last attempt started.', null=True)),
+                ('last_error', models.TextField(blank=True, help_text='The traceback of the last failed attempt.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['run_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['run_at'], name='job_queued_run_at'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 2)), fields=['started_at'], name='job_running_started_at'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 1)), fields=('task', 'unique_key'), name='job_unique_queued'),
+        ),
+    ]
@@ -2,7 +2,16 @@
 Database models.
 """
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import IntegrityError, connections, models, router
+from django.db.transaction import atomic
+from django.db.models.functions import Cast, Coalesce
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -12,6 +21,9 @@ from django.contrib.auth.models import (
 from django.utils import timezone
 from cities_light.models import Country, City
 
+from core.signals import funding_totals_changed
+
+from collections import defaultdict
 from decimal import Decimal
 
 
@@ -122,6 +134,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if not adding and (
+            update_fields is None
+            or set(update_fields) & set(LoanProfile.USER_SEARCH_FIELDS)
+        ):
+            self.loan_profiles.all().update_search_vector()
+
 
 class LoanProfileStatus(models.IntegerChoices):
     """Loan profile statuses."""
@@ -131,6 +153,161 @@ class LoanProfileStatus(models.IntegerChoices):
     REJECTED = 3, "Rejected"
 
 
+AMOUNT_REMAINING = models.ExpressionWrapper(
+    models.F("total_amount_required") - models.F("amount_lended_to_date"),
+    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+SEARCH_CONFIG = "english"
+
+
+class LoanProfileQuerySet(models.QuerySet):
+    """QuerySet for loan profiles."""
+
+    def update_search_vector(self):
+        """
+        Recompute the full-text search vector of the loan profiles from
+        their own text and the story of their owner.
+        """
+        owner = User.objects.filter(pk=models.OuterRef("user_id"))
+
+        def owner_field(name):
+            return models.Subquery(
+                owner.values(name), output_field=models.TextField()
+            )
+
+        return self.update(
+            search_vector=(
+                SearchVector("title", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(
+                    "description",
+                    owner_field("business_name"),
+                    weight="B",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector(
+                    owner_field("story"),
+                    owner_field("interests"),
+                    weight="C",
+                    config=SEARCH_CONFIG,
+                )
+            )
+        )
+
+    def search(self, text):
+        """
+        Return the loan profiles matching a web-style search query,
+        annotated with their search_rank.
+        """
+        query = SearchQuery(
+            text, search_type="websearch", config=SEARCH_CONFIG
+        )
+        # ts_rank returns a float4; widening it keeps the rank exact when
+        # it round-trips through a pagination cursor.
+        return self.filter(search_vector=query).annotate(
+            search_rank=Cast(
+                SearchRank(models.F("search_vector"), query),
+                models.FloatField(),
+            )
+        )
+
+    def _completed_transactions(self):
+        """Return completed transactions of the outer loan profile."""
+        return Transaction.objects.filter(
+            loan_profile=models.OuterRef("pk"),
+            status=TransactionStatus.COMPLETED,
+        ).order_by()
+
+    def _funding_expressions(self):
+        """
+        Return expressions computing the funding totals of each loan
+        profile from its completed transactions.
+        """
+        completed = self._completed_transactions().values("loan_profile")
+
+        def total(aggregate, output_field):
+            return Coalesce(
+                models.Subquery(
+                    completed.annotate(total=aggregate).values("total"),
+                    output_field=output_field,
+                ),
+                models.Value(0),
+                output_field=output_field,
+            )
+
+        return {
+            "amount_lended_to_date": total(
+                models.Sum("amount"),
+                models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+            "lender_count": total(
+                models.Count("user", distinct=True), models.IntegerField()
+            ),
+            "completed_transaction_count": total(
+                models.Count("pk"), models.IntegerField()
+            ),
+        }
+
+    def with_funding_totals(self):
+        """
+        Annotate each loan profile with the funding totals recomputed from
+        the transaction ledger, as funding_total, funding_lender_count and
+        funding_transaction_count.
+        """
+        expressions = self._funding_expressions()
+        return self.annotate(
+            funding_total=expressions["amount_lended_to_date"],
+            funding_lender_count=expressions["lender_count"],
+            funding_transaction_count=expressions[
+                "completed_transaction_count"
+            ],
+        )
+
+    def with_funding_drift(self):
+        """Return loan profiles whose stored funding totals are stale."""
+        return self.with_funding_totals().filter(
+            ~models.Q(amount_lended_to_date=models.F("funding_total"))
+            | ~models.Q(lender_count=models.F("funding_lender_count"))
+            | ~models.Q(
+                completed_transaction_count=models.F(
+                    "funding_transaction_count"
+                )
+            )
+        )
+
+    def with_amount_remaining(self):
+        """Annotate each loan profile with the amount still required."""
+        return self.annotate(amount_remaining=AMOUNT_REMAINING)
+
+    def fundable(self, amount=0):
+        """
+        Return the approved loan profiles before their deadline with at
+        least amount remaining. Used as the condition of an UPDATE, this
+        reserves funding without reading the loan profile first.
+        """
+        return self.filter(
+            status=LoanProfileStatus.APPROVED,
+            deadline_to_receive_loan__gte=timezone.localdate(),
+            amount_lended_to_date__lte=(
+                models.F("total_amount_required") - amount
+            ),
+        )
+
+    def recompute_funding_totals(self):
+        """
+        Overwrite the stored funding totals from the transaction ledger in
+        a single UPDATE and return the number of loan profiles updated.
+        """
+        updated = self.update(
+            **self._funding_expressions(), updated_at=timezone.now()
+        )
+        funding_totals_changed.send(
+            sender=self.model, loan_profile_ids=None, using=self.db
+        )
+        return updated
+
+
 class LoanProfile(models.Model):
     """Loan profile model."""
 
@@ -178,45 +355,334 @@ class LoanProfile(models.Model):
         help_text="The status of the loan profile.",
     )
 
-    @property
-    def amount_lended_to_date(self):
-        transaction_total = self.transactions.filter(
-            status=TransactionStatus.COMPLETED
-        ).aggregate(models.Sum("amount"))["amount__sum"]
+    amount_lended_to_date = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        help_text="The sum of the completed transactions for the loan.",
+    )
+    lender_count = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of lenders with completed transactions.",
+    )
+    completed_transaction_count = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of completed transactions for the loan.",
+    )
 
-        return (
-            transaction_total.quantize(Decimal("0.00"))
-            if transaction_total
-            else 0
-        )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="The full-text search document of the loan profile.",
+    )
+
+    objects = LoanProfileQuerySet.as_manager()
+
+    SEARCH_FIELDS = ("title", "description", "user")
+    USER_SEARCH_FIELDS = ("business_name", "story", "interests")
+    FUNDING_FIELDS = (
+        "amount_lended_to_date",
+        "lender_count",
+        "completed_transaction_count",
+    )
+    FUNDING_CHECK_FIELDS = (
+        "status",
+        "deadline_to_receive_loan",
+        "total_amount_required",
+        "amount_lended_to_date",
+    )
 
     class Meta:
         verbose_name = "Loan Profile"
         verbose_name_plural = "Loan Profiles"
         ordering = ["user"]
+        indexes = [
+            models.Index(
+                fields=["status", "deadline_to_receive_loan"],
+                name="loanprofile_status_deadline",
+            ),
+            models.Index(
+                fields=["business_type", "status"],
+                name="loanprofile_btype_status",
+            ),
+            models.Index(
+                fields=["deadline_to_receive_loan"],
+                condition=models.Q(status=LoanProfileStatus.APPROVED),
+                name="loanprofile_approved_deadline",
+            ),
+            models.Index(
+                AMOUNT_REMAINING, name="loanprofile_amount_remaining"
+            ),
+            GinIndex(
+                fields=["search_vector"], name="loanprofile_search_vector"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name}'s loan profile"
 
+    def funding_error(self, amount=0):
+        """Return why amount cannot be added to this loan profile, if so."""
+        if self.status != LoanProfileStatus.APPROVED:
+            return "Loan profile is not approved."
+        if self.deadline_to_receive_loan < timezone.localdate():
+            return "Loan profile deadline has passed."
+        if amount > self.total_amount_required - self.amount_lended_to_date:
+            return "Amount exceeds the amount remaining on the loan profile."
+        return None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and update_fields is None and not args:
+            # The funding totals are only written by F() updates, which a
+            # stale copy would undo, and the search vector by SQL.
+            skipped = {
+                *self.FUNDING_FIELDS,
+                "search_vector",
+                *self.get_deferred_fields(),
+            }
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+        if update_fields is None or set(update_fields) & set(
+            self.SEARCH_FIELDS
+        ):
+            type(self).objects.using(self._state.db).filter(
+                pk=self.pk
+            ).update_search_vector()
+
 
 class TransactionManager(models.Manager):
     """Manager for transactions."""
 
-    def create_transaction(self, lender, borrower, amount, **extra_fields):
-        """Create, save, and return a new transaction."""
+    BULK_CREATE_ATTEMPTS = 3
+
+    def create_transaction(
+        self, lender, borrower, amount, idempotency_key=None, **extra_fields
+    ):
+        """
+        Create, save, and return a new transaction. A transaction that
+        reuses the idempotency key of an existing one is not created and
+        the existing transaction is returned instead.
+        """
         # user must be User that is lender
         if lender.role != UserRole.LENDER:
             raise ValueError("Transaction must be initiated by lender.")
-        # TODO:
-        # borrower must be a loan-profile
-        # must be before the loan-profile cutoff
+        # borrower must be an approved loan profile before its deadline.
+        # Completed transactions are also checked against the amount
+        # remaining when save() reserves their funding.
+        error = (
+            LoanProfile.objects.db_manager(self._db)
+            .only(*LoanProfile.FUNDING_CHECK_FIELDS)
+            .get(pk=borrower.pk)
+            .funding_error()
+        )
+        if error:
+            existing = self._existing(idempotency_key)
+            if existing is None:
+                raise ValueError(error)
+            return existing
         transaction = self.model(
-            user=lender, loan_profile=borrower, amount=amount, **extra_fields
+            user=lender,
+            loan_profile=borrower,
+            amount=amount,
+            idempotency_key=idempotency_key,
+            **extra_fields,
         )
-        transaction.save(using=self._db)
+        try:
+            # save() runs in its own savepoint, so a conflicting insert
+            # leaves any outer transaction usable.
+            transaction.save(using=self._db)
+        except IntegrityError:
+            existing = self._existing(idempotency_key)
+            if existing is None:
+                raise
+            return existing
 
         return transaction
 
+    def _existing(self, idempotency_key):
+        """Return the transaction with an idempotency key, if any."""
+        if idempotency_key is None:
+            return None
+        try:
+            return self.get(idempotency_key=idempotency_key)
+        except self.model.DoesNotExist:
+            return None
+
+    def bulk_create_transactions(self, items, batch_size=1000):
+        """
+        Validate and insert many transactions at once.
+
+        items are dicts of user_id, loan_profile_id, amount and optionally
+        payment_method, status and idempotency_key. Lenders, loan profiles
+        and idempotency keys of the whole batch are checked with one query
+        each, valid items are inserted with bulk_create and the funding
+        totals of the affected loan profiles are recomputed in a single
+        UPDATE. Items reusing the idempotency key of an existing
+        transaction, or of an earlier item, resolve to that transaction.
+
+        Return {index: transaction} dicts of the created transactions and
+        of the existing transactions items resolved to, and an
+        {index: {field: [message]}} dict of the rejected items.
+        """
+        using = self._db or router.db_for_write(self.model)
+        keys = {
+            item["idempotency_key"]
+            for item in items
+            if item.get("idempotency_key") is not None
+        }
+        with atomic(using=using):
+            lender_ids = set(
+                User.objects.using(using)
+                .filter(
+                    pk__in={item["user_id"] for item in items},
+                    role=UserRole.LENDER,
+                )
+                .values_list("pk", flat=True)
+            )
+            # Lock the loan profiles, in a consistent order, so concurrent
+            # batches cannot interleave their funding total updates.
+            loan_profiles = {
+                loan_profile.pk: loan_profile
+                for loan_profile in LoanProfile.objects.using(using)
+                .select_for_update()
+                .filter(pk__in={item["loan_profile_id"] for item in items})
+                .order_by("pk")
+                .only(*LoanProfile.FUNDING_CHECK_FIELDS)
+            }
+
+            for attempt in range(self.BULK_CREATE_ATTEMPTS):
+                try:
+                    created, existing, errors = self._bulk_insert(
+                        items, keys, lender_ids, loan_profiles, batch_size
+                    )
+                    break
+                except IntegrityError:
+                    # A concurrent request committed one of the keys after
+                    # it was looked up; look the keys up again.
+                    if attempt + 1 == self.BULK_CREATE_ATTEMPTS:
+                        raise
+
+            funded_ids = {
+                transaction.loan_profile_id
+                for transaction in created.values()
+                if transaction._funded
+            }
+            if funded_ids:
+                LoanProfile.objects.using(using).filter(
+                    pk__in=funded_ids
+                ).recompute_funding_totals()
+
+        return created, existing, errors
+
+    def _bulk_insert(self, items, keys, lender_ids, loan_profiles, batch_size):
+        """Insert the valid items whose idempotency key is not yet used."""
+        using = self._db or router.db_for_write(self.model)
+        existing_by_key = (
+            {
+                transaction.idempotency_key: transaction
+                for transaction in self.using(using).filter(
+                    idempotency_key__in=keys
+                )
+            }
+            if keys
+            else {}
+        )
+        reserved = defaultdict(Decimal)
+        created = {}
+        repeats = {}
+        existing = {}
+        errors = {}
+        first_index_by_key = {}
+        for index, item in enumerate(items):
+            key = item.get("idempotency_key")
+            if key in existing_by_key:
+                existing[index] = existing_by_key[key]
+                continue
+            if key in first_index_by_key:
+                repeats[index] = first_index_by_key[key]
+                continue
+
+            item_errors = {}
+            if item["user_id"] not in lender_ids:
+                item_errors["user"] = [
+                    "Transaction must be initiated by lender."
+                ]
+            if item["amount"] < 0:
+                item_errors["amount"] = [
+                    "Transaction amount cannot be negative."
+                ]
+            loan_profile = loan_profiles.get(item["loan_profile_id"])
+            funded = item.get("status") == TransactionStatus.COMPLETED
+            if loan_profile is None:
+                item_errors["loan_profile"] = ["Loan profile does not exist."]
+            else:
+                # The loan profile rows are locked, so the capacity left
+                # after the earlier items of the batch can be checked here.
+                error = loan_profile.funding_error(
+                    reserved[loan_profile.pk] + item["amount"]
+                    if funded
+                    else 0
+                )
+                if error:
+                    item_errors["loan_profile"] = [error]
+            if item_errors:
+                errors[index] = item_errors
+                continue
+
+            if funded:
+                reserved[loan_profile.pk] += item["amount"]
+            created[index] = self.model(**item)
+            if key is not None:
+                first_index_by_key[key] = index
+
+        with atomic(using=using):
+            self.using(using).bulk_create(
+                created.values(), batch_size=batch_size
+            )
+        for transaction in created.values():
+            transaction._funded = transaction._funding_contribution()
+        for index, first_index in repeats.items():
+            existing[index] = created[first_index]
+        return created, existing, errors
+
+    def portfolio(self, lender):
+        """
+        Return the total lent by a lender, the number of loan profiles
+        they funded and the count and amount of their transactions by
+        status. One grouped query, answered from the lender history index.
+        """
+        totals = {
+            row["status"]: row
+            for row in self.filter(user=lender)
+            .order_by()
+            .values("status")
+            .annotate(
+                count=models.Count("pk"),
+                amount=models.Sum("amount"),
+                profiles=models.Count("loan_profile", distinct=True),
+            )
+        }
+        completed = totals.get(TransactionStatus.COMPLETED, {})
+        return {
+            "total_lent": completed.get("amount", Decimal("0.00")),
+            "profiles_funded": completed.get("profiles", 0),
+            "by_status": [
+                {
+                    "status": status,
+                    "count": totals.get(status, {}).get("count", 0),
+                    "amount": totals.get(status, {}).get(
+                        "amount", Decimal("0.00")
+                    ),
+                }
+                for status in TransactionStatus.values
+            ],
+        }
+
 
 class TransactionStatus(models.IntegerChoices):
     """Transaction Status choices."""
@@ -255,12 +721,15 @@ class Transaction(models.Model):
         LoanProfile,
         related_name="transactions",
         on_delete=models.PROTECT,
+        # Covered by the composite indexes in Meta.
+        db_index=False,
         help_text="The borrower (loan profile) for the transaction.",
     )
     user = models.ForeignKey(
         User,
         related_name="transactions",
         on_delete=models.PROTECT,
+        db_index=False,
         help_text="The lender for the transaction.",
     )
     amount = models.DecimalField(
@@ -270,7 +739,17 @@ class Transaction(models.Model):
     )
     transaction_date = models.DateTimeField(
         auto_now=True,
-        help_text="The date and time when the transaction occurred.",
+        help_text="The date and time when the transaction was last saved.",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        help_text="The date and time when the transaction was created.",
+    )
+    status_changed_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        help_text="The date and time when the status last changed.",
     )
     payment_method = models.IntegerField(
         choices=PaymentMethod.choices,
@@ -282,24 +761,339 @@ class Transaction(models.Model):
         default=TransactionStatus.PENDING,
         help_text="The status of the transaction.",
     )
+    idempotency_key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text=(
+            "A client-supplied key, such as a payment reference. Retried "
+            "creations with the same key return the original transaction."
+        ),
+    )
 
     objects = TransactionManager()
 
+    # The fields deciding what a transaction adds to the funding totals.
+    CONTRIBUTION_FIELDS = ("status", "amount", "loan_profile_id", "user_id")
+
     class Meta:
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
-        ordering = ["-transaction_date"]
+        ordering = ["-created_at"]
+        # The included columns let the funding totals and the history of
+        # a loan profile or a lender be read from the index alone.
+        indexes = [
+            models.Index(
+                fields=["loan_profile", "status", "created_at"],
+                include=["user", "amount"],
+                name="transaction_profile_history",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                include=["loan_profile", "status", "amount"],
+                name="transaction_lender_history",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name} ----({self.amount})----> {self.loan_profile}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # With any of them deferred, they are read back on save instead.
+        if set(cls.CONTRIBUTION_FIELDS) <= set(field_names):
+            instance._funded = instance._funding_contribution()
+            instance._saved_status = instance.status
+        return instance
+
     def save(self, *args, **kwargs):
         if self.amount < 0:
             raise ValueError("Transaction amount cannot be negative.")
-        super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(type(self))
+        if not self._state.adding and not hasattr(self, "_funded"):
+            self._load_saved_contribution(using)
+        if not self._state.adding and self.status != getattr(
+            self, "_saved_status", self.status
+        ):
+            self.status_changed_at = timezone.now()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "status_changed_at",
+                }
+        with atomic(using=using):
+            super().save(*args, **kwargs)
+            self._sync_funding_totals(using)
+        self._saved_status = self.status
+
+    def _load_saved_contribution(self, using):
+        """Read the contribution fields as saved, some being deferred."""
+        saved = (
+            type(self)
+            ._base_manager.using(using)
+            .filter(pk=self.pk)
+            .values(*self.CONTRIBUTION_FIELDS)
+            .first()
+        )
+        if saved is None:
+            self._funded = None
+            return
+        saved = type(self)(**saved)
+        self._funded = saved._funding_contribution()
+        self._saved_status = saved.status
+
+    def _funding_contribution(self):
+        """
+        Return the (loan profile, lender, amount) this transaction adds to
+        the funding totals, or None when it does not count towards them.
+        """
+        if self.status != TransactionStatus.COMPLETED:
+            return None
+        return (self.loan_profile_id, self.user_id, Decimal(str(self.amount)))
+
+    def _sync_funding_totals(self, using):
+        """Apply this transaction's change to the loan profile totals."""
+        previous = getattr(self, "_funded", None)
+        current = self._funding_contribution()
+        self._funded = current
+        if previous == current:
+            return
+
+        if previous and current and previous[:2] == current[:2]:
+            self._update_funding(using, current[0], current[2] - previous[2])
+        else:
+            if previous:
+                self._adjust_funding_totals(using, *previous, sign=-1)
+            if current:
+                self._adjust_funding_totals(using, *current, sign=1)
+        funding_totals_changed.send(
+            sender=LoanProfile,
+            using=using,
+            loan_profile_ids={
+                contribution[0]
+                for contribution in (previous, current)
+                if contribution
+            },
+        )
+
+        loan_profile_field = self._meta.get_field("loan_profile")
+        if loan_profile_field.is_cached(self):
+            self.loan_profile.refresh_from_db(
+                using=using,
+                fields=(*LoanProfile.FUNDING_FIELDS, "updated_at"),
+            )
+
+    def _adjust_funding_totals(
+        self, using, loan_profile_id, user_id, amount, sign
+    ):
+        """Add or remove one completed contribution from a loan profile."""
+        loan_profiles = LoanProfile.objects.using(using).filter(
+            pk=loan_profile_id
+        )
+        self._update_funding(
+            using,
+            loan_profile_id,
+            sign * amount,
+            completed_transaction_count=models.F(
+                "completed_transaction_count"
+            )
+            + sign,
+        )
+        # The update above holds the loan profile row lock until commit,
+        # so this check sees any contribution by the same lender that was
+        # committed concurrently.
+        lender_has_other_contributions = (
+            Transaction.objects.using(using)
+            .filter(
+                loan_profile_id=loan_profile_id,
+                user_id=user_id,
+                status=TransactionStatus.COMPLETED,
+            )
+            .exclude(pk=self.pk)
+            .exists()
+        )
+        if not lender_has_other_contributions:
+            loan_profiles.update(lender_count=models.F("lender_count") + sign)
+
+    def _update_funding(self, using, loan_profile_id, amount, **updates):
+        """
+        Add amount to the amount lended to date of a loan profile, along
+        with any other updates. A positive amount is reserved by a single
+        conditional UPDATE matching only while the loan profile can accept
+        it, so concurrent contributions cannot overfund it.
+        """
+        loan_profiles = LoanProfile.objects.using(using).filter(
+            pk=loan_profile_id
+        )
+        if amount > 0:
+            loan_profiles = loan_profiles.fundable(amount)
+        updated = loan_profiles.update(
+            amount_lended_to_date=models.F("amount_lended_to_date") + amount,
+            updated_at=timezone.now(),
+            **updates,
+        )
+        if not updated:
+            loan_profile = (
+                LoanProfile.objects.using(using)
+                .only(*LoanProfile.FUNDING_CHECK_FIELDS)
+                .get(pk=loan_profile_id)
+            )
+            raise ValueError(
+                loan_profile.funding_error(amount)
+                or "Loan profile cannot accept this amount."
+            )
 
     def delete(self, *args, **kwargs):
         raise ValidationError("Transaction cannot be deleted.")
 
     def delete_queryset(self, qs, *args, **kwargs):
         raise ValidationError("Bulk deletion is not allowed for Transactions.")
+
+
+class MaterializedViewManager(models.Manager):
+    """Manager for models backed by a materialized view."""
+
+    def refresh(self, concurrently=True):
+        """
+        Recompute the view. A concurrent refresh lets reads continue
+        while it runs, which needs the unique index on the view.
+        """
+        using = router.db_for_write(self.model)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "REFRESH MATERIALIZED VIEW "
+                f"{'CONCURRENTLY ' if concurrently else ''}"
+                f"{self.model._meta.db_table}"
+            )
+
+
+class PlatformStats(models.Model):
+    """
+    Platform-wide funding statistics, as of the last refresh of the
+    core_platform_stats materialized view. The view has a single row.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    total_funded = models.DecimalField(max_digits=14, decimal_places=2)
+    active_profiles = models.IntegerField()
+    lenders = models.IntegerField()
+    refreshed_at = models.DateTimeField()
+
+    objects = MaterializedViewManager()
+
+    class Meta:
+        managed = False
+        db_table = "core_platform_stats"
+        verbose_name_plural = "Platform stats"
+
+
+class CountryStats(models.Model):
+    """
+    Funding statistics of the loan profiles of borrowers in a country, as
+    of the last refresh of the core_country_stats materialized view.
+    """
+
+    country = models.OneToOneField(
+        Country,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    total_funded = models.DecimalField(max_digits=14, decimal_places=2)
+    active_profiles = models.IntegerField()
+    lenders = models.IntegerField()
+
+    objects = MaterializedViewManager()
+
+    class Meta:
+        managed = False
+        db_table = "core_country_stats"
+        verbose_name_plural = "Country stats"
+
+
+class JobStatus(models.IntegerChoices):
+    """Background job status choices."""
+
+    QUEUED = 1, "Queued"  # Waiting for a worker, or for its run_at
+    RUNNING = 2, "Running"  # Claimed by a worker
+    DEAD = 3, "Dead"  # Failed max_attempts times, kept for inspection
+
+
+class Job(models.Model):
+    """
+    A background job, run by the run_worker command; see core/jobs.py.
+    Jobs are deleted once they succeed.
+    """
+
+    task = models.CharField(
+        max_length=255,
+        help_text="The name of the task to run.",
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="The keyword arguments of the task.",
+    )
+    unique_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text="At most one queued job of the task has this key.",
+    )
+    status = models.IntegerField(
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of times the job was started.",
+    )
+    max_attempts = models.PositiveIntegerField(
+        help_text="The number of attempts after which the job is dead.",
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="The time from which the job may run.",
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="The time the last attempt started.",
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="The traceback of the last failed attempt.",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run_at"]
+        # Workers only look for queued jobs that are due and running jobs
+        # that stalled, so the partial indexes stay small however many
+        # dead jobs are kept.
+        indexes = [
+            models.Index(
+                fields=["run_at"],
+                condition=models.Q(status=JobStatus.QUEUED),
+                name="job_queued_run_at",
+            ),
+            models.Index(
+                fields=["started_at"],
+                condition=models.Q(status=JobStatus.RUNNING),
+                name="job_running_started_at",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "unique_key"],
+                condition=models.Q(status=JobStatus.QUEUED),
+                name="job_unique_queued",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk}"
@@ -0,0 +1,253 @@
+"""
+Monthly range partitioning of the transaction ledger.
+
+convert() turns core_transaction into a table partitioned by month on
+PARTITION_KEY, and create_partitions() adds the partitions of the
+coming months. Both are run by the partition_transactions command.
+The key is Transaction.created_at, which never changes, so rows stay in
+the partition they were created in.
+
+Partitioning changes what the database can enforce:
+
+* The primary key becomes (id, PARTITION_KEY). Ids still come from the
+  same sequence, so they stay unique.
+* Unique indexes must include the partition key, so the uniqueness of
+  Transaction.idempotency_key moves to the IDEMPOTENCY_TABLE registry,
+  maintained by a trigger. A duplicate key still raises a unique
+  violation, which Django reports as an IntegrityError.
+* Rows outside the monthly partitions land in a default partition. A
+  month cannot be added while the default partition holds its rows.
+* Migrations can still add columns and indexes to the partitioned
+  table, but not unique constraints without the partition key.
+
+Views reading the table, such as the statistics materialized views, are
+dropped and recreated around the conversion.
+"""
+
+from datetime import date
+
+from django.db import connection, transaction
+
+from core.models import Transaction
+
+
+TABLE = Transaction._meta.db_table
+PARTITION_KEY = "created_at"
+DEFAULT_PARTITION = f"{TABLE}_default"
+IDEMPOTENCY_TABLE = f"{TABLE}_idempotency_key"
+
+IDEMPOTENCY_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION {IDEMPOTENCY_TABLE}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.idempotency_key IS NOT NULL
+       AND (TG_OP = 'DELETE'
+            OR NEW.idempotency_key IS DISTINCT FROM OLD.idempotency_key)
+    THEN
+        DELETE FROM {IDEMPOTENCY_TABLE} WHERE key = OLD.idempotency_key;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.idempotency_key IS NOT NULL
+       AND (TG_OP = 'INSERT'
+            OR NEW.idempotency_key IS DISTINCT FROM OLD.idempotency_key)
+    THEN
+        INSERT INTO {IDEMPOTENCY_TABLE} (key) VALUES (NEW.idempotency_key);
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+-- Moving a row to another partition deletes and inserts it, which
+-- releases and claims its key again.
+CREATE TRIGGER {IDEMPOTENCY_TABLE}
+BEFORE INSERT OR UPDATE OR DELETE ON {TABLE}
+FOR EACH ROW EXECUTE FUNCTION {IDEMPOTENCY_TABLE}();
+"""
+
+
+def add_months(month, count):
+    """Return the first day of the month count months after month."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Return the name of the partition holding a month."""
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def partition_key(cursor):
+    """
+    Return the column the ledger table is partitioned by, or None when
+    it is not partitioned.
+    """
+    cursor.execute(
+        "SELECT attname FROM pg_partitioned_table "
+        "JOIN pg_attribute ON attrelid = partrelid "
+        "AND attnum = partattrs[0] WHERE partrelid = %s::regclass",
+        [TABLE],
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def is_partitioned(cursor):
+    """Return whether the ledger table is partitioned by PARTITION_KEY."""
+    return partition_key(cursor) == PARTITION_KEY
+
+
+def partitions(cursor):
+    """Return the names of the partitions of the ledger table."""
+    cursor.execute(
+        "SELECT inhrelid::regclass::text FROM pg_inherits "
+        "WHERE inhparent = %s::regclass ORDER BY 1",
+        [TABLE],
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def create_partitions(cursor, first_month, last_month):
+    """
+    Create the missing monthly partitions from first_month through
+    last_month and return the names of those created.
+    """
+    existing = set(partitions(cursor))
+    created = []
+    month = first_month.replace(day=1)
+    while month <= last_month:
+        name = partition_name(month)
+        if name not in existing:
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [f"{month} 00:00+00", f"{add_months(month, 1)} 00:00+00"],
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def _definitions(cursor, table):
+    """Return the index and foreign key definitions of a table."""
+    cursor.execute(
+        "SELECT indisunique, pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    indexes = [
+        # Unique indexes without the partition key are not allowed.
+        definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+        if unique
+        else definition
+        for unique, definition in cursor.fetchall()
+    ]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _dependent_views(cursor, table):
+    """
+    Return the statements recreating the views and materialized views
+    that read a table, with the indexes of the materialized views.
+    """
+    cursor.execute(
+        "SELECT DISTINCT view.oid::regclass::text, view.relkind, "
+        "pg_get_viewdef(view.oid) FROM pg_depend "
+        "JOIN pg_rewrite ON pg_rewrite.oid = pg_depend.objid "
+        "JOIN pg_class view ON view.oid = pg_rewrite.ev_class "
+        "WHERE pg_depend.refobjid = %s::regclass "
+        "AND view.oid <> pg_depend.refobjid ORDER BY 1",
+        [table],
+    )
+    views = []
+    for name, kind, definition in cursor.fetchall():
+        materialized = kind == "m"
+        statements = [
+            f"CREATE {'MATERIALIZED ' if materialized else ''}VIEW {name} "
+            f"AS {definition}"
+        ]
+        if materialized:
+            cursor.execute(
+                "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+                "WHERE indrelid = %s::regclass",
+                [name],
+            )
+            statements += [index for index, in cursor.fetchall()]
+        views.append((name, materialized, statements))
+    return views
+
+
+def convert(cursor, last_month):
+    """
+    Rebuild the ledger table as a table partitioned by PARTITION_KEY,
+    with partitions from the month of its oldest row through last_month,
+    and return the names of the partitions created. A table partitioned
+    by another column is re-partitioned. Runs in one transaction holding
+    an exclusive lock on the table, so writes wait until it finishes.
+    """
+    old_table = f"{TABLE}_unpartitioned"
+    with transaction.atomic(using=connection.alias):
+        # Run deferred foreign key checks of earlier writes in the same
+        # transaction now, as they would block dropping the old table.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+        indexes, foreign_keys = _definitions(cursor, TABLE)
+        views = _dependent_views(cursor, TABLE)
+        for name, materialized, _ in views:
+            cursor.execute(
+                f"DROP {'MATERIALIZED ' if materialized else ''}VIEW {name}"
+            )
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f"SELECT min({PARTITION_KEY})::date FROM {TABLE}")
+        oldest = cursor.fetchone()[0] or date.today()
+
+        # Old partitions are dropped with the old table, but their names
+        # are needed for the new ones.
+        for name in partitions(cursor):
+            cursor.execute(f"ALTER TABLE {name} RENAME TO {name}_old")
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old_table}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {old_table} INCLUDING DEFAULTS "
+            f"INCLUDING CONSTRAINTS) PARTITION BY RANGE ({PARTITION_KEY})"
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, {PARTITION_KEY})"
+        )
+        created = create_partitions(cursor, oldest, last_month)
+        cursor.execute(
+            f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"
+        )
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old_table}")
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+        cursor.execute(f"DROP TABLE {old_table}")
+
+        # Indexes are built after the copy, which is faster than
+        # maintaining them row by row.
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}"
+            )
+
+        cursor.execute(f"DROP TABLE IF EXISTS {IDEMPOTENCY_TABLE}")
+        cursor.execute(
+            f"CREATE TABLE {IDEMPOTENCY_TABLE} "
+            "(key varchar(255) PRIMARY KEY)"
+        )
+        cursor.execute(
+            f"INSERT INTO {IDEMPOTENCY_TABLE} (key) SELECT idempotency_key "
+            f"FROM {TABLE} WHERE idempotency_key IS NOT NULL"
+        )
+        cursor.execute(IDEMPOTENCY_TRIGGER)
+        for _, _, statements in views:
+            for statement in statements:
+                cursor.execute(statement)
+    return created + [DEFAULT_PARTITION]
@@ -0,0 +1,21 @@
+"""
+Renderers for the core app.
+"""
+
+from rest_framework import renderers
+
+from core import metrics
+
+
+class PrometheusRenderer(renderers.BaseRenderer):
+    """Render a metrics registry snapshot in the Prometheus text format."""
+
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None and response.exception:
+            return str(data.get("detail", ""))
+        return metrics.render(data)
@@ -0,0 +1,201 @@
+"""
+Routing of reads to read replicas.
+
+Replicas are configured with DB_REPLICAS and listed in
+settings.DATABASE_REPLICAS. ReplicaRouter sends reads to a replica only
+within replica_reads(), which ReplicaReadMixin enters for the safe
+requests of views that tolerate slightly stale data, and only to the
+replicas lagging the primary by at most REPLICA_MAX_LAG seconds. Every
+read of a replica_reads() block uses the same replica, so a response is
+not computed from replicas with different lags. Writes, and every read
+elsewhere, use the primary.
+
+A client that writes is pinned to the primary for REPLICA_PIN_SECONDS by
+the cookie ReplicaPinMiddleware sets, so it reads its own writes. A
+response read from a replica is only cached when may_predate() shows
+the replica replayed the write that last invalidated the cache, as a
+lagging replica would otherwise cache data older than that write.
+"""
+
+import contextvars
+import logging
+import math
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "db_primary"
+
+# Seconds the replica is behind the primary. A replica which has replayed
+# everything it received is not behind, however old its last commit.
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery()
+         OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+class _ReplicaChoice:
+    """The replica of a replica_reads() block, chosen on its first read."""
+
+    def __init__(self):
+        self.chosen = False
+        self.alias = None
+        # The time.time() of the primary's state the replica holds at
+        # least, as the replica's lag grows at most a second per second.
+        self.as_of = math.inf
+
+    def choose(self):
+        """Return the replica to read from, or None for the primary."""
+        if not self.chosen:
+            replicas = available_replicas()
+            # No choice falls through to the primary.
+            self.alias = random.choice(replicas) if replicas else None
+            if self.alias is not None:
+                self.as_of = time.time() - lag_monitor.max_lag(self.alias)
+            self.chosen = True
+        return self.alias
+
+
+_reads = contextvars.ContextVar("replica_reads", default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads of the enclosed block to one replica."""
+    token = _reads.set(_ReplicaChoice())
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+def reading_from_replicas():
+    """Return whether reads are sent to a replica."""
+    return _reads.get() is not None
+
+
+class LagMonitor:
+    """
+    The replication lag of every replica, measured at most every
+    REPLICA_LAG_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._measured = {}
+
+    def lag(self, alias):
+        """Return the lag of a replica in seconds."""
+        now = time.monotonic()
+        measured = self._measured.get(alias)
+        if (
+            measured is None
+            or now - measured[0] >= settings.REPLICA_LAG_CHECK_INTERVAL
+        ):
+            measured = (now, self.measure(alias))
+            self._measured[alias] = measured
+        return measured[1]
+
+    def max_lag(self, alias):
+        """
+        Return the most a replica may lag now: its lag when measured,
+        which grows at most a second per second since.
+        """
+        lag = self.lag(alias)
+        return lag + time.monotonic() - self._measured[alias][0]
+
+    def measure(self, alias):
+        """Query the lag of a replica, infinite when it is unreachable."""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                return float(cursor.fetchone()[0] or 0)
+        except DatabaseError as error:
+            logger.warning("Replica %s is unavailable: %s", alias, error)
+            return math.inf
+
+    def reset(self):
+        self._measured.clear()
+
+
+lag_monitor = LagMonitor()
+
+
+def available_replicas():
+    """Return the replicas lagging at most REPLICA_MAX_LAG seconds."""
+    return [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if lag_monitor.lag(alias) <= settings.REPLICA_MAX_LAG
+    ]
+
+
+def may_predate(timestamp):
+    """
+    Return whether the data read in the current replica_reads() block
+    may be older than timestamp, a time.time(), because the replica read
+    from may not have replayed the primary's commits up to then.
+    """
+    choice = _reads.get()
+    return choice is not None and choice.as_of < timestamp
+
+
+class ReplicaRouter:
+    """Route the reads within replica_reads() to an available replica."""
+
+    def db_for_read(self, model, **hints):
+        choice = _reads.get()
+        return None if choice is None else choice.choose()
+
+    def db_for_write(self, model, **hints):
+        # Never where the instance was read from.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Read from a replica on the safe requests of a view, or of its
+    replica_read_actions if set, unless the client is pinned to the
+    primary.
+    """
+
+    replica_read_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.reads_from_replica(request):
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def reads_from_replica(self, request):
+        """Return whether a request may read from a replica."""
+        if request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return False
+        if self.replica_read_actions is None:
+            return True
+        # Viewsets know the action of a request before dispatching it.
+        action_map = getattr(self, "action_map", {})
+        return action_map.get(request.method.lower()) in (
+            self.replica_read_actions
+        )
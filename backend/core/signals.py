@@ -0,0 +1,11 @@
+"""
+Custom signals.
+"""
+
+from django.dispatch import Signal
+
+
+# Sent after the stored funding totals of loan profiles change, with the
+# affected primary keys as loan_profile_ids, or None after bulk updates,
+# and the database alias as using.
+funding_totals_changed = Signal()
@@ -0,0 +1,40 @@
+"""
+Opening database connections when a server process starts.
+
+docker-compose starts the server once wait_for_db has seen the database
+up, and gunicorn loads the application in every worker after forking, so
+app/wsgi.py and app/asgi.py call warm_up() when they are loaded: the
+first request then reuses a connection kept for CONN_MAX_AGE rather than
+waiting for a new one. The threaded runserver serves every request on a
+new thread, which connects anew whatever was opened here.
+"""
+
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from core import asyncdb
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(asgi, using=DEFAULT_DB_ALIAS):
+    """
+    Open the database connections requests will use, over ASGI when asgi
+    is true and over WSGI otherwise, and return their number.
+    """
+    try:
+        if asgi:
+            opened = asyncdb.warm_up(using)
+        else:
+            # A WSGI server that does not start a thread per request
+            # serves on the thread loading the application.
+            connections[using].ensure_connection()
+            opened = 1
+    except OperationalError as error:
+        # Requests connect on demand once the database is back.
+        logger.warning("Database connection warm-up failed: %s", error)
+        return 0
+    logger.info("Opened %d database connections", opened)
+    return opened
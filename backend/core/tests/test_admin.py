@@ -2,10 +2,16 @@
 Tests for the Django admin modifications.
 """
 
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from core import models
+
 
 class AdminSiteTests(TestCase):
     """Tests for Django admin."""
@@ -45,3 +51,46 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_loan_profiles_listed_with_constant_queries(self):
+        """Test the loan profile changelist does not query per row."""
+        url = reverse("admin:core_loanprofile_changelist")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url)
+
+        for i in range(3):
+            models.LoanProfile.objects.create(
+                user=self.user,
+                photoURL="www.example.com/photo.jpg",
+                title=f"Profile {i}",
+                description="Test description",
+                business_type="Food",
+                total_amount_required=Decimal("500.00"),
+            )
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+
+        self.assertContains(res, "Test User&#x27;s loan profile")
+        self.assertEqual(len(queries), len(baseline))
+
+    def test_retry_dead_jobs(self):
+        """Test dead jobs can be queued again from the job changelist."""
+        job = models.Job.objects.create(
+            task="stats.tasks.refresh_stats",
+            unique_key="all",
+            status=models.JobStatus.DEAD,
+            attempts=5,
+            max_attempts=5,
+        )
+
+        res = self.client.post(
+            reverse("admin:core_job_changelist"),
+            {"action": "retry", "_selected_action": [job.pk]},
+        )
+
+        job.refresh_from_db()
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(job.status, models.JobStatus.QUEUED)
+        self.assertEqual(job.attempts, 0)
+        self.assertIsNone(job.unique_key)
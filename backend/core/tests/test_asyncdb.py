@@ -0,0 +1,184 @@
+"""
+Tests for async views over the database thread pool.
+"""
+
+import asyncio
+import threading
+
+from asgiref.sync import SyncToAsync, async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import resolve, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import asyncdb, metrics
+
+
+ME_URL = reverse("user:me")
+LOAN_PROFILES_URL = reverse("loan_profile:loanprofile-list")
+
+
+class HelloView(APIView):
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        return Response({"hello": "world"})
+
+
+class AsyncViewTests(SimpleTestCase):
+    """Test wrapping views as async views."""
+
+    def test_read_paths_are_async(self):
+        """Test the read endpoints are served by async views over ASGI."""
+        for url in (ME_URL, LOAN_PROFILES_URL):
+            view = resolve(url, urlconf=settings.ASGI_URLCONF).func
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+            self.assertTrue(view.csrf_exempt)
+
+    def test_every_path_is_async(self):
+        """
+        Test every endpoint, included ones too, is an async view over
+        ASGI, and a synchronous one over WSGI.
+        """
+        for name in (
+            "user:token",
+            "user:create",
+            "user:portfolio",
+            "transaction:bulk",
+            "transaction:export",
+            "stats:stats",
+            "geo:countries",
+            "metrics",
+            "admin:index",
+            "admin:core_job_changelist",
+        ):
+            with self.subTest(name=name):
+                url = reverse(name)
+                asgi_view = resolve(url, urlconf=settings.ASGI_URLCONF).func
+                wsgi_view = resolve(url).func
+                self.assertTrue(asyncio.iscoroutinefunction(asgi_view))
+                self.assertFalse(asyncio.iscoroutinefunction(wsgi_view))
+
+    def test_response_rendered(self):
+        """Test DRF responses are rendered off the event loop."""
+        view = asyncdb.async_view(HelloView.as_view())
+
+        response = async_to_sync(view)(RequestFactory().get("/"))
+
+        self.assertTrue(response.is_rendered)
+        self.assertEqual(response.content, b'{"hello":"world"}')
+
+
+@override_settings(ASYNC_DB_THREADS=2)
+class DatabaseThreadPoolTests(TransactionTestCase):
+    """Test async views running on the database thread pool."""
+
+    def tearDown(self):
+        # Pool threads keep their connections, which would keep the test
+        # database from being dropped.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def close():
+            barrier.wait()
+            connections.close_all()
+
+        executor = asyncdb.get_executor()
+        for future in [executor.submit(close) for _ in range(2)]:
+            future.result()
+
+    def test_requests_run_concurrently(self):
+        """Test concurrent requests are served by separate threads."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def view(request):
+            barrier.wait()
+            return HttpResponse(threading.current_thread().name)
+
+        async def serve_two():
+            handler = asyncdb.async_view(view)
+            return await asyncio.gather(
+                *(handler(RequestFactory().get("/")) for _ in range(2))
+            )
+
+        responses = async_to_sync(serve_two)()
+
+        names = {response.content for response in responses}
+        self.assertEqual(len(names), 2)
+
+    def test_warm_up(self):
+        """Test warming up opens a connection on every pool thread."""
+        opened = asyncdb.warm_up()
+
+        def connected():
+            barrier.wait()
+            return connection.connection is not None
+
+        barrier = threading.Barrier(2, timeout=5)
+        executor = asyncdb.get_executor()
+        futures = [executor.submit(connected) for _ in range(2)]
+        self.assertEqual(opened, 2)
+        self.assertEqual([future.result() for future in futures], [True] * 2)
+
+    @override_settings(
+        MIDDLEWARE=["core.middleware.RequestMetricsMiddleware"]
+        + settings.MIDDLEWARE,
+        ROOT_URLCONF=settings.ASGI_URLCONF,
+    )
+    def test_authenticated_read(self):
+        """Test a read on the pool authenticates and counts its queries."""
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        token = Token.objects.create(user=user)
+        metrics.registry.reset()
+
+        async def get():
+            return await AsyncClient().get(
+                ME_URL, AUTHORIZATION=f"Token {token.key}"
+            )
+
+        res = async_to_sync(get)()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["email"], "test@example.com")
+        samples = metrics.registry.snapshot()["http_request_db_queries"]
+        self.assertGreater(samples[0]["sum"], 0)
+
+
+@override_settings(ASYNC_DB_THREADS=0)
+class ThreadSensitiveWarmUpTests(TransactionTestCase):
+    """Test warming up without a database thread pool."""
+
+    def close(self):
+        SyncToAsync.single_thread_executor.submit(
+            connections.close_all
+        ).result()
+
+    def setUp(self):
+        self.close()
+        self.addCleanup(self.close)
+
+    def test_warm_up(self):
+        """Test warming up connects the thread ASGI requests run on."""
+
+        def connected():
+            return connection.connection is not None
+
+        opened = asyncdb.warm_up()
+
+        self.assertEqual(opened, 1)
+        self.assertTrue(
+            asyncio.run(sync_to_async(connected, thread_sensitive=True)())
+        )
@@ -0,0 +1,81 @@
+"""
+Tests for the API benchmarks.
+"""
+
+from io import StringIO
+
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core import benchmarks
+
+
+class CompareTests(SimpleTestCase):
+    """Test comparing benchmark results with a baseline."""
+
+    baseline = {
+        "endpoint": {"queries": 2, "p50_ms": 10, "p95_ms": 20, "bytes": 1},
+    }
+
+    def result(self, queries=2, p95_ms=20):
+        return {
+            "endpoint": {
+                "queries": queries,
+                "p50_ms": 10,
+                "p95_ms": p95_ms,
+                "bytes": 1,
+            }
+        }
+
+    def test_no_regression(self):
+        """Test results within the baseline pass."""
+        self.assertEqual(
+            benchmarks.compare(self.result(p95_ms=29), self.baseline, 0.5),
+            [],
+        )
+
+    def test_query_count_regression(self):
+        """Test an extra query is reported."""
+        regressions = benchmarks.compare(
+            self.result(queries=3), self.baseline, 0.5
+        )
+
+        self.assertEqual(regressions, ["endpoint: 3 queries, baseline 2"])
+
+    def test_latency_regression(self):
+        """Test latency beyond the tolerance is reported."""
+        regressions = benchmarks.compare(
+            self.result(p95_ms=31), self.baseline, 0.5
+        )
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("p95 31ms", regressions[0])
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        values = list(range(1, 21))
+
+        self.assertEqual(benchmarks.percentile(values, 0.5), 10)
+        self.assertEqual(benchmarks.percentile(values, 0.95), 19)
+
+
+class RunTests(TransactionTestCase):
+    """Test running the benchmarks."""
+
+    def test_run_records_every_endpoint(self):
+        """Test each endpoint gets query counts, latency and size."""
+        benchmarks.seed(3, stdout=StringIO())
+
+        results = benchmarks.run(iterations=2)
+
+        self.assertEqual(
+            set(results),
+            {name for name, _ in benchmarks.endpoints()},
+        )
+        self.assertEqual(results["loanprofile-list-cached"]["queries"], 0)
+        self.assertEqual(
+            results["loanprofile-detail-new-connection"]["queries"],
+            results["loanprofile-detail"]["queries"],
+        )
+        for result in results.values():
+            self.assertGreater(result["bytes"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
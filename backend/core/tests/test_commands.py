@@ -2,13 +2,28 @@
 Test custom Django management commands.
 """
 
+import csv
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
-from django.core.management import call_command
+from django.core.management import call_command, CommandError
+from django.db import transaction
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+
+from cities_light.models import Country, City
+
+from core import models
+from core.management.commands.generate_sample_data import (
+    LOAN_PROFILE_STATUS_WEIGHTS,
+    SAMPLE_PASSWORD,
+)
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -34,3 +49,211 @@ class CommandsTestCase(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class ReconcileFundingTotalsCommandTests(TestCase):
+    """Test the reconcile_funding_totals command."""
+
+    def setUp(self):
+        borrower = models.User.objects.create_user(
+            email="borrower@example.com", password="testpass123"
+        )
+        lender = models.User.objects.create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=models.UserRole.LENDER,
+        )
+        self.loan_profile = models.LoanProfile.objects.create(
+            user=borrower,
+            photoURL="www.example.com/photo.jpg",
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            total_amount_required=Decimal("500.00"),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+        models.Transaction.objects.create_transaction(
+            lender=lender,
+            borrower=self.loan_profile,
+            amount=Decimal("60.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+        models.LoanProfile.objects.update(amount_lended_to_date=0)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        """Test drifted loan profiles are reported and repaired."""
+        out = StringIO()
+
+        call_command("reconcile_funding_totals", stdout=out)
+
+        self.assertIn(f"Loan profile {self.loan_profile.pk}", out.getvalue())
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("60.00")
+        )
+
+    def test_reconcile_dry_run_leaves_drift(self):
+        """Test a dry run only reports drift."""
+        out = StringIO()
+
+        call_command("reconcile_funding_totals", "--dry-run", stdout=out)
+
+        self.assertIn("1 loan profile(s) out of sync.", out.getvalue())
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(self.loan_profile.amount_lended_to_date, 0)
+
+
+class GenerateSampleDataCommandTests(TestCase):
+    """Test the generate_sample_data command."""
+
+    def generate(self, *args):
+        call_command(
+            "generate_sample_data", *args, "--seed", "7", stdout=StringIO()
+        )
+
+    def test_generate_sample_data(self):
+        """Test users, loan profiles and transactions are created."""
+        self.generate("3", "4", "--transactions", "20", "--batch-size", "2")
+
+        self.assertEqual(
+            models.User.objects.filter(role=models.UserRole.LENDER).count(),
+            3,
+        )
+        self.assertEqual(models.LoanProfile.objects.count(), 4)
+        self.assertEqual(models.Transaction.objects.count(), 20)
+        self.assertFalse(models.LoanProfile.objects.with_funding_drift())
+        user = models.User.objects.first()
+        self.assertTrue(user.check_password(SAMPLE_PASSWORD))
+
+    def test_generate_sample_data_search_vectors(self):
+        """Test every loan profile is searchable, approved or not."""
+        with patch.dict(
+            LOAN_PROFILE_STATUS_WEIGHTS,
+            {models.LoanProfileStatus.PENDING: 1},
+            clear=True,
+        ):
+            self.generate("1", "3", "--transactions", "0")
+
+        self.assertFalse(
+            models.LoanProfile.objects.filter(
+                search_vector__isnull=True
+            ).exists()
+        )
+
+    def test_generate_sample_data_never_overfunds(self):
+        """Test completed transactions stay within the amount required."""
+        self.generate(
+            "2", "2", "--transactions", "200", "--status-weights",
+            "completed=1",
+        )
+
+        for loan_profile in models.LoanProfile.objects.all():
+            self.assertLessEqual(
+                loan_profile.amount_lended_to_date,
+                loan_profile.total_amount_required,
+            )
+
+    def test_generate_sample_data_is_deterministic(self):
+        """Test the same seed generates the same data."""
+        runs = []
+        for _ in range(2):
+            with transaction.atomic():
+                self.generate("2", "3", "--transactions", "10")
+                runs.append(
+                    list(
+                        models.Transaction.objects.order_by("pk").values_list(
+                            "loan_profile__title", "amount", "status"
+                        )
+                    )
+                )
+                transaction.set_rollback(True)
+
+        self.assertEqual(runs[0], runs[1])
+
+    def test_generate_sample_data_status_weights(self):
+        """Test transaction statuses follow the given weights."""
+        self.generate(
+            "2", "5", "--transactions", "10", "--status-weights", "pending=1"
+        )
+
+        self.assertEqual(
+            set(models.Transaction.objects.values_list("status", flat=True)),
+            {models.TransactionStatus.PENDING},
+        )
+
+    def test_generate_sample_data_with_locations(self):
+        """Test users are assigned cities of their country."""
+        country = Country.objects.create(name="Country")
+        City.objects.create(name="City", country=country)
+
+        self.generate("2", "2", "--transactions", "0", "--with-locations")
+
+        self.assertFalse(
+            models.User.objects.exclude(country=country).exists()
+        )
+
+    def test_generate_sample_data_invalid_status_weights(self):
+        """Test invalid status weights are rejected."""
+        with self.assertRaises(CommandError):
+            self.generate("1", "1", "--status-weights", "unknown=5")
+
+
+class ExportTransactionsCommandTests(TestCase):
+    """Test the export_transactions command."""
+
+    def setUp(self):
+        lender = models.User.objects.create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=models.UserRole.LENDER,
+        )
+        loan_profile = models.LoanProfile.objects.create(
+            user=models.User.objects.create_user(
+                email="borrower@example.com", password="testpass123"
+            ),
+            photoURL="www.example.com/photo.jpg",
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            total_amount_required=Decimal("500.00"),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+        for transaction_status in (
+            models.TransactionStatus.COMPLETED,
+            models.TransactionStatus.FAILED,
+        ):
+            models.Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=loan_profile,
+                amount=Decimal("60.00"),
+                status=transaction_status,
+            )
+
+    def test_export_to_stdout(self):
+        """Test the ledger is written to stdout, filtered by status."""
+        out = StringIO()
+
+        call_command(
+            "export_transactions",
+            "--format",
+            "ndjson",
+            "--status",
+            "failed",
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["status"], "Failed")
+
+    def test_export_to_file(self):
+        """Test the ledger is written to a CSV file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.csv")
+
+            call_command("export_transactions", "--output", path)
+
+            with open(path, newline="") as output:
+                rows = list(csv.reader(output))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][0], "id")
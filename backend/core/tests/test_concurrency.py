@@ -0,0 +1,87 @@
+"""
+Tests for concurrent contributions to loan profiles.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+
+from core import models
+
+
+CONTRIBUTIONS = 200
+WORKERS = 16
+LENDERS = 20
+# A generous ceiling on the wall-clock time of the contributions, about
+# eight times what they take on a developer machine, which lock waits
+# serializing them, such as a table lock, still exceed.
+MAX_SECONDS = 30
+
+
+class FundingConcurrencyTests(TransactionTestCase):
+    """Test funding a loan profile from many connections at once."""
+
+    def setUp(self):
+        self.lenders = [
+            get_user_model().objects.create_user(
+                email=f"lender{n}@example.com",
+                password="testpass123",
+                role=models.UserRole.LENDER,
+            )
+            for n in range(LENDERS)
+        ]
+        self.loan_profile = models.LoanProfile.objects.create(
+            user=get_user_model().objects.create_user(
+                email="borrower@example.com", password="testpass123"
+            ),
+            photoURL="www.example.com/photo.jpg",
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            total_amount_required=Decimal("1000.00"),
+            deadline_to_receive_loan=date.today() + timedelta(days=30),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+
+    def contribute(self, n):
+        """Complete a contribution, returning whether it was accepted."""
+        try:
+            models.Transaction.objects.create_transaction(
+                lender=self.lenders[n % LENDERS],
+                borrower=self.loan_profile,
+                amount=Decimal("10.00"),
+                status=models.TransactionStatus.COMPLETED,
+            )
+            return True
+        except ValueError:
+            return False
+        finally:
+            connection.close()
+
+    def test_concurrent_contributions_never_overfund(self):
+        """
+        Test parallel contributions fill a loan profile exactly, keep its
+        totals consistent and do not wait on each other for long.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(WORKERS) as pool:
+            accepted = list(pool.map(self.contribute, range(CONTRIBUTIONS)))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(accepted.count(True), 100)
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("1000.00")
+        )
+        self.assertEqual(self.loan_profile.completed_transaction_count, 100)
+        self.assertEqual(self.loan_profile.lender_count, LENDERS)
+        self.assertFalse(models.LoanProfile.objects.with_funding_drift())
+        self.assertEqual(
+            models.Transaction.objects.count(), accepted.count(True)
+        )
+        self.assertLess(elapsed, MAX_SECONDS)
@@ -0,0 +1,70 @@
+"""
+Tests for the PostgreSQL backend with connection health checks.
+"""
+
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from core.db.postgresql.base import DatabaseWrapper
+
+
+class ConnectionHealthCheckTests(SimpleTestCase):
+    """Test checking persistent connections before reuse."""
+
+    databases = {"default"}
+
+    def connect(self, health_checks=True):
+        """Return a new connection to the test database."""
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_HEALTH_CHECKS": health_checks,
+        }
+        wrapper = DatabaseWrapper(settings_dict)
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def query(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone()[0]
+
+    def test_checked_once_per_request(self):
+        """Test a kept connection is checked on its first query only."""
+        wrapper = self.connect()
+
+        with patch.object(
+            wrapper, "is_usable", wraps=wrapper.is_usable
+        ) as is_usable:
+            self.query(wrapper)
+            self.assertEqual(is_usable.call_count, 0)
+
+            # A request starts.
+            wrapper.close_if_unusable_or_obsolete()
+            self.query(wrapper)
+            self.query(wrapper)
+
+        self.assertEqual(is_usable.call_count, 1)
+
+    def test_broken_connection_replaced(self):
+        """Test a broken connection is replaced before it is used."""
+        wrapper = self.connect()
+        broken = wrapper.connection
+        broken.close()
+
+        wrapper.close_if_unusable_or_obsolete()
+
+        self.assertEqual(self.query(wrapper), 1)
+        self.assertIsNot(wrapper.connection, broken)
+
+    def test_disabled(self):
+        """Test connections are not checked without CONN_HEALTH_CHECKS."""
+        wrapper = self.connect(health_checks=False)
+
+        with patch.object(wrapper, "is_usable") as is_usable:
+            wrapper.close_if_unusable_or_obsolete()
+            self.query(wrapper)
+
+        is_usable.assert_not_called()
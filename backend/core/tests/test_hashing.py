@@ -0,0 +1,92 @@
+"""
+Tests for password hashing on the bounded pool.
+"""
+
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import hashing, metrics
+
+
+TOKEN_URL = reverse("user:token")
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Test the bounded hashing pool."""
+
+    def test_run_records_request_metrics(self):
+        """Test hashes are timed towards the current request."""
+        pool = hashing.HashingPool(workers=1, queue_depth=0)
+        request_metrics, token = metrics.start_request()
+        try:
+            result = pool.run(sum, [1, 2])
+        finally:
+            metrics.end_request(token)
+
+        self.assertEqual(result, 3)
+        self.assertGreater(request_metrics.password_hash_time, 0)
+
+    def test_full_pool_rejects(self):
+        """Test hashes beyond the workers and queue fail fast."""
+        pool = hashing.HashingPool(workers=1, queue_depth=1)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        threads = [
+            threading.Thread(target=pool.run, args=(block,))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        try:
+            with self.assertRaises(hashing.HashingBusy):
+                pool.run(sum, [])
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(pool.run(sum, [1]), 1)
+
+
+class PasswordHashingApiTests(TestCase):
+    """Test sign-ins hash on the pool."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.payload = {"email": "test@example.com", "password": "testpass123"}
+
+    def test_busy_pool_returns_retry_after(self):
+        """Test a login is refused with Retry-After when the pool is full."""
+        with patch.object(
+            hashing.HashingPool, "run", side_effect=hashing.HashingBusy
+        ):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+    def test_rehash_on_login(self):
+        """Test a login rehashes a password made with other parameters."""
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(self.user.check_password("testpass123"))
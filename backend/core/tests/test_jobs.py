@@ -0,0 +1,260 @@
+"""
+Tests for the background job queue.
+"""
+
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job, JobStatus
+
+
+calls = []
+
+
+@jobs.task(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.task(name="tests.fail")
+def fail():
+    raise ValueError("boom")
+
+
+class JobTestCase:
+    def setUp(self):
+        calls.clear()
+        self.addCleanup(calls.clear)
+
+
+@override_settings(
+    JOB_MAX_ATTEMPTS=3,
+    JOB_RETRY_BACKOFF=10,
+    JOB_RETRY_MAX_BACKOFF=30,
+    JOB_TIMEOUT=60,
+)
+class JobQueueTests(JobTestCase, TestCase):
+    """Test queueing and running jobs."""
+
+    def test_run_job(self):
+        """Test a job runs with its arguments and is then deleted."""
+        job = jobs.enqueue(record, {"value": 1})
+
+        claimed = jobs.claim()
+        succeeded = jobs.run(claimed[0])
+
+        self.assertEqual(claimed, [job])
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertTrue(succeeded)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_task_names(self):
+        """Test tasks are named after their dotted path by default."""
+
+        @jobs.task
+        def task():
+            pass
+
+        self.assertEqual(
+            task.task_name,
+            f"{__name__}.JobQueueTests.test_task_names.<locals>.task",
+        )
+        self.assertEqual(record.task_name, "tests.record")
+
+    def test_delayed_job(self):
+        """Test a job is not claimed before its delay passes."""
+        jobs.enqueue(record, {"value": 1}, delay=60)
+
+        self.assertEqual(jobs.claim(), [])
+
+    def test_claim_oldest_first(self):
+        """Test due jobs are claimed in run_at order."""
+        later = jobs.enqueue(record, {"value": 1})
+        earlier = jobs.enqueue(record, {"value": 2})
+        Job.objects.filter(pk=earlier.pk).update(
+            run_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(jobs.claim(count=2), [earlier, later])
+        self.assertEqual(jobs.claim(), [])
+
+    def test_unique_key(self):
+        """Test one job per unique key is queued at a time."""
+        first = jobs.enqueue(record, {"value": 1}, unique_key="key")
+        jobs.enqueue(record, {"value": 2}, unique_key="key")
+        jobs.enqueue(fail, unique_key="key")
+
+        self.assertIsNone(first)
+        self.assertEqual(Job.objects.count(), 2)
+
+        # A running job no longer holds its key.
+        jobs.claim(count=2)
+        jobs.enqueue(record, {"value": 3}, unique_key="key")
+
+        self.assertEqual(Job.objects.count(), 3)
+
+    def test_retry_with_backoff(self):
+        """Test a failed job is retried after a growing delay."""
+        job = jobs.enqueue(fail)
+        delays = []
+        for attempt in range(2):
+            start = timezone.now()
+            with self.assertLogs("core.jobs", "ERROR"):
+                self.assertFalse(jobs.run(jobs.claim()[0]))
+            job.refresh_from_db()
+            delays.append((job.run_at - start).total_seconds())
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("ValueError: boom", job.last_error)
+        self.assertTrue(5 <= delays[0] <= 11)
+        self.assertTrue(10 <= delays[1] <= 21)
+
+    def test_backoff_capped(self):
+        """Test the retry delay stops growing at JOB_RETRY_MAX_BACKOFF."""
+        self.assertLessEqual(jobs.backoff(10), 30)
+        self.assertGreaterEqual(jobs.backoff(10), 15)
+
+    def test_dead_letter(self):
+        """Test a job failing max_attempts times is kept as dead."""
+        job = jobs.enqueue(fail, max_attempts=1)
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            jobs.run(jobs.claim()[0])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.DEAD)
+        self.assertEqual(jobs.claim(), [])
+
+    def test_unknown_task(self):
+        """Test a job of an unregistered task fails."""
+        Job.objects.create(task="tests.missing", max_attempts=1)
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            self.assertFalse(jobs.run(jobs.claim()[0]))
+        self.assertIn(
+            "Unknown task tests.missing", Job.objects.get().last_error
+        )
+
+    def test_requeue_stalled(self):
+        """Test jobs running past JOB_TIMEOUT are retried or dead."""
+        retried = jobs.enqueue(record, {"value": 1})
+        dead = jobs.enqueue(record, {"value": 2}, max_attempts=1)
+        jobs.claim(count=2)
+        Job.objects.update(started_at=timezone.now() - timedelta(minutes=2))
+
+        self.assertEqual(jobs.requeue_stalled(), 2)
+
+        retried.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual(retried.status, JobStatus.QUEUED)
+        self.assertIn("Timed out", retried.last_error)
+        self.assertEqual(dead.status, JobStatus.DEAD)
+
+    def test_retry_superseded_by_queued_job(self):
+        """Test a failed unique job gives way to one queued meanwhile."""
+        jobs.enqueue(fail, unique_key="key")
+        running = jobs.claim()[0]
+        jobs.enqueue(fail, unique_key="key")
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            self.assertFalse(jobs.run(running))
+
+        queued = Job.objects.get()
+        self.assertNotEqual(queued.pk, running.pk)
+        self.assertEqual(queued.status, JobStatus.QUEUED)
+
+    def test_stalled_job_superseded_by_queued_job(self):
+        """Test a stalled unique job gives way to one queued meanwhile."""
+        jobs.enqueue(record, {"value": 1}, unique_key="key")
+        stalled = jobs.claim()[0]
+        jobs.enqueue(record, {"value": 2}, unique_key="key")
+        Job.objects.filter(pk=stalled.pk).update(
+            started_at=timezone.now() - timedelta(minutes=2)
+        )
+
+        self.assertEqual(jobs.requeue_stalled(), 1)
+
+        self.assertEqual(Job.objects.get().kwargs, {"value": 2})
+
+    def test_stale_attempt_kept(self):
+        """Test a lost attempt finishing late leaves the retry alone."""
+        jobs.enqueue(record, {"value": 1})
+        stale = jobs.claim()[0]
+        Job.objects.update(started_at=timezone.now() - timedelta(minutes=2))
+        jobs.requeue_stalled()
+        retry = jobs.claim()[0]
+
+        jobs.run(stale)
+
+        self.assertEqual(Job.objects.get().started_at, retry.started_at)
+
+    def test_enqueue_rolled_back(self):
+        """Test a job enqueued in a rolled back transaction is dropped."""
+        try:
+            with transaction.atomic():
+                jobs.enqueue(record, {"value": 1})
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertFalse(Job.objects.exists())
+
+
+class WorkerTests(JobTestCase, TransactionTestCase):
+    """Test running jobs on worker threads."""
+
+    def test_skip_locked(self):
+        """Test a job claimed by another worker is skipped, not waited on."""
+        locked = jobs.enqueue(record, {"value": 1})
+        free = jobs.enqueue(record, {"value": 2})
+        Job.objects.filter(pk=locked.pk).update(
+            run_at=timezone.now() - timedelta(minutes=1)
+        )
+        holding = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Job.objects.select_for_update().get(pk=locked.pk)
+                    holding.set()
+                    release.wait(timeout=10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            holding.wait(timeout=10)
+            claimed = jobs.claim()
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(claimed, [free])
+
+    def test_run_worker(self):
+        """Test the run_worker command runs every due job."""
+        for value in range(5):
+            jobs.enqueue(record, {"value": value})
+        jobs.enqueue(fail, max_attempts=1)
+        out = StringIO()
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            call_command(
+                "run_worker", "--burst", "--concurrency", "2", stdout=out
+            )
+
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertEqual(Job.objects.get().status, JobStatus.DEAD)
+        self.assertIn("5 job(s) succeeded, 1 failed", out.getvalue())
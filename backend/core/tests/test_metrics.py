@@ -0,0 +1,191 @@
+"""
+Tests for request metrics.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.middleware import RequestMetricsMiddleware
+from core.models import LoanProfile
+from loan_profile import cache
+
+
+METRICS_URL = reverse("metrics")
+LOAN_PROFILES_ROUTE = "loan_profile:loanprofile-list"
+LOAN_PROFILES_URL = reverse(LOAN_PROFILES_ROUTE)
+WITH_METRICS = override_settings(
+    MIDDLEWARE=["core.middleware.RequestMetricsMiddleware"]
+    + settings.MIDDLEWARE
+)
+
+
+class HistogramTests(SimpleTestCase):
+    """Test metric histograms."""
+
+    def test_buckets_are_cumulative(self):
+        """Test each bucket counts every value up to its bound."""
+        histogram = metrics.Histogram((1, 5))
+        for value in (0, 1, 3, 9):
+            histogram.observe(value)
+
+        self.assertEqual(
+            histogram.snapshot(),
+            {"buckets": {"1": 2, "5": 3, "+Inf": 4}, "sum": 13, "count": 4},
+        )
+
+
+@WITH_METRICS
+class RequestMetricsMiddlewareTests(TestCase):
+    """Test the request metrics middleware."""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        metrics.registry.reset()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass123"
+        )
+        LoanProfile.objects.create(
+            user=user,
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+        )
+
+    def test_server_timing_header(self):
+        """Test responses report their wall, database and serializer time."""
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        timing = res["Server-Timing"]
+        self.assertRegex(timing, r"^total;dur=\d+\.\d\d, ")
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries, 0 duplicate"', timing)
+        self.assertRegex(timing, r"serializer;dur=(?!0\.00)\d+\.\d\d$")
+
+    def test_records_histograms_by_route(self):
+        """Test requests are aggregated by URL name and method."""
+        self.client.get(LOAN_PROFILES_URL)
+        self.client.get(LOAN_PROFILES_URL)
+
+        samples = metrics.registry.snapshot()["http_request_db_queries"]
+
+        self.assertEqual(len(samples), 1)
+        self.assertEqual(samples[0]["route"], LOAN_PROFILES_ROUTE)
+        self.assertEqual(samples[0]["method"], "GET")
+        self.assertEqual(samples[0]["count"], 2)
+        # The second request is served from the list page cache.
+        self.assertEqual(samples[0]["sum"], 2)
+
+    def test_unmatched_routes_share_a_label(self):
+        """Test unknown URLs do not create a series per path."""
+        self.client.get("/does-not-exist/")
+
+        samples = metrics.registry.snapshot()["http_request_duration_seconds"]
+
+        self.assertEqual(samples[0]["route"], "unmatched")
+
+    def test_duplicate_queries(self):
+        """Test repeated queries are counted and logged."""
+
+        def view(request):
+            list(LoanProfile.objects.all())
+            list(LoanProfile.objects.all())
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        request = RequestFactory().get("/")
+
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            res = middleware(request)
+
+        self.assertIn('desc="2 queries, 1 duplicate"', res["Server-Timing"])
+        self.assertIn("1 duplicate queries", logs.output[0])
+
+
+class MetricsApiTests(TestCase):
+    """Test the metrics endpoint."""
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.client = APIClient()
+
+    def test_requires_admin(self):
+        """Test only staff users can read the metrics."""
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass123"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_prometheus_exposition(self):
+        """Test admins get histograms in the Prometheus text format."""
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="pass123"
+        )
+        self.client.force_authenticate(admin)
+        metrics.registry.observe(
+            LOAN_PROFILES_ROUTE, "GET", {"http_request_db_queries": 3}
+        )
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        body = res.content.decode()
+        self.assertIn("# TYPE http_request_db_queries histogram", body)
+        self.assertIn(
+            "http_request_db_queries_bucket"
+            f'{{route="{LOAN_PROFILES_ROUTE}",method="GET",le="5"}} 1',
+            body,
+        )
+        self.assertIn(
+            "http_request_db_queries_sum"
+            f'{{route="{LOAN_PROFILES_ROUTE}",method="GET"}} 3',
+            body,
+        )
+
+    def test_counters(self):
+        """Test registered counters are exposed with their value."""
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="pass123"
+        )
+        self.client.force_authenticate(admin)
+
+        with patch.dict(
+            metrics.COUNTERS, {"test_total": ("A test counter.", lambda: 7)}
+        ):
+            res = self.client.get(METRICS_URL)
+
+        body = res.content.decode()
+        self.assertIn("# TYPE test_total counter", body)
+        self.assertIn("test_total 7\n", body)
+
+    def test_json_format(self):
+        """Test the metrics are also available as JSON."""
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="pass123"
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(METRICS_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.json()), set(metrics.METRICS) | set(metrics.COUNTERS)
+        )
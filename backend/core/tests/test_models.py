@@ -6,6 +6,7 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 
 from core import models
+from datetime import date, timedelta
 from decimal import Decimal
 
 
@@ -89,8 +90,8 @@ class TransactionModelTests(TestCase):
                 business_type=1,
                 loan_duration_months=12,
                 total_amount_required=Decimal("500.00"),
-                deadline_to_receive_loan="2021-12-31",
-                status=1,
+                deadline_to_receive_loan=date.today() + timedelta(days=30),
+                status=models.LoanProfileStatus.APPROVED,
             )
         )
         self.loan_profile_without_transactions = (
@@ -101,8 +102,8 @@ class TransactionModelTests(TestCase):
                 business_type=2,
                 loan_duration_months=12,
                 total_amount_required=Decimal("500.00"),
-                deadline_to_receive_loan="2021-12-31",
-                status=1,
+                deadline_to_receive_loan=date.today() + timedelta(days=30),
+                status=models.LoanProfileStatus.APPROVED,
             )
         )
         self.lender = get_user_model().objects.create_user(
@@ -128,6 +129,81 @@ class TransactionModelTests(TestCase):
                 amount=100,
             )
 
+    def test_T_requires_approved_LP(self):
+        """Test transactions cannot be made to unapproved loan profiles."""
+        models.LoanProfile.objects.update(
+            status=models.LoanProfileStatus.PENDING
+        )
+
+        with self.assertRaisesMessage(
+            ValueError, "Loan profile is not approved."
+        ):
+            models.Transaction.objects.create_transaction(
+                lender=self.lender,
+                borrower=self.loan_profile_with_transactions,
+                amount=100,
+            )
+
+    def test_T_requires_LP_before_deadline(self):
+        """Test transactions cannot be made after the loan deadline."""
+        models.LoanProfile.objects.update(
+            deadline_to_receive_loan=date.today() - timedelta(days=1)
+        )
+
+        with self.assertRaisesMessage(
+            ValueError, "Loan profile deadline has passed."
+        ):
+            models.Transaction.objects.create_transaction(
+                lender=self.lender,
+                borrower=self.loan_profile_with_transactions,
+                amount=100,
+            )
+
+    def test_completed_T_cannot_overfund_LP(self):
+        """
+        Test a completed transaction larger than the amount remaining is
+        rejected without being saved.
+        """
+        models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("450.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+
+        with self.assertRaisesMessage(
+            ValueError, "Amount exceeds the amount remaining"
+        ):
+            models.Transaction.objects.create_transaction(
+                lender=self.lender,
+                borrower=self.loan_profile_with_transactions,
+                amount=Decimal("50.01"),
+                status=models.TransactionStatus.COMPLETED,
+            )
+
+        self.assertEqual(models.Transaction.objects.count(), 1)
+        self.loan_profile_with_transactions.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile_with_transactions.amount_lended_to_date,
+            Decimal("450.00"),
+        )
+
+    def test_completing_T_cannot_overfund_LP(self):
+        """Test completing a pending transaction checks the remaining."""
+        pending = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("501.00"),
+        )
+
+        pending.status = models.TransactionStatus.COMPLETED
+        with self.assertRaises(ValueError):
+            pending.save()
+
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, models.TransactionStatus.PENDING)
+        self.assertFalse(models.LoanProfile.objects.with_funding_drift())
+
     def test_ALTD_for_LP_without_Ts_is_zero(self):
         """
         Test the amount lended to date for a
@@ -197,3 +273,481 @@ class TransactionModelTests(TestCase):
         self.assertEqual(
             self.loan_profile_with_transactions.amount_lended_to_date, 200
         )
+
+    def test_completing_T_updates_LP_funding_totals(self):
+        """
+        Test completing a pending transaction adds it to the
+        loan profile funding totals.
+        """
+        transaction = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("40.00"),
+        )
+        self.assertEqual(
+            self.loan_profile_with_transactions.completed_transaction_count,
+            0,
+        )
+
+        transaction.status = models.TransactionStatus.COMPLETED
+        transaction.save()
+
+        loan_profile = models.LoanProfile.objects.get(
+            pk=self.loan_profile_with_transactions.pk
+        )
+        self.assertEqual(loan_profile.amount_lended_to_date, Decimal("40"))
+        self.assertEqual(loan_profile.lender_count, 1)
+        self.assertEqual(loan_profile.completed_transaction_count, 1)
+
+    def test_refunding_T_removes_it_from_LP_funding_totals(self):
+        """
+        Test a completed transaction that is refunded no longer counts
+        towards the loan profile funding totals.
+        """
+        models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("25.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+        refunded = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("75.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+
+        refunded = models.Transaction.objects.get(pk=refunded.pk)
+        refunded.status = models.TransactionStatus.REFUNDED
+        refunded.save()
+
+        loan_profile = models.LoanProfile.objects.get(
+            pk=self.loan_profile_with_transactions.pk
+        )
+        self.assertEqual(loan_profile.amount_lended_to_date, Decimal("25"))
+        self.assertEqual(loan_profile.lender_count, 1)
+        self.assertEqual(loan_profile.completed_transaction_count, 1)
+
+    def test_LP_lender_count_counts_distinct_lenders(self):
+        """Test the lender count counts each lender once."""
+        other_lender = get_user_model().objects.create_user(
+            email="lender2@example.com",
+            password="testpass123",
+            role=models.UserRole.LENDER,
+        )
+        for lender in (self.lender, self.lender, other_lender):
+            models.Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=self.loan_profile_with_transactions,
+                amount=10,
+                status=models.TransactionStatus.COMPLETED,
+            )
+
+        self.assertEqual(self.loan_profile_with_transactions.lender_count, 2)
+        self.assertEqual(
+            self.loan_profile_with_transactions.completed_transaction_count,
+            3,
+        )
+
+    def test_stale_LP_save_keeps_funding_totals(self):
+        """
+        Test saving a loan profile loaded before a contribution keeps the
+        funding totals the contribution added.
+        """
+        stale = models.LoanProfile.objects.get(
+            pk=self.loan_profile_with_transactions.pk
+        )
+        models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("40.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+
+        stale.title = "Updated title"
+        stale.save()
+
+        loan_profile = models.LoanProfile.objects.get(pk=stale.pk)
+        self.assertEqual(loan_profile.title, "Updated title")
+        self.assertEqual(loan_profile.amount_lended_to_date, Decimal("40"))
+        self.assertEqual(loan_profile.lender_count, 1)
+        self.assertEqual(loan_profile.completed_transaction_count, 1)
+
+    def test_refunding_T_with_deferred_fields(self):
+        """
+        Test a transaction loaded with deferred fields updates the
+        loan profile funding totals when saved.
+        """
+        models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("25.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+        transactions = models.Transaction.objects.filter(
+            status=models.TransactionStatus.COMPLETED
+        )
+
+        refunded = transactions.only("id", "status")[0]
+        completed_at = refunded.status_changed_at
+        refunded.status = models.TransactionStatus.REFUNDED
+        refunded.save()
+
+        loan_profile = models.LoanProfile.objects.get(
+            pk=self.loan_profile_with_transactions.pk
+        )
+        self.assertEqual(loan_profile.amount_lended_to_date, 0)
+        self.assertEqual(loan_profile.lender_count, 0)
+        self.assertGreater(refunded.status_changed_at, completed_at)
+
+    def test_changing_T_amount_with_deferred_fields(self):
+        """
+        Test changing the amount of a completed transaction loaded
+        without its lender and loan profile adjusts the funding totals.
+        """
+        transaction = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("25.00"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+
+        transaction = models.Transaction.objects.defer(
+            "loan_profile", "user"
+        ).get(pk=transaction.pk)
+        status_changed_at = transaction.status_changed_at
+        transaction.amount = Decimal("30.00")
+        transaction.save()
+
+        loan_profile = models.LoanProfile.objects.get(
+            pk=self.loan_profile_with_transactions.pk
+        )
+        self.assertEqual(loan_profile.amount_lended_to_date, Decimal("30"))
+        self.assertEqual(loan_profile.completed_transaction_count, 1)
+        self.assertEqual(transaction.status_changed_at, status_changed_at)
+
+    def test_recompute_funding_totals(self):
+        """Test funding totals can be recomputed from the ledger."""
+        models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=Decimal("150.50"),
+            status=models.TransactionStatus.COMPLETED,
+        )
+        models.LoanProfile.objects.update(
+            amount_lended_to_date=0, lender_count=5
+        )
+        self.assertEqual(
+            models.LoanProfile.objects.with_funding_drift().count(), 2
+        )
+
+        models.LoanProfile.objects.recompute_funding_totals()
+
+        self.loan_profile_with_transactions.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile_with_transactions.amount_lended_to_date,
+            Decimal("150.50"),
+        )
+        self.assertEqual(self.loan_profile_with_transactions.lender_count, 1)
+        self.assertFalse(models.LoanProfile.objects.with_funding_drift())
+
+    def test_T_timestamps(self):
+        """
+        Test created_at never changes and status_changed_at only changes
+        with the status.
+        """
+        transaction = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile_with_transactions,
+            amount=10,
+        )
+        created_at = transaction.created_at
+        status_changed_at = transaction.status_changed_at
+
+        transaction = models.Transaction.objects.get(pk=transaction.pk)
+        transaction.amount = 20
+        transaction.save()
+        self.assertEqual(transaction.status_changed_at, status_changed_at)
+
+        transaction.status = models.TransactionStatus.COMPLETED
+        transaction.save(update_fields=["status"])
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.created_at, created_at)
+        self.assertGreater(transaction.status_changed_at, status_changed_at)
+
+
+class BulkCreateTransactionsTests(TestCase):
+    """Test creating transactions in bulk."""
+
+    def setUp(self):
+        borrower = get_user_model().objects.create_user(
+            email="borrower@example.com", password="testpass123"
+        )
+        self.loan_profile = models.LoanProfile.objects.create(
+            user=borrower,
+            photoURL="www.example.com/photo.jpg",
+            description="approved loan profile",
+            business_type=1,
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+            deadline_to_receive_loan=date.today() + timedelta(days=30),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+        self.lenders = [
+            get_user_model().objects.create_user(
+                email=f"lender{n}@example.com",
+                password="testpass123",
+                role=models.UserRole.LENDER,
+            )
+            for n in range(2)
+        ]
+
+    def item(self, **params):
+        defaults = {
+            "user_id": self.lenders[0].pk,
+            "loan_profile_id": self.loan_profile.pk,
+            "amount": Decimal("10.00"),
+            "status": models.TransactionStatus.COMPLETED,
+        }
+        defaults.update(params)
+        return defaults
+
+    def test_creates_transactions_and_funding_totals(self):
+        """Test valid items are inserted and counted towards the totals."""
+        items = [
+            self.item(),
+            self.item(user_id=self.lenders[1].pk, amount=Decimal("5.50")),
+            self.item(status=models.TransactionStatus.PENDING),
+        ]
+
+        (
+            created,
+            _,
+            errors,
+        ) = models.Transaction.objects.bulk_create_transactions(items)
+
+        self.assertEqual(errors, {})
+        self.assertEqual(set(created), {0, 1, 2})
+        self.assertEqual(models.Transaction.objects.count(), 3)
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("15.50")
+        )
+        self.assertEqual(self.loan_profile.lender_count, 2)
+        self.assertEqual(self.loan_profile.completed_transaction_count, 2)
+
+    def test_reports_invalid_items(self):
+        """Test invalid items are reported by index and not inserted."""
+        borrower = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        pending = models.LoanProfile.objects.create(
+            user=borrower,
+            photoURL="www.example.com/photo.jpg",
+            description="pending loan profile",
+            business_type=1,
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+            status=models.LoanProfileStatus.PENDING,
+        )
+        closed = models.LoanProfile.objects.create(
+            user=borrower,
+            photoURL="www.example.com/photo.jpg",
+            description="closed loan profile",
+            business_type=1,
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+            deadline_to_receive_loan=date.today() - timedelta(days=1),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+        items = [
+            self.item(user_id=borrower.pk),
+            self.item(loan_profile_id=0),
+            self.item(loan_profile_id=pending.pk),
+            self.item(loan_profile_id=closed.pk),
+            self.item(amount=Decimal("-1")),
+            self.item(),
+        ]
+
+        (
+            created,
+            _,
+            errors,
+        ) = models.Transaction.objects.bulk_create_transactions(items)
+
+        self.assertEqual(list(created), [5])
+        self.assertEqual(set(errors), {0, 1, 2, 3, 4})
+        self.assertIn("user", errors[0])
+        self.assertEqual(
+            errors[2], {"loan_profile": ["Loan profile is not approved."]}
+        )
+        self.assertEqual(
+            errors[3],
+            {"loan_profile": ["Loan profile deadline has passed."]},
+        )
+        self.assertIn("amount", errors[4])
+        self.assertEqual(models.Transaction.objects.count(), 1)
+
+    def test_batch_cannot_overfund(self):
+        """Test items beyond the amount remaining are rejected."""
+        (
+            created,
+            _,
+            errors,
+        ) = models.Transaction.objects.bulk_create_transactions(
+            [
+                self.item(amount=Decimal("300.00")),
+                self.item(amount=Decimal("250.00")),
+                self.item(
+                    amount=Decimal("250.00"),
+                    status=models.TransactionStatus.PENDING,
+                ),
+                self.item(amount=Decimal("200.00")),
+            ]
+        )
+
+        self.assertEqual(set(created), {0, 2, 3})
+        self.assertEqual(
+            errors,
+            {
+                1: {
+                    "loan_profile": [
+                        "Amount exceeds the amount remaining on the loan "
+                        "profile."
+                    ]
+                }
+            },
+        )
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("500.00")
+        )
+
+    def test_constant_number_of_queries(self):
+        """Test the number of queries does not grow with the batch."""
+        manager = models.Transaction.objects
+
+        with self.assertNumQueries(8):
+            manager.bulk_create_transactions([self.item()])
+        with self.assertNumQueries(8):
+            manager.bulk_create_transactions(
+                [
+                    self.item(user_id=self.lenders[n % 2].pk)
+                    for n in range(50)
+                ]
+            )
+
+    def test_created_transactions_track_later_changes(self):
+        """Test saving a bulk created transaction keeps totals in sync."""
+        created, _, _ = models.Transaction.objects.bulk_create_transactions(
+            [self.item()]
+        )
+
+        created[0].status = models.TransactionStatus.REFUNDED
+        created[0].save()
+
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(self.loan_profile.amount_lended_to_date, 0)
+        self.assertEqual(self.loan_profile.lender_count, 0)
+
+    def test_existing_idempotency_key(self):
+        """Test items reusing a stored key resolve to its transaction."""
+        original = models.Transaction.objects.create_transaction(
+            lender=self.lenders[0],
+            borrower=self.loan_profile,
+            amount=Decimal("10.00"),
+            status=models.TransactionStatus.COMPLETED,
+            idempotency_key="payment-1",
+        )
+
+        (
+            created,
+            existing,
+            errors,
+        ) = models.Transaction.objects.bulk_create_transactions(
+            [
+                self.item(idempotency_key="payment-1"),
+                self.item(idempotency_key="payment-2"),
+                self.item(idempotency_key="payment-2"),
+            ]
+        )
+
+        self.assertEqual(errors, {})
+        self.assertEqual(list(created), [1])
+        self.assertEqual(existing, {0: original, 2: created[1]})
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("20.00")
+        )
+
+    def test_idempotency_key_skips_validation(self):
+        """Test a retry succeeds after the loan profile closed."""
+        models.Transaction.objects.bulk_create_transactions(
+            [self.item(idempotency_key="payment-1")]
+        )
+        models.LoanProfile.objects.update(
+            status=models.LoanProfileStatus.REJECTED
+        )
+
+        (
+            _,
+            existing,
+            errors,
+        ) = models.Transaction.objects.bulk_create_transactions(
+            [self.item(idempotency_key="payment-1")]
+        )
+
+        self.assertEqual(errors, {})
+        self.assertEqual(list(existing), [0])
+
+
+class CreateTransactionIdempotencyTests(TestCase):
+    """Test creating transactions with idempotency keys."""
+
+    def setUp(self):
+        self.lender = get_user_model().objects.create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=models.UserRole.LENDER,
+        )
+        self.loan_profile = models.LoanProfile.objects.create(
+            user=get_user_model().objects.create_user(
+                email="borrower@example.com", password="testpass123"
+            ),
+            photoURL="www.example.com/photo.jpg",
+            description="loan profile",
+            business_type=1,
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+
+    def create(self, **params):
+        return models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile,
+            amount=Decimal("30.00"),
+            status=models.TransactionStatus.COMPLETED,
+            **params,
+        )
+
+    def test_retry_returns_original(self):
+        """Test a retried creation returns the original transaction."""
+        original = self.create(idempotency_key="payment-1")
+
+        with self.assertNumQueries(6):
+            retried = self.create(idempotency_key="payment-1")
+
+        self.assertEqual(retried.pk, original.pk)
+        self.assertEqual(models.Transaction.objects.count(), 1)
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("30.00")
+        )
+
+    def test_transactions_without_keys(self):
+        """Test transactions without a key are never deduplicated."""
+        self.create()
+        self.create()
+
+        self.assertEqual(models.Transaction.objects.count(), 2)
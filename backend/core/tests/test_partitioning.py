@@ -0,0 +1,161 @@
+"""
+Tests for partitioning the transaction ledger.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from core import models, partitioning
+from transaction import export
+
+
+class PartitionTransactionsCommandTests(TestCase):
+    """Test the partition_transactions command."""
+
+    def setUp(self):
+        self.lender = get_user_model().objects.create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=models.UserRole.LENDER,
+        )
+        self.loan_profile = models.LoanProfile.objects.create(
+            user=get_user_model().objects.create_user(
+                email="borrower@example.com", password="testpass123"
+            ),
+            photoURL="www.example.com/photo.jpg",
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            total_amount_required=Decimal("500.00"),
+            deadline_to_receive_loan=date.today() + timedelta(days=30),
+            status=models.LoanProfileStatus.APPROVED,
+        )
+        for month, key in ((1, "payment-1"), (3, None)):
+            transaction = models.Transaction.objects.create_transaction(
+                lender=self.lender,
+                borrower=self.loan_profile,
+                amount=Decimal("10.00"),
+                status=models.TransactionStatus.COMPLETED,
+                idempotency_key=key,
+            )
+            models.Transaction.objects.filter(pk=transaction.pk).update(
+                created_at=timezone.make_aware(
+                    datetime(2024, month, 15)
+                )
+            )
+
+    def partition(self, *args):
+        out = StringIO()
+        call_command("partition_transactions", *args, stdout=out)
+        return out.getvalue()
+
+    def test_requires_convert(self):
+        """Test an unpartitioned table is only converted on request."""
+        with self.assertRaises(CommandError):
+            self.partition()
+
+    def test_convert(self):
+        """Test converting keeps rows and covers the months ahead."""
+        self.partition("--convert", "--months-ahead", "2")
+
+        with connection.cursor() as cursor:
+            self.assertTrue(partitioning.is_partitioned(cursor))
+            names = partitioning.partitions(cursor)
+        last_month = partitioning.add_months(
+            timezone.localdate().replace(day=1), 2
+        )
+        self.assertIn(f"{partitioning.TABLE}_p2024_01", names)
+        self.assertIn(partitioning.partition_name(last_month), names)
+        self.assertIn(partitioning.DEFAULT_PARTITION, names)
+        self.assertEqual(models.Transaction.objects.count(), 2)
+        self.assertFalse(models.LoanProfile.objects.with_funding_drift())
+        # The statistics views are rebuilt over the partitioned table.
+        models.PlatformStats.objects.refresh()
+        self.assertEqual(models.PlatformStats.objects.get().lenders, 1)
+
+    def test_repartition_by_partition_key(self):
+        """Test a table partitioned by another column is re-partitioned."""
+        with patch.object(
+            partitioning, "PARTITION_KEY", "transaction_date"
+        ):
+            self.partition("--convert")
+
+        with self.assertRaises(CommandError):
+            self.partition()
+        self.partition("--convert")
+
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                partitioning.partition_key(cursor), partitioning.PARTITION_KEY
+            )
+            names = partitioning.partitions(cursor)
+        self.assertIn(f"{partitioning.TABLE}_p2024_03", names)
+        self.assertEqual(models.Transaction.objects.count(), 2)
+        self.assertTrue(
+            models.Transaction.objects.filter(
+                idempotency_key="payment-1"
+            ).exists()
+        )
+
+    def test_create_future_partitions(self):
+        """Test later runs only add the missing months."""
+        self.partition("--convert", "--months-ahead", "1")
+
+        out = self.partition("--months-ahead", "3")
+        again = self.partition("--months-ahead", "3")
+
+        self.assertIn("2 partition(s) created.", out)
+        self.assertIn("No partitions to create.", again)
+
+    def test_idempotency_keys_stay_unique(self):
+        """Test idempotency keys are enforced across partitions."""
+        original = models.Transaction.objects.get(
+            idempotency_key="payment-1"
+        )
+        self.partition("--convert")
+
+        retried = models.Transaction.objects.create_transaction(
+            lender=self.lender,
+            borrower=self.loan_profile,
+            amount=Decimal("10.00"),
+            status=models.TransactionStatus.COMPLETED,
+            idempotency_key="payment-1",
+        )
+        # Moving a row to another month keeps its key claimed.
+        models.Transaction.objects.filter(pk=original.pk).update(
+            created_at=timezone.now()
+        )
+        _, existing, _ = models.Transaction.objects.bulk_create_transactions(
+            [
+                {
+                    "user_id": self.lender.pk,
+                    "loan_profile_id": self.loan_profile.pk,
+                    "amount": Decimal("10.00"),
+                    "idempotency_key": "payment-1",
+                }
+            ]
+        )
+
+        self.assertEqual(retried.pk, original.pk)
+        self.assertEqual(existing[0].pk, original.pk)
+        self.assertEqual(models.Transaction.objects.count(), 2)
+
+    def test_date_range_queries_are_pruned(self):
+        """Test ledger exports for a month only scan its partition."""
+        self.partition("--convert")
+
+        plan = export.ledger(
+            since=date(2024, 3, 1), until=date(2024, 3, 31)
+        ).explain()
+
+        self.assertIn(f"{partitioning.TABLE}_p2024_03", plan)
+        self.assertNotIn(f"{partitioning.TABLE}_p2024_01", plan)
+        self.assertNotIn(partitioning.DEFAULT_PARTITION, plan)
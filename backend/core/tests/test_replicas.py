@@ -0,0 +1,357 @@
+"""
+Tests for routing reads to read replicas.
+"""
+
+import math
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import viewsets
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from core import replicas
+from core.middleware import ReplicaPinMiddleware
+from core.models import LoanProfile
+
+
+REPLICAS = ["replica1", "replica2"]
+
+
+class ReadingView(replicas.ReplicaReadMixin, APIView):
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        return Response(replicas.reading_from_replicas())
+
+    def post(self, request):
+        return Response(replicas.reading_from_replicas())
+
+
+class ReadingViewSet(replicas.ReplicaReadMixin, viewsets.ViewSet):
+    authentication_classes = ()
+    permission_classes = ()
+    replica_read_actions = ("list",)
+
+    def list(self, request):
+        return Response(replicas.reading_from_replicas())
+
+    def retrieve(self, request, pk=None):
+        return Response(replicas.reading_from_replicas())
+
+
+class ReplicaTestCase(SimpleTestCase):
+    def setUp(self):
+        replicas.lag_monitor.reset()
+        self.addCleanup(replicas.lag_monitor.reset)
+
+
+@override_settings(
+    DATABASE_REPLICAS=REPLICAS,
+    REPLICA_MAX_LAG=5,
+    REPLICA_LAG_CHECK_INTERVAL=60,
+)
+class ReplicaRouterTests(ReplicaTestCase):
+    """Test the database router."""
+
+    def setUp(self):
+        super().setUp()
+        self.router = replicas.ReplicaRouter()
+        patcher = patch.object(
+            replicas.lag_monitor, "measure", return_value=0
+        )
+        self.measure = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_primary_by_default(self):
+        """Test reads use the primary outside replica_reads()."""
+        self.assertIsNone(self.router.db_for_read(LoanProfile))
+        self.measure.assert_not_called()
+
+    def test_replica_reads(self):
+        """Test the reads of a replica_reads() block use one replica."""
+        chosen = set()
+        for _ in range(50):
+            with replicas.replica_reads():
+                databases = {
+                    self.router.db_for_read(LoanProfile) for _ in range(5)
+                }
+            self.assertEqual(len(databases), 1)
+            chosen |= databases
+
+        self.assertEqual(chosen, set(REPLICAS))
+
+    def test_lagging_replica_skipped(self):
+        """Test a replica lagging too far behind is not read from."""
+        self.measure.side_effect = lambda alias: {
+            "replica1": 6,
+            "replica2": 1,
+        }[alias]
+
+        with replicas.replica_reads():
+            self.assertEqual(self.router.db_for_read(LoanProfile), "replica2")
+
+    def test_fallback_to_primary(self):
+        """Test reads use the primary when every replica lags."""
+        self.measure.return_value = math.inf
+
+        with replicas.replica_reads():
+            self.assertIsNone(self.router.db_for_read(LoanProfile))
+
+    def test_lag_measured_once_per_interval(self):
+        """Test the lag of a replica is measured once per interval."""
+        with replicas.replica_reads():
+            for _ in range(3):
+                self.router.db_for_read(LoanProfile)
+
+        self.assertEqual(self.measure.call_count, len(REPLICAS))
+
+    def test_may_predate(self):
+        """Test replica reads may predate the replica's lag, at most."""
+        self.measure.return_value = 2
+        now = time.time()
+
+        with replicas.replica_reads():
+            self.router.db_for_read(LoanProfile)
+            self.assertTrue(replicas.may_predate(now - 1))
+            self.assertFalse(replicas.may_predate(now - 3))
+        self.assertFalse(replicas.may_predate(now))
+
+    def test_lag_grows_until_measured_again(self):
+        """Test the lag bound grows with the age of the measurement."""
+        self.measure.return_value = 2
+        replicas.lag_monitor.lag("replica1")
+
+        with patch.object(
+            replicas.time, "monotonic", return_value=time.monotonic() + 30
+        ):
+            max_lag = replicas.lag_monitor.max_lag("replica1")
+
+        self.assertGreaterEqual(max_lag, 32)
+
+    def test_primary_reads_never_predate(self):
+        """Test reads falling back to the primary are current."""
+        self.measure.return_value = math.inf
+
+        with replicas.replica_reads():
+            self.router.db_for_read(LoanProfile)
+            self.assertFalse(replicas.may_predate(time.time()))
+
+    def test_writes_use_primary(self):
+        """Test writes use the primary, even for replica instances."""
+        loan_profile = LoanProfile()
+        loan_profile._state.db = "replica1"
+
+        with replicas.replica_reads():
+            database = self.router.db_for_write(
+                LoanProfile, instance=loan_profile
+            )
+
+        self.assertEqual(database, "default")
+
+    def test_no_migrations_on_replicas(self):
+        """Test migrations only run on the primary."""
+        self.assertFalse(self.router.allow_migrate("replica1", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+
+class LagMonitorTests(ReplicaTestCase):
+    """Test measuring the replication lag."""
+
+    databases = {"default"}
+
+    def test_primary_not_behind(self):
+        """Test a database that is not replicating has no lag."""
+        self.assertEqual(replicas.lag_monitor.measure("default"), 0)
+
+    def test_unavailable_replica(self):
+        """Test an unreachable replica lags infinitely."""
+        replica = MagicMock()
+        replica.cursor.side_effect = OperationalError("connection refused")
+
+        with patch.object(
+            replicas, "connections", {"replica1": replica}
+        ), self.assertLogs("core.replicas", "WARNING"):
+            lag = replicas.lag_monitor.measure("replica1")
+
+        self.assertEqual(lag, math.inf)
+
+
+class ReplicaReadMixinTests(SimpleTestCase):
+    """Test views choosing to read from replicas."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_safe_requests(self):
+        """Test safe requests read from replicas."""
+        response = ReadingView.as_view()(self.factory.get("/"))
+
+        self.assertIs(response.data, True)
+        self.assertFalse(replicas.reading_from_replicas())
+
+    def test_unsafe_requests(self):
+        """Test unsafe requests read from the primary."""
+        response = ReadingView.as_view()(self.factory.post("/"))
+
+        self.assertIs(response.data, False)
+
+    def test_pinned_client(self):
+        """Test a client that wrote recently reads from the primary."""
+        request = self.factory.get("/")
+        request.COOKIES[replicas.PIN_COOKIE] = "1"
+
+        response = ReadingView.as_view()(request)
+
+        self.assertIs(response.data, False)
+
+    def test_viewset_actions(self):
+        """Test only the replica_read_actions of a viewset use replicas."""
+        list_view = ReadingViewSet.as_view({"get": "list"})
+        detail_view = ReadingViewSet.as_view({"get": "retrieve"})
+
+        self.assertIs(list_view(self.factory.get("/")).data, True)
+        self.assertIs(detail_view(self.factory.get("/"), pk=1).data, False)
+
+
+class ReplicaPinMiddlewareTests(SimpleTestCase):
+    """Test pinning clients that write to the primary."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaPinMiddleware(lambda request: HttpResponse())
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS, REPLICA_PIN_SECONDS=10)
+    def test_write_pins_client(self):
+        """Test a write sets the pin cookie for REPLICA_PIN_SECONDS."""
+        response = self.middleware(self.factory.post("/"))
+
+        cookie = response.cookies[replicas.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+        self.assertTrue(cookie["httponly"])
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    def test_read_does_not_pin(self):
+        """Test a read does not set the pin cookie."""
+        response = self.middleware(self.factory.get("/"))
+
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test no cookie is set without replicas."""
+        response = self.middleware(self.factory.post("/"))
+
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+
+@contextmanager
+def lagging_replicas(lag=2):
+    """Keep the replicas seeing the data as of now, as if lagging."""
+    replicas.lag_monitor.reset()
+    patcher = patch.object(
+        replicas.lag_monitor, "measure", return_value=lag
+    )
+    patcher.start()
+    for alias in settings.DATABASE_REPLICAS:
+        replica = connections[alias]
+        replica.set_autocommit(False)
+        with replica.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SELECT 1")
+    try:
+        yield
+    finally:
+        patcher.stop()
+        replicas.lag_monitor.reset()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].rollback()
+            connections[alias].set_autocommit(True)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "DB_REPLICAS is not set.")
+class ReplicaReadApiTests(TransactionTestCase):
+    """Test the API against the replicas configured with DB_REPLICAS."""
+
+    databases = {"default", *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        replicas.lag_monitor.reset()
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def replica_queries(self, method, url, data=None):
+        """Return the response of a request and its replica queries."""
+        with ExitStack() as stack:
+            contexts = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in settings.DATABASE_REPLICAS
+            ]
+            response = getattr(self.client, method)(url, data)
+        return response, sum(len(context) for context in contexts)
+
+    def test_reads_from_replica_until_write(self):
+        """Test list reads use a replica, except right after a write."""
+        url = reverse("loan_profile:loanprofile-list")
+
+        response, queries = self.replica_queries("get", url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries, 0)
+
+        response, queries = self.replica_queries(
+            "patch", reverse("user:me"), {"name": "New Name"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 0)
+
+        response, queries = self.replica_queries("get", url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 0)
+
+    def test_lagging_replica_not_cached(self):
+        """Test a lagging replica does not refill the list cache."""
+        loan_profile = LoanProfile.objects.create(
+            user=get_user_model().objects.get(),
+            photoURL="www.example.com/photo.jpg",
+            title="Old title",
+            description="Test description",
+            business_type="Food",
+            total_amount_required=Decimal("500.00"),
+            deadline_to_receive_loan=date(2022, 1, 1),
+        )
+        url = reverse("loan_profile:loanprofile-list")
+
+        with lagging_replicas():
+            loan_profile.title = "New title"
+            loan_profile.save()
+            stale = APIClient().get(url)
+        fresh = APIClient().get(url)
+        cached = APIClient().get(url)
+
+        self.assertEqual(stale.data["results"][0]["title"], "Old title")
+        self.assertEqual(fresh["X-Cache"], "MISS")
+        self.assertEqual(fresh.data["results"][0]["title"], "New title")
+        self.assertEqual(cached["X-Cache"], "HIT")
@@ -0,0 +1,44 @@
+"""
+Tests for opening database connections when a server starts.
+"""
+
+from unittest.mock import patch
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core import startup
+
+
+class WarmUpTests(TransactionTestCase):
+    """Test warming up the connections of a server."""
+
+    def test_wsgi(self):
+        """Test the thread loading a WSGI application connects."""
+        connection.close()
+
+        opened = startup.warm_up(asgi=False)
+
+        self.assertEqual(opened, 1)
+        self.assertIsNotNone(connection.connection)
+
+    def test_asgi(self):
+        """Test an ASGI application warms up the async view threads."""
+        with patch("core.asyncdb.warm_up", return_value=8) as warm_up:
+            opened = startup.warm_up(asgi=True)
+
+        self.assertEqual(opened, 8)
+        warm_up.assert_called_once_with("default")
+
+
+class WarmUpDatabaseDownTests(SimpleTestCase):
+    """Test a server starts while the database is down."""
+
+    def test_logged(self):
+        """Test a failed warm-up is logged rather than raised."""
+        with patch(
+            "core.asyncdb.warm_up", side_effect=OperationalError("down")
+        ), self.assertLogs("core.startup", "WARNING"):
+            opened = startup.warm_up(asgi=True)
+
+        self.assertEqual(opened, 0)
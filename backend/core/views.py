@@ -0,0 +1,30 @@
+"""
+Views for the core app.
+"""
+
+from rest_framework import authentication, permissions, renderers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import metrics
+from core.renderers import PrometheusRenderer
+from user.authentication import CachedTokenAuthentication
+
+
+class MetricsView(APIView):
+    """Expose the per-route request metrics of this process to admins."""
+
+    authentication_classes = (
+        CachedTokenAuthentication,
+        authentication.SessionAuthentication,
+    )
+    permission_classes = (permissions.IsAdminUser,)
+    renderer_classes = (PrometheusRenderer, renderers.JSONRenderer)
+
+    def get(self, request):
+        """
+        Return every histogram in the metrics registry, and the counters.
+        """
+        return Response(
+            metrics.registry.snapshot() | metrics.read_counters()
+        )
@@ -0,0 +1,58 @@
+"""
+Serializer fields backed by the geo index.
+"""
+
+from cities_light.models import City, Country
+from django.db import router
+from rest_framework import serializers
+
+from geo.index import get_index
+
+
+def _deferred(model, **values):
+    """
+    Return an instance holding only values, loading any other field from
+    the database on access.
+    """
+    return model.from_db(
+        router.db_for_read(model), list(values), list(values.values())
+    )
+
+
+class CountryField(serializers.PrimaryKeyRelatedField):
+    """A country primary key checked against the geo index."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Country.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            return super().to_internal_value(data)
+        if pk not in get_index().country_ids:
+            return super().to_internal_value(data)
+        return _deferred(Country, id=pk)
+
+
+class CityField(serializers.PrimaryKeyRelatedField):
+    """
+    A city primary key checked against the geo index. The city's
+    country_id is set, so comparing countries needs no query. Cities left
+    out of the index are looked up in the database.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", City.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            return super().to_internal_value(data)
+        country_id = get_index().city_country_id(pk)
+        if country_id is None:
+            return super().to_internal_value(data)
+        return _deferred(City, id=pk, country_id=country_id)
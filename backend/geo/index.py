@@ -0,0 +1,158 @@
+"""
+In-process index of the cities_light countries and cities.
+
+The index is built on first use and kept until a country or city
+changes. A change bumps a version number in the cache, and every process
+rebuilds its index once it sees the new version, checked at most every
+GEO_INDEX_CHECK_INTERVAL seconds. Cities are held in flat arrays, most
+populous first, up to GEO_INDEX_MAX_CITIES; their ascii names are kept
+sorted, so a prefix search is a binary search. When the budget leaves
+cities out, the index is incomplete and callers fall back to the
+database for misses.
+"""
+
+import heapq
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from cities_light.models import City, Country
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+
+VERSION_KEY = "geo:index:version"
+
+
+def normalize(name):
+    """Return the search key of a name: ascii, casefolded."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+class GeoIndex:
+    """Countries and a prefix index of city names."""
+
+    def __init__(self, max_cities, version=None):
+        self.version = version
+        self.countries = [
+            {"id": pk, "name": name, "code": code}
+            for pk, name, code in Country.objects.order_by(
+                "name"
+            ).values_list("pk", "name", "code2")
+        ]
+        self.country_ids = frozenset(
+            country["id"] for country in self.countries
+        )
+
+        cities = City.objects.order_by(
+            F("population").desc(nulls_last=True), "pk"
+        ).values_list("pk", "name", "name_ascii", "country_id")
+        cities = list(cities[: max_cities + 1])
+        self.complete = len(cities) <= max_cities
+        del cities[max_cities:]
+
+        # Attributes of the city of each rank, rank 0 most populous.
+        self.city_ids = array("q", (city[0] for city in cities))
+        self.city_names = [city[1] for city in cities]
+        self.city_country_ids = array("q", (city[3] for city in cities))
+
+        keys = [normalize(city[2] or city[1]) for city in cities]
+        by_key = sorted(range(len(cities)), key=keys.__getitem__)
+        self.keys = [keys[rank] for rank in by_key]
+        self.key_ranks = array("l", by_key)
+
+        by_id = sorted(range(len(cities)), key=self.city_ids.__getitem__)
+        self.sorted_ids = array("q", (self.city_ids[i] for i in by_id))
+        self.id_ranks = array("l", by_id)
+
+    def city_country_id(self, pk):
+        """Return the country id of a city, or None if it is not held."""
+        i = bisect_left(self.sorted_ids, pk)
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == pk:
+            return self.city_country_ids[self.id_ranks[i]]
+        return None
+
+    def search_cities(self, prefix, country_id=None, limit=10):
+        """
+        Return the most populous cities whose name starts with prefix,
+        optionally in one country.
+        """
+        key = normalize(prefix)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + "\U0010ffff", start)
+        ranks = (self.key_ranks[i] for i in range(start, end))
+        if country_id is not None:
+            ranks = (
+                rank
+                for rank in ranks
+                if self.city_country_ids[rank] == country_id
+            )
+        return [
+            {
+                "id": self.city_ids[rank],
+                "name": self.city_names[rank],
+                "country": self.city_country_ids[rank],
+            }
+            for rank in heapq.nsmallest(limit, ranks)
+        ]
+
+
+_index = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the cache backend holding the index version."""
+    return caches[settings.GEO_INDEX_CACHE_ALIAS]
+
+
+def get_index():
+    """
+    Return the index, building it on first use and rebuilding it once
+    the version in the cache changed.
+    """
+    global _index, _checked_at
+    index = _index
+    now = time.monotonic()
+    if (
+        index is not None
+        and _checked_at is not None
+        and now - _checked_at < settings.GEO_INDEX_CHECK_INTERVAL
+    ):
+        return index
+    with _lock:
+        version = get_cache().get_or_set(VERSION_KEY, 1, timeout=None)
+        if _index is None or _index.version != version:
+            _index = GeoIndex(settings.GEO_INDEX_MAX_CITIES, version)
+        _checked_at = now
+        return _index
+
+
+def _bump_version():
+    global _index
+    cache = get_cache()
+    cache.add(VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # The key was evicted between add() and incr().
+        cache.set(VERSION_KEY, 1, timeout=None)
+    _index = None
+
+
+def reset(using=None, **kwargs):
+    """
+    Drop the index, so it is rebuilt from the database on next use, and
+    once the current transaction commits, the index of every process.
+    """
+    global _index
+    _index = None
+    transaction.on_commit(_bump_version, using=using)
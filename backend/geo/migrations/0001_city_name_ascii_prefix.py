@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# The city autocomplete looks up the cities left out of the in-memory
+# index with name_ascii__istartswith, which compiles to
+# UPPER(name_ascii::text) LIKE UPPER('prefix%'). Only an index on that
+# expression with text_pattern_ops serves a LIKE prefix match whatever
+# the collation of the database.
+CITY_NAME_ASCII_PREFIX = """
+CREATE INDEX geo_city_name_ascii_upper_prefix
+ON cities_light_city (UPPER(name_ascii) text_pattern_ops);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cities_light', '0011_alter_city_country_alter_city_region_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CITY_NAME_ASCII_PREFIX,
+            'DROP INDEX geo_city_name_ascii_upper_prefix',
+        ),
+    ]
@@ -0,0 +1,13 @@
+"""
+Serializers for the geo app.
+"""
+
+from rest_framework import serializers
+
+
+class CitySearchSerializer(serializers.Serializer):
+    """Serializer for the query of the city autocomplete."""
+
+    q = serializers.CharField(min_length=1, max_length=200)
+    country = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
@@ -0,0 +1,13 @@
+"""
+Signal handlers for the geo app.
+"""
+
+from cities_light.models import City, Country
+from django.db.models.signals import post_delete, post_save
+
+from geo import index
+
+
+for model in (Country, City):
+    post_save.connect(index.reset, sender=model)
+    post_delete.connect(index.reset, sender=model)
@@ -0,0 +1,232 @@
+"""
+Tests for the geo API.
+"""
+
+import random
+import string
+
+from cities_light.models import City, Country
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from geo import index
+from user.serializers import UserSerializer
+
+
+COUNTRIES_URL = reverse("geo:countries")
+CITIES_URL = reverse("geo:cities")
+ME_URL = reverse("user:me")
+
+
+class GeoApiTests(TestCase):
+    """Test the country and city endpoints."""
+
+    def setUp(self):
+        self.france = Country.objects.create(name="France", code2="FR")
+        self.spain = Country.objects.create(name="Spain", code2="ES")
+        self.paris = City.objects.create(
+            name="Paris", country=self.france, population=2000000
+        )
+        self.pau = City.objects.create(
+            name="Pau", country=self.france, population=77000
+        )
+        self.palma = City.objects.create(
+            name="Palma", country=self.spain, population=400000
+        )
+        self.malaga = City.objects.create(
+            name="Málaga", country=self.spain, population=570000
+        )
+        index.reset()
+        self.addCleanup(index.reset)
+        self.client = APIClient()
+
+    def test_list_countries(self):
+        """Test countries are listed by name and cacheable."""
+        res = self.client.get(COUNTRIES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"id": self.france.pk, "name": "France", "code": "FR"},
+                {"id": self.spain.pk, "name": "Spain", "code": "ES"},
+            ],
+        )
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("max-age=", res["Cache-Control"])
+
+    def test_autocomplete_cities(self):
+        """Test cities matching a prefix are listed most populous first."""
+        self.client.get(COUNTRIES_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(CITIES_URL, {"q": "pa"})
+
+        self.assertEqual(
+            [city["name"] for city in res.data], ["Paris", "Palma", "Pau"]
+        )
+
+    def test_autocomplete_ignores_case_and_accents(self):
+        """Test prefixes match names regardless of case and accents."""
+        res = self.client.get(CITIES_URL, {"q": "MALA"})
+
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.malaga.pk,
+                    "name": "Málaga",
+                    "country": self.spain.pk,
+                }
+            ],
+        )
+
+    def test_autocomplete_in_country(self):
+        """Test cities can be limited to one country."""
+        res = self.client.get(
+            CITIES_URL, {"q": "pa", "country": self.spain.pk, "limit": 5}
+        )
+
+        self.assertEqual([city["name"] for city in res.data], ["Palma"])
+
+    def test_autocomplete_requires_query(self):
+        """Test the prefix is required."""
+        res = self.client.get(CITIES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("Cache-Control", res)
+
+    @override_settings(GEO_INDEX_MAX_CITIES=2)
+    def test_autocomplete_beyond_budget(self):
+        """Test cities left out of the index are found in the database."""
+        res = self.client.get(CITIES_URL, {"q": "pa"})
+
+        self.assertFalse(index.get_index().complete)
+        self.assertEqual(
+            [city["name"] for city in res.data], ["Paris", "Palma", "Pau"]
+        )
+
+    def test_user_city_validated_without_queries(self):
+        """Test the city and country of a user are checked in memory."""
+        index.get_index()
+        payload = {
+            "email": "test@example.com",
+            "password": "testpass123",
+            "name": "Test Name",
+            "country": self.spain.pk,
+        }
+
+        # Only the email uniqueness checks query the database.
+        with self.assertNumQueries(2):
+            valid = UserSerializer(
+                data=payload | {"city": self.palma.pk}
+            ).is_valid()
+            invalid = UserSerializer(
+                data=payload | {"city": self.paris.pk}
+            ).is_valid()
+
+        self.assertTrue(valid)
+        self.assertFalse(invalid)
+
+    @override_settings(GEO_INDEX_CHECK_INTERVAL=60)
+    def test_change_resets_every_index(self):
+        """Test a change bumps the index version once committed."""
+        stale = index.get_index()
+        pau_id = self.pau.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pau.delete()
+
+        self.assertEqual(
+            index.get_cache().get(index.VERSION_KEY), stale.version + 1
+        )
+        self.assertIsNone(index.get_index().city_country_id(pau_id))
+
+    def test_index_rebuilt_after_change_elsewhere(self):
+        """Test the index is rebuilt once another process changed it."""
+        with override_settings(GEO_INDEX_CHECK_INTERVAL=60):
+            stale = index.get_index()
+            index.get_cache().incr(index.VERSION_KEY)
+            self.assertIs(index.get_index(), stale)
+
+        with override_settings(GEO_INDEX_CHECK_INTERVAL=0):
+            self.assertIsNot(index.get_index(), stale)
+
+
+@override_settings(GEO_INDEX_MAX_CITIES=100)
+class CityFallbackPlanTests(TestCase):
+    """Test the database lookup of cities left out of the index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        country = Country.objects.create(name="France", code2="FR")
+        names = {
+            "".join(rng.choices(string.ascii_lowercase, k=8)).title()
+            for _ in range(20000)
+        }
+        City.objects.bulk_create(
+            (
+                City(
+                    name=name,
+                    name_ascii=name,
+                    slug=name.lower(),
+                    country=country,
+                    population=rng.randrange(100000),
+                )
+                for name in names
+            ),
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE cities_light_city")
+
+    def setUp(self):
+        index.reset()
+        self.addCleanup(index.reset)
+
+    def test_fallback_uses_prefix_index(self):
+        """Test the fallback reads the cities with the prefix by index."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(CITIES_URL, {"q": "pa"})
+        sql = queries[-1]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertEqual(len(res.data), 10)
+        self.assertIn("LIKE", sql)
+        self.assertNotIn("Seq Scan", plan)
+        self.assertIn("geo_city_name_ascii_upper_prefix", plan)
+
+
+class StaleGeoIndexTests(TransactionTestCase):
+    """Test saving users against a stale geo index."""
+
+    def setUp(self):
+        france = Country.objects.create(name="France", code2="FR")
+        self.paris = City.objects.create(name="Paris", country=france)
+        index.reset()
+        self.addCleanup(index.reset)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+
+    @override_settings(GEO_INDEX_CHECK_INTERVAL=60)
+    def test_city_deleted_elsewhere(self):
+        """Test a city deleted by another process is a bad request."""
+        index.get_index()
+        # Deleted without signals, as if by another process.
+        City.objects.filter(pk=self.paris.pk)._raw_delete("default")
+
+        res = self.client.patch(ME_URL, {"city": self.paris.pk})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,15 @@
+"""
+URL mappings for the geo app.
+"""
+
+from django.urls import path
+
+from geo import views
+
+
+app_name = "geo"
+
+urlpatterns = [
+    path("countries/", views.CountryListView.as_view(), name="countries"),
+    path("cities/", views.CityAutocompleteView.as_view(), name="cities"),
+]
@@ -0,0 +1,78 @@
+"""
+Views for the geo app.
+"""
+
+from cities_light.models import City
+from django.conf import settings
+from django.db.models import F
+from django.utils.cache import patch_cache_control
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from geo.index import get_index
+from geo.serializers import CitySearchSerializer
+
+
+class GeoView(APIView):
+    """
+    Base view for public geographic data, which clients and proxies can
+    cache for GEO_CACHE_MAX_AGE seconds.
+    """
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if response.status_code == 200:
+            patch_cache_control(
+                response, public=True, max_age=settings.GEO_CACHE_MAX_AGE
+            )
+        return response
+
+
+class CountryListView(GeoView):
+    """List every country."""
+
+    def get(self, request):
+        """Return the countries by name."""
+        return Response(get_index().countries)
+
+
+class CityAutocompleteView(GeoView):
+    """Suggest cities by name prefix."""
+
+    def get(self, request):
+        """
+        Return the most populous cities whose name starts with ?q=,
+        optionally in the ?country= with that id.
+        """
+        serializer = CitySearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        index = get_index()
+        cities = index.search_cities(
+            query["q"], query.get("country"), query["limit"]
+        )
+
+        missing = query["limit"] - len(cities)
+        if not index.complete and missing:
+            # The cities left out of the index are the least populous,
+            # so they rank after every city found in it.
+            fallback = (
+                City.objects.filter(name_ascii__istartswith=query["q"])
+                .exclude(pk__in=[city["id"] for city in cities])
+                .order_by(F("population").desc(nulls_last=True), "pk")
+            )
+            if "country" in query:
+                fallback = fallback.filter(country_id=query["country"])
+            cities += [
+                {"id": pk, "name": name, "country": country_id}
+                for pk, name, country_id in fallback.values_list(
+                    "pk", "name", "country_id"
+                )[:missing]
+            ]
+        return Response(cities)
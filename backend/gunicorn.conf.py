@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration serving the app over ASGI:
+
+    gunicorn -c gunicorn.conf.py app.asgi:application
+
+Each uvicorn worker is a single process with an event loop. Waiting on
+clients costs it no thread, so one worker per core is enough; the
+database work of async views runs on ASYNC_DB_THREADS threads per
+worker, each holding a database connection for DB_CONN_MAX_AGE, so
+Postgres sees up to WEB_CONCURRENCY * ASYNC_DB_THREADS connections, or
+PgBouncer as many clients. A worker opens them when it loads app/asgi.py,
+which gunicorn does after forking it.
+"""
+
+import multiprocessing
+import os
+
+
+os.environ.setdefault("ASYNC_DB_THREADS", "8")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "app.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Restart a worker that stops responding, and recycle workers now and
+# then, staggered so they do not all restart at once.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+max_requests = 10000
+max_requests_jitter = 1000
+accesslog = "-"
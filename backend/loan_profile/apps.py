@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class LoanProfileConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "loan_profile"
+
+    def ready(self):
+        from core import metrics
+        from loan_profile import cache, signals  # noqa: F401
+
+        metrics.register_counter(
+            "loanprofile_list_cache_hits_total",
+            "Loan profile list pages served from the cache.",
+            lambda: cache.get_stats()["hits"],
+        )
+        metrics.register_counter(
+            "loanprofile_list_cache_misses_total",
+            "Loan profile list pages not found in the cache.",
+            lambda: cache.get_stats()["misses"],
+        )
@@ -0,0 +1,89 @@
+"""
+Response cache for the loan profile list.
+
+List pages are cached under a key made of a generation number and the
+request's query parameters. Invalidation bumps the generation, which
+orphans every cached page at once; the orphans expire on their own. It
+also records when it happened, so a page read from a replica that may
+not have replayed the invalidating write yet is not cached.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import replicas
+
+
+GENERATION_KEY = "loanprofile:list:generation"
+INVALIDATED_AT_KEY = "loanprofile:list:invalidated_at"
+HITS_KEY = "loanprofile:list:hits"
+MISSES_KEY = "loanprofile:list:misses"
+
+
+def get_cache():
+    """Return the cache backend holding loan profile list pages."""
+    return caches[settings.LOAN_PROFILE_LIST_CACHE_ALIAS]
+
+
+def _increment(cache, key):
+    """Increment a counter that never expires, creating it if missing."""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key was evicted between add() and incr().
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _page_key(cache, request):
+    """Return the cache key of the list page for a request."""
+    generation = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+    params = sorted(request.query_params.lists())
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f"loanprofile:list:{generation}:{digest}"
+
+
+def get_list_page(request):
+    """
+    Return the cached (data, validators) of the list page for a request,
+    or None on a miss.
+    """
+    cache = get_cache()
+    data = cache.get(_page_key(cache, request))
+    _increment(cache, MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_list_page(request, data, validators):
+    """
+    Cache the serialized list page for a request and its validators,
+    unless they were read from a replica behind the last invalidation.
+    """
+    cache = get_cache()
+    if replicas.may_predate(cache.get(INVALIDATED_AT_KEY, 0)):
+        return
+    cache.set(
+        _page_key(cache, request),
+        (data, validators),
+        timeout=settings.LOAN_PROFILE_LIST_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_list_pages(**kwargs):
+    """Drop every cached list page."""
+    cache = get_cache()
+    cache.set(INVALIDATED_AT_KEY, time.time(), timeout=None)
+    _increment(cache, GENERATION_KEY)
+
+
+def get_stats():
+    """Return the hit and miss counters of the list cache."""
+    counters = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": counters.get(HITS_KEY, 0),
+        "misses": counters.get(MISSES_KEY, 0),
+    }
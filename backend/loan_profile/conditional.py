@@ -0,0 +1,82 @@
+"""
+Conditional GET support for the loan_profile app.
+
+Validators are computed from the updated_at timestamps of the loan
+profiles on a page and of their owners, which is a narrow indexed query
+that runs before anything is serialized. Changes to the funding totals
+touch updated_at, so they change the validators too.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+VALIDATOR_FIELDS = ("pk", "updated_at", "user__updated_at")
+
+
+def _validators(rows, *extra):
+    """Return the strong ETag and Last-Modified timestamp of rows."""
+    digest = hashlib.md5(repr(extra).encode())
+    last_modified = None
+    for row in rows:
+        digest.update(
+            repr([row[field] for field in VALIDATOR_FIELDS]).encode()
+        )
+        row_modified = max(row["updated_at"], row["user__updated_at"])
+        if last_modified is None or row_modified > last_modified:
+            last_modified = row_modified
+    return {
+        "etag": f'"{digest.hexdigest()}"',
+        "last_modified": last_modified and int(last_modified.timestamp()),
+    }
+
+
+def list_validators(view, request):
+    """Return the validators of the list page a request asks for."""
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.pagination_class()
+    ordering = paginator.get_ordering(request, queryset, view)
+    fields = {*VALIDATOR_FIELDS, *(name.lstrip("-") for name in ordering)}
+    rows = paginator.paginate_queryset(
+        queryset.values(*fields), request, view
+    )
+    return _validators(
+        rows, paginator.has_next, paginator.has_previous, len(rows)
+    )
+
+
+def detail_validators(view):
+    """Return the validators of a loan profile, or None if not found."""
+    lookup = view.kwargs[view.lookup_url_kwarg or view.lookup_field]
+    rows = list(
+        view.get_queryset()
+        .filter(**{view.lookup_field: lookup})
+        .values(*VALIDATOR_FIELDS)
+    )
+    return _validators(rows) if rows else None
+
+
+def not_modified(request, validators):
+    """
+    Return a 304 response if the request's preconditions match the
+    validators, otherwise None.
+    """
+    response = get_conditional_response(
+        request,
+        etag=validators["etag"],
+        last_modified=validators["last_modified"],
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    """Add the validators to a response and require revalidation."""
+    response["ETag"] = validators["etag"]
+    if validators["last_modified"] is not None:
+        response["Last-Modified"] = http_date(validators["last_modified"])
+    patch_cache_control(response, no_cache=True)
+    return response
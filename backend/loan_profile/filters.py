@@ -0,0 +1,83 @@
+"""
+Filters for the loan_profile app.
+"""
+
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from core.models import LoanProfileStatus
+
+
+class LoanProfileFilterSerializer(serializers.Serializer):
+    """Serializer for the loan profile list query parameters."""
+
+    q = serializers.CharField(
+        required=False, allow_blank=True, max_length=200
+    )
+    status = serializers.ChoiceField(
+        choices=LoanProfileStatus.choices, required=False
+    )
+    business_type = serializers.CharField(required=False)
+    deadline_after = serializers.DateField(required=False)
+    deadline_before = serializers.DateField(required=False)
+    remaining_min = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    remaining_max = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    country = serializers.IntegerField(required=False)
+    city = serializers.IntegerField(required=False)
+
+
+class LoanProfileFilterBackend(BaseFilterBackend):
+    """
+    Filter loan profiles by the query parameters of
+    LoanProfileFilterSerializer. Every parameter maps onto an index of
+    LoanProfile, or onto the country and city foreign keys of its user;
+    ?q= is a full-text search over the GIN-indexed search vector.
+    """
+
+    lookups = {
+        "status": "status",
+        "business_type": "business_type",
+        "deadline_after": "deadline_to_receive_loan__gte",
+        "deadline_before": "deadline_to_receive_loan__lte",
+        "remaining_min": "amount_remaining__gte",
+        "remaining_max": "amount_remaining__lte",
+        "country": "user__country_id",
+        "city": "user__city_id",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        if view.action != "list":
+            return queryset
+
+        params = LoanProfileFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        search_text = filters.pop("q", None)
+        if search_text:
+            queryset = queryset.search(search_text)
+        return queryset.filter(
+            **{self.lookups[name]: value for name, value in filters.items()}
+        )
+
+
+class LoanProfileOrderingFilter(OrderingFilter):
+    """
+    Ordering filter that always breaks ties on the primary key and ranks
+    search results by relevance unless another ordering is requested.
+    """
+
+    def get_default_ordering(self, view):
+        if view.request.query_params.get("q"):
+            return ("-search_rank",)
+        return super().get_default_ordering(view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[-1].lstrip("-") not in ("id", "pk"):
+            tie_breaker = "-id" if ordering[0].startswith("-") else "id"
+            ordering = (*ordering, tie_breaker)
+        return ordering
@@ -0,0 +1,18 @@
+"""
+Pagination for the loan_profile app.
+"""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class LoanProfileCursorPagination(CursorPagination):
+    """
+    Keyset pagination for loan profiles, so each page costs an indexed
+    range scan no matter how deep the client has paged.
+    """
+
+    ordering = "-id"
+    page_size = settings.LOAN_PROFILE_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.LOAN_PROFILE_MAX_PAGE_SIZE
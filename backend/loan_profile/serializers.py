@@ -3,13 +3,19 @@ Serializers for the loan_profile app.
 """
 
 from rest_framework import serializers
+from core.metrics import TimedSerializerMixin
 from core.models import LoanProfile
 
 
-class LoanProfileSerializer(serializers.ModelSerializer):
+class LoanProfileSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     """Serializer for loan profile objects."""
 
     user_name = serializers.CharField(source="user.name", read_only=True)
+    amount_lended_to_date = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
 
     class Meta:
         model = LoanProfile
@@ -24,6 +30,7 @@ class LoanProfileSerializer(serializers.ModelSerializer):
             "loan_duration_months",
             "total_amount_required",
             "amount_lended_to_date",
+            "lender_count",
         )
         read_only_fields = (
             "id",
@@ -31,6 +38,7 @@ class LoanProfileSerializer(serializers.ModelSerializer):
             "status",
             "user_name",
             "amount_lended_to_date",
+            "lender_count",
         )
 
 
@@ -47,4 +55,4 @@ class LoanProfileDetailSerializer(LoanProfileSerializer):
             "deadline_to_receive_loan",
             "user_name",
         )
-        read_only_fields = ("id", "user", "status", "user_name")
+        read_only_fields = LoanProfileSerializer.Meta.read_only_fields
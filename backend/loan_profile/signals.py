@@ -0,0 +1,53 @@
+"""
+Signal receivers for the loan_profile app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.models import LoanProfile, User
+from core.signals import funding_totals_changed
+from loan_profile import cache
+
+
+def _invalidate_on_commit(using=None):
+    """
+    Invalidate cached list pages once the current transaction commits,
+    so a concurrent request cannot cache the data being replaced.
+    """
+    transaction.on_commit(cache.invalidate_list_pages, using=using)
+
+
+@receiver(post_save, sender=LoanProfile)
+@receiver(post_delete, sender=LoanProfile)
+def loan_profile_changed(sender, using, **kwargs):
+    _invalidate_on_commit(using)
+
+
+@receiver(pre_save, sender=User)
+def owner_saving(sender, instance, using, update_fields, **kwargs):
+    # The list only shows the name of the owner.
+    if instance._state.adding or (
+        update_fields is not None and "name" not in update_fields
+    ):
+        instance._listed_name_changed = False
+        return
+    saved_name = (
+        sender._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values_list("name", flat=True)
+        .first()
+    )
+    instance._listed_name_changed = saved_name != instance.name
+
+
+@receiver(post_save, sender=User)
+def owner_changed(sender, instance, using, **kwargs):
+    if getattr(instance, "_listed_name_changed", False):
+        _invalidate_on_commit(using)
+
+
+@receiver(funding_totals_changed)
+def funding_changed(sender, using, **kwargs):
+    _invalidate_on_commit(using)
@@ -3,7 +3,8 @@ Tests for loan profile API.
 """
 
 from decimal import Decimal
-from datetime import date
+from datetime import date, timedelta
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -12,8 +13,19 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import LoanProfile, LoanProfileStatus
+from cities_light.models import Country, City
 
+from core import metrics, replicas
+from core.models import (
+    LoanProfile,
+    LoanProfileStatus,
+    Transaction,
+    TransactionStatus,
+    UserRole,
+)
+
+from loan_profile import cache
+from loan_profile.pagination import LoanProfileCursorPagination
 from loan_profile.serializers import (
     LoanProfileSerializer,
     LoanProfileDetailSerializer,
@@ -48,6 +60,16 @@ def create_loan_profile(user, **params):
     return loan_profile
 
 
+def create_fundable_loan_profile(user, **params):
+    """Create and return an approved loan profile open for funding."""
+    return create_loan_profile(
+        user,
+        status=LoanProfileStatus.APPROVED,
+        deadline_to_receive_loan=date.today() + timedelta(days=30),
+        **params,
+    )
+
+
 def create_user(**params):
     """Create and return a new user."""
     return get_user_model().objects.create_user(**params)
@@ -57,6 +79,7 @@ class PublicLoanProfileApiTests(TestCase):
     """Test the unauthenticated loan profile API."""
 
     def setUp(self):
+        cache.get_cache().clear()
         self.client = APIClient()
         self.user = create_user(email="user@example.com", password="pass123")
 
@@ -84,7 +107,362 @@ class PublicLoanProfileApiTests(TestCase):
         loan_profiles = LoanProfile.objects.all().order_by("-id")
         serializer = LoanProfileSerializer(loan_profiles, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_query_count_is_constant(self):
+        """Test listing loan profiles does not query once per profile."""
+        lender = create_user(
+            email="lender@example.com",
+            password="pass123",
+            role=UserRole.LENDER,
+        )
+        for i in range(5):
+            owner = create_user(
+                email=f"borrower{i}@example.com", password="pass123"
+            )
+            loan_profile = create_fundable_loan_profile(user=owner)
+            Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=loan_profile,
+                amount=Decimal("10.00"),
+                status=TransactionStatus.COMPLETED,
+            )
+
+        # One query for the conditional GET validators, one for the page.
+        with self.assertNumQueries(2):
+            res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 5)
+        for item in res.data["results"]:
+            self.assertEqual(item["amount_lended_to_date"], Decimal("10.00"))
+
+    def test_list_is_paginated_by_cursor(self):
+        """Test the list is returned in pages linked by cursors."""
+        loan_profiles = [create_loan_profile(user=self.user) for _ in range(5)]
+        expected_ids = [lp.id for lp in reversed(loan_profiles)]
+
+        res = self.client.get(LOAN_PROFILES_URL, {"page_size": 2})
+        seen_ids = [item["id"] for item in res.data["results"]]
+        self.assertIsNone(res.data["previous"])
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen_ids += [item["id"] for item in res.data["results"]]
+
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_list_page_size_is_capped(self):
+        """Test the requested page size cannot exceed the maximum."""
+        for _ in range(3):
+            create_loan_profile(user=self.user)
+
+        with patch.object(LoanProfileCursorPagination, "max_page_size", 2):
+            res = self.client.get(LOAN_PROFILES_URL, {"page_size": 50})
+
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNotNone(res.data["next"])
+
+    def test_filter_loan_profiles(self):
+        """Test filtering the list by the supported parameters."""
+        country = Country.objects.create(name="Country")
+        city = City.objects.create(name="City", country=country)
+        located_user = create_user(
+            email="located@example.com",
+            password="pass123",
+            country=country,
+            city=city,
+        )
+        approved = create_loan_profile(
+            user=located_user,
+            status=LoanProfileStatus.APPROVED,
+            business_type="Farming",
+            deadline_to_receive_loan="2030-06-01",
+            total_amount_required=Decimal("900.00"),
+        )
+        pending = create_loan_profile(
+            user=self.user, deadline_to_receive_loan="2029-01-01"
+        )
+        cases = [
+            ({"status": LoanProfileStatus.APPROVED}, [approved]),
+            ({"business_type": "Food"}, [pending]),
+            ({"deadline_after": "2030-01-01"}, [approved]),
+            ({"deadline_before": "2030-01-01"}, [pending]),
+            ({"remaining_min": "600"}, [approved]),
+            ({"remaining_max": "600"}, [pending]),
+            ({"country": country.id}, [approved]),
+            ({"city": city.id, "status": LoanProfileStatus.PENDING}, []),
+        ]
+
+        for params, expected in cases:
+            res = self.client.get(LOAN_PROFILES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [item["id"] for item in res.data["results"]],
+                [lp.id for lp in expected],
+                params,
+            )
+
+    def test_invalid_filter_returns_error(self):
+        """Test an invalid filter value is rejected."""
+        res = self.client.get(LOAN_PROFILES_URL, {"deadline_after": "soon"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_loan_profiles_with_cursor(self):
+        """Test ordering is kept stable across cursor pages."""
+        amounts = ["300.00", "100.00", "300.00", "200.00", "100.00"]
+        loan_profiles = [
+            create_loan_profile(
+                user=self.user, total_amount_required=Decimal(amount)
+            )
+            for amount in amounts
+        ]
+        expected_ids = [
+            lp.id
+            for lp in sorted(
+                loan_profiles,
+                key=lambda lp: (lp.total_amount_required, lp.id),
+            )
+        ]
+
+        res = self.client.get(
+            LOAN_PROFILES_URL, {"ordering": "amount_remaining", "page_size": 2}
+        )
+        seen_ids = [item["id"] for item in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen_ids += [item["id"] for item in res.data["results"]]
+
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_search_loan_profiles(self):
+        """Test searching ranks title matches above story matches."""
+        storyteller = create_user(
+            email="story@example.com",
+            password="pass123",
+            story="I grew up on a bakery street.",
+        )
+        story_match = create_loan_profile(user=storyteller)
+        title_match = create_loan_profile(
+            user=self.user, title="Family bakery expansion"
+        )
+        create_loan_profile(user=self.user, title="Bicycle repair shop")
+
+        res = self.client.get(LOAN_PROFILES_URL, {"q": "bakeries"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [title_match.id, story_match.id],
+        )
+
+    def test_search_follows_owner_story_updates(self):
+        """Test the search vector is refreshed when the owner changes."""
+        loan_profile = create_loan_profile(user=self.user)
+        self.user.story = "Weaving traditional baskets."
+        self.user.save()
+
+        res = self.client.get(LOAN_PROFILES_URL, {"q": "basket"})
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [loan_profile.id]
+        )
+
+    def test_search_results_are_paginated(self):
+        """Test ranked search results can be paged through."""
+        loan_profiles = [
+            create_loan_profile(
+                user=self.user,
+                title="Pottery " * (i % 2 + 1),
+                description="Clay pottery studio",
+            )
+            for i in range(5)
+        ]
+
+        res = self.client.get(
+            LOAN_PROFILES_URL, {"q": "pottery", "page_size": 2}
+        )
+        seen_ids = [item["id"] for item in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen_ids += [item["id"] for item in res.data["results"]]
+
+        self.assertCountEqual(seen_ids, [lp.id for lp in loan_profiles])
+        self.assertEqual(len(seen_ids), len(loan_profiles))
+
+    def test_anonymous_list_is_served_from_cache(self):
+        """Test repeated anonymous list requests skip the database."""
+        create_loan_profile(user=self.user)
+        first = self.client.get(LOAN_PROFILES_URL, {"page_size": 5})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(LOAN_PROFILES_URL, {"page_size": 5})
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1})
+        counters = metrics.read_counters()
+        self.assertEqual(counters["loanprofile_list_cache_hits_total"], 1)
+        self.assertEqual(counters["loanprofile_list_cache_misses_total"], 1)
+
+    def test_list_page_predating_invalidation_not_cached(self):
+        """Test a page from a replica behind the cache is not cached."""
+        create_loan_profile(user=self.user)
+        with patch.object(replicas, "may_predate", return_value=True):
+            self.client.get(LOAN_PROFILES_URL)
+
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+
+    def test_list_cache_is_keyed_by_query_params(self):
+        """Test different query parameters are cached separately."""
+        create_loan_profile(user=self.user, business_type="Food")
+        create_loan_profile(user=self.user, business_type="Farming")
+        self.client.get(LOAN_PROFILES_URL, {"business_type": "Food"})
+
+        res = self.client.get(LOAN_PROFILES_URL, {"business_type": "Farming"})
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_list_cache_invalidated_by_loan_profile_change(self):
+        """Test saving a loan profile drops the cached list pages."""
+        loan_profile = create_loan_profile(user=self.user)
+        self.client.get(LOAN_PROFILES_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loan_profile.title = "Updated title"
+            loan_profile.save()
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["title"], "Updated title")
+
+    def test_list_cache_invalidated_by_completed_transaction(self):
+        """Test a completed transaction drops the cached list pages."""
+        loan_profile = create_fundable_loan_profile(user=self.user)
+        lender = create_user(
+            email="lender@example.com",
+            password="pass123",
+            role=UserRole.LENDER,
+        )
+        self.client.get(LOAN_PROFILES_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=loan_profile,
+                amount=Decimal("20.00"),
+                status=TransactionStatus.COMPLETED,
+            )
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(
+            res.data["results"][0]["amount_lended_to_date"], Decimal("20.00")
+        )
+
+    def test_list_cache_invalidated_by_owner_rename(self):
+        """Test renaming the owner of a loan profile drops the cache."""
+        create_loan_profile(user=self.user)
+        self.client.get(LOAN_PROFILES_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = "Renamed"
+            self.user.save()
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["user_name"], "Renamed")
+
+    def test_list_cache_kept_on_unlisted_owner_changes(self):
+        """Test owner changes the list does not show keep the cache."""
+        create_loan_profile(user=self.user)
+        self.client.get(LOAN_PROFILES_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("newpass123")
+            self.user.save(update_fields=["password"])
+            self.user.story = "A new story"
+            self.user.save()
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+
+    def test_authenticated_list_bypasses_cache(self):
+        """Test authenticated list requests are not cached."""
+        create_loan_profile(user=self.user)
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        self.assertNotIn("X-Cache", res)
+        self.assertEqual(cache.get_stats(), {"hits": 0, "misses": 0})
+
+    def test_list_not_modified(self):
+        """Test a list page matching If-None-Match is not resent."""
+        create_loan_profile(user=self.user)
+        res = self.client.get(LOAN_PROFILES_URL)
+        cache.get_cache().clear()
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(
+                LOAN_PROFILES_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], res["ETag"])
+
+    def test_cached_list_not_modified(self):
+        """Test a cached list page answers conditional requests."""
+        create_loan_profile(user=self.user)
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                LOAN_PROFILES_URL,
+                HTTP_IF_MODIFIED_SINCE=res["Last-Modified"],
+            )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_list_etag_changes_with_funding(self):
+        """Test a completed transaction changes the list ETag."""
+        loan_profile = create_fundable_loan_profile(user=self.user)
+        lender = create_user(
+            email="lender@example.com",
+            password="pass123",
+            role=UserRole.LENDER,
+        )
+        self.client.force_authenticate(lender)
+        res = self.client.get(LOAN_PROFILES_URL)
+
+        Transaction.objects.create_transaction(
+            lender=lender,
+            borrower=loan_profile,
+            amount=Decimal("20.00"),
+            status=TransactionStatus.COMPLETED,
+        )
+        modified = self.client.get(
+            LOAN_PROFILES_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified["ETag"], res["ETag"])
+
+    def test_list_etag_depends_on_page(self):
+        """Test different pages of the list have different ETags."""
+        for _ in range(3):
+            create_loan_profile(user=self.user)
+        first = self.client.get(LOAN_PROFILES_URL, {"page_size": 2})
+
+        second = self.client.get(first.data["next"])
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
 
 
 class PrivateLoanProfileApiTests(TestCase):
@@ -104,6 +482,21 @@ class PrivateLoanProfileApiTests(TestCase):
         serializer = LoanProfileDetailSerializer(loan_profile)
         self.assertEqual(res.data, serializer.data)
 
+    def test_get_loan_profile_detail_not_modified(self):
+        """Test an unchanged loan profile detail is not resent."""
+        loan_profile = create_loan_profile(user=self.user)
+        url = detail_url(loan_profile.id)
+        res = self.client.get(url)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        loan_profile.title = "Updated title"
+        loan_profile.save()
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(modified.data["title"], "Updated title")
+
     def test_create_loan_profile(self):
         """Test creating a new loan profile."""
         payload = {
@@ -0,0 +1,164 @@
+"""
+Tests for the indexes backing the loan profile list filters.
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from cities_light.models import Country, City
+
+from core.models import LoanProfile, LoanProfileStatus, User
+
+
+LOAN_PROFILES_URL = reverse("loan_profile:loanprofile-list")
+WORDS = ["bakery", "farm", "tailor", "shop", "school", "water", "solar"]
+
+
+class LoanProfileListPlanTests(TestCase):
+    """
+    Test the plans of the page queries of the loan profile list, on
+    enough rows for the planner to choose as it would in production.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        countries = Country.objects.bulk_create(
+            Country(name=f"Country {i}", slug=f"country-{i}")
+            for i in range(20)
+        )
+        cities = City.objects.bulk_create(
+            City(name=f"City {i}", slug=f"city-{i}", country=countries[i % 20])
+            for i in range(101)
+        )
+        cls.cities = cities
+        # The last city has only three users.
+        users = User.objects.bulk_create(
+            User(
+                email=f"user{i}@example.com",
+                password="!",
+                country=city.country,
+                city=city,
+            )
+            for i, city in enumerate([*cities[:100] * 10, *cities[100:] * 3])
+        )
+        cls.user = users[0]
+        # One profile in 20 is approved, and one in 500 is a pottery,
+        # which the selective filters below look for.
+        LoanProfile.objects.bulk_create(
+            (
+                LoanProfile(
+                    user=users[i % len(users)],
+                    photoURL="www.example.com/photo.jpg",
+                    title=rng.choice(WORDS),
+                    description=" ".join(rng.choices(WORDS, k=5)),
+                    business_type=(
+                        "Pottery" if i % 500 == 0 else f"Type {i % 20}"
+                    ),
+                    loan_duration_months=12,
+                    total_amount_required=Decimal(rng.randrange(100, 10000)),
+                    deadline_to_receive_loan=(
+                        date(2022, 1, 1) + timedelta(days=rng.randrange(1500))
+                    ),
+                    status=(
+                        LoanProfileStatus.APPROVED
+                        if i % 20 == 0
+                        else LoanProfileStatus.REJECTED
+                    ),
+                )
+                for i in range(20000)
+            ),
+            batch_size=2000,
+        )
+        LoanProfile.objects.filter(business_type="Pottery").update(
+            description="pottery"
+        )
+        LoanProfile.objects.all().update_search_vector()
+        with connection.cursor() as cursor:
+            # As autovacuum would, move the new rows out of the pending
+            # list of the search index, which the planner avoids.
+            cursor.execute(
+                "SELECT gin_clean_pending_list('loanprofile_search_vector')"
+            )
+            cursor.execute("ANALYZE core_loanprofile")
+            cursor.execute("ANALYZE core_user")
+
+    def setUp(self):
+        self.client = APIClient()
+        # Authenticated requests are not served from the cache.
+        self.client.force_authenticate(self.user)
+
+    def explain_second_page(self, params):
+        """
+        Return the query plan of the second page of the list filtered
+        with params, as the view queries it.
+        """
+        res = self.client.get(LOAN_PROFILES_URL, params)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(res.data["next"])
+        sql = [
+            query["sql"]
+            for query in queries
+            if 'FROM "core_loanprofile"' in query["sql"]
+        ][-1]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_unselective_filters_walk_primary_key(self):
+        """
+        Test pages matching many profiles read the primary key backwards
+        and stop once the page is full, rather than sorting the matches.
+        """
+        cases = [
+            {},
+            {"status": LoanProfileStatus.APPROVED},
+            {"business_type": "Type 1"},
+            {"city": self.cities[0].id},
+        ]
+
+        for params in cases:
+            plan = self.explain_second_page(params)
+
+            self.assertIn(
+                "Index Scan Backward using core_loanprofile_pkey",
+                plan,
+                params,
+            )
+            self.assertNotIn("Sort", plan, params)
+
+    def test_selective_filters_use_indexes(self):
+        """Test pages matching few profiles read them from an index."""
+        approved = LoanProfileStatus.APPROVED
+        cases = [
+            (
+                {"status": approved, "deadline_before": "2022-03-01"},
+                "loanprofile_(status|approved)_deadline",
+            ),
+            ({"business_type": "Pottery"}, "loanprofile_btype_status"),
+            (
+                {"business_type": "Pottery", "status": approved},
+                "loanprofile_btype_status",
+            ),
+            ({"remaining_min": "9980"}, "loanprofile_amount_remaining"),
+            (
+                {"remaining_min": "9900", "remaining_max": "9950"},
+                "loanprofile_amount_remaining",
+            ),
+            ({"city": self.cities[-1].id}, "core_user_city_id_"),
+            ({"q": "pottery"}, "loanprofile_search_vector"),
+        ]
+
+        for params, index_name in cases:
+            plan = self.explain_second_page(params)
+
+            self.assertNotIn("Seq Scan on core_loanprofile", plan, params)
+            self.assertRegex(plan, rf"(on|using) {index_name}", params)
@@ -3,23 +3,84 @@ Views for the loan_profile app.
 """
 
 from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from core.models import LoanProfile
-from loan_profile import serializers
+from core.replicas import ReplicaReadMixin
+from loan_profile import cache, conditional, serializers
+from loan_profile.filters import (
+    LoanProfileFilterBackend,
+    LoanProfileOrderingFilter,
+)
+from loan_profile.pagination import LoanProfileCursorPagination
+from user.authentication import CachedTokenAuthentication
 
 
-class LoanProfileViewSet(viewsets.ModelViewSet):
+class LoanProfileViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """View for managing loan profiles."""
 
+    replica_read_actions = ("list", "retrieve")
+
     serializer_class = serializers.LoanProfileDetailSerializer
     queryset = LoanProfile.objects.all()
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    pagination_class = LoanProfileCursorPagination
+    filter_backends = [LoanProfileFilterBackend, LoanProfileOrderingFilter]
+    ordering_fields = [
+        "id",
+        "created_at",
+        "deadline_to_receive_loan",
+        "total_amount_required",
+        "amount_remaining",
+    ]
+    ordering = ["-id"]
 
     def get_queryset(self):
         """Return objects in reverse order."""
-        return self.queryset.order_by("-id")
+        return (
+            self.queryset.select_related("user")
+            .with_amount_remaining()
+            .order_by("-id")
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        List loan profiles, answering conditional requests before
+        serializing and serving anonymous requests from the cache.
+        """
+        cacheable = not request.user.is_authenticated
+        if cacheable:
+            cached = cache.get_list_page(request)
+            if cached is not None:
+                data, validators = cached
+                response = conditional.not_modified(
+                    request, validators
+                ) or Response(data)
+                response["X-Cache"] = "HIT"
+                return conditional.set_validators(response, validators)
+
+        validators = conditional.list_validators(self, request)
+        response = conditional.not_modified(request, validators)
+        if response is not None:
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if cacheable:
+            cache.set_list_page(request, response.data, validators)
+            response["X-Cache"] = "MISS"
+        return conditional.set_validators(response, validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a loan profile unless the client's copy is current."""
+        validators = conditional.detail_validators(self)
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        response = conditional.not_modified(request, validators)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return conditional.set_validators(response, validators)
 
     def get_permissions(self):
         """Return permissions based on action."""
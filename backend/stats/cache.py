@@ -0,0 +1,47 @@
+"""
+Response cache for the platform statistics.
+
+The statistics only change when their materialized views are refreshed,
+so the serialized response is cached until the refresh_stats command
+invalidates it, or until it expires. A response read from a replica that
+may not have replayed the last refresh yet is not cached.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import replicas
+
+
+STATS_KEY = "stats:platform"
+INVALIDATED_AT_KEY = "stats:platform:invalidated_at"
+
+
+def get_cache():
+    """Return the cache backend holding the platform statistics."""
+    return caches[settings.STATS_CACHE_ALIAS]
+
+
+def get_stats():
+    """Return the cached statistics response data, or None on a miss."""
+    return get_cache().get(STATS_KEY)
+
+
+def set_stats(data):
+    """
+    Cache the statistics response data, unless read from a replica
+    behind the last invalidation.
+    """
+    cache = get_cache()
+    if replicas.may_predate(cache.get(INVALIDATED_AT_KEY, 0)):
+        return
+    cache.set(STATS_KEY, data, timeout=settings.STATS_CACHE_TIMEOUT)
+
+
+def invalidate_stats():
+    """Drop the cached statistics."""
+    cache = get_cache()
+    cache.set(INVALIDATED_AT_KEY, time.time(), timeout=None)
+    cache.delete(STATS_KEY)
@@ -0,0 +1,40 @@
+"""
+Serializers for the stats app.
+"""
+
+from rest_framework import serializers
+
+from core.models import CountryStats, PlatformStats
+
+
+class CountryStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the statistics of a country."""
+
+    country_name = serializers.CharField(source="country.name")
+    country_code = serializers.CharField(source="country.code2")
+
+    class Meta:
+        model = CountryStats
+        fields = (
+            "country",
+            "country_name",
+            "country_code",
+            "total_funded",
+            "active_profiles",
+            "lenders",
+        )
+        read_only_fields = fields
+
+
+class PlatformStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the platform statistics."""
+
+    class Meta:
+        model = PlatformStats
+        fields = (
+            "total_funded",
+            "active_profiles",
+            "lenders",
+            "refreshed_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,30 @@
+"""
+Signal receivers for the stats app.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import jobs
+from core.models import LoanProfile
+from core.signals import funding_totals_changed
+from stats.tasks import refresh_stats
+
+
+def _schedule_refresh():
+    jobs.enqueue(
+        refresh_stats,
+        delay=settings.STATS_REFRESH_DELAY,
+        unique_key="all",
+    )
+
+
+@receiver(post_save, sender=LoanProfile)
+@receiver(post_delete, sender=LoanProfile)
+@receiver(funding_totals_changed)
+def funding_data_changed(sender, using, **kwargs):
+    # Queued after the commit: inserting the same unique job in
+    # concurrent transactions would make each wait for the previous one.
+    transaction.on_commit(_schedule_refresh, using=using)
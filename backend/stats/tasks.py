@@ -0,0 +1,15 @@
+"""
+Background tasks for the stats app.
+"""
+
+from core.jobs import task
+from core.models import CountryStats, PlatformStats
+from stats import cache
+
+
+@task
+def refresh_stats():
+    """Refresh the statistics views and drop the cached statistics."""
+    for model in (PlatformStats, CountryStats):
+        model.objects.refresh()
+    cache.invalidate_stats()
@@ -0,0 +1,150 @@
+"""
+Tests for the platform statistics API.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from cities_light.models import Country
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import jobs, replicas
+from core.models import (
+    Job,
+    LoanProfile,
+    LoanProfileStatus,
+    Transaction,
+    TransactionStatus,
+    UserRole,
+)
+from stats import cache
+
+
+STATS_URL = reverse("stats:stats")
+
+
+def refresh_stats():
+    call_command("refresh_stats", stdout=StringIO())
+
+
+class StatsApiTests(TestCase):
+    """Test the platform statistics API."""
+
+    def setUp(self):
+        self.country = Country.objects.create(name="Country", code2="CO")
+        borrower = get_user_model().objects.create_user(
+            email="borrower@example.com",
+            password="testpass123",
+            country=self.country,
+        )
+        lenders = [
+            get_user_model().objects.create_user(
+                email=f"lender{n}@example.com",
+                password="testpass123",
+                role=UserRole.LENDER,
+            )
+            for n in range(2)
+        ]
+        loan_profiles = [
+            LoanProfile.objects.create(
+                user=borrower,
+                photoURL="www.example.com/photo.jpg",
+                description="Test description",
+                business_type="Food",
+                total_amount_required=Decimal("500.00"),
+                deadline_to_receive_loan=date.today() + timedelta(days=30),
+                status=LoanProfileStatus.APPROVED,
+            )
+            for _ in range(2)
+        ]
+        for lender, amount in zip(lenders, ("10.00", "25.50")):
+            Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=loan_profiles[0],
+                amount=Decimal(amount),
+                status=TransactionStatus.COMPLETED,
+            )
+        LoanProfile.objects.filter(pk=loan_profiles[1].pk).update(
+            deadline_to_receive_loan=date.today() - timedelta(days=1)
+        )
+        cache.invalidate_stats()
+        self.client = APIClient()
+
+    def test_stats_as_of_last_refresh(self):
+        """Test the statistics only change when they are refreshed."""
+        before = self.client.get(STATS_URL)
+        refresh_stats()
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(before.data["total_funded"], "0.00")
+        self.assertEqual(res.data["total_funded"], "35.50")
+        self.assertEqual(res.data["active_profiles"], 1)
+        self.assertEqual(res.data["lenders"], 2)
+        self.assertGreater(
+            res.data["refreshed_at"], before.data["refreshed_at"]
+        )
+        self.assertEqual(
+            res.data["countries"],
+            [
+                {
+                    "country": self.country.pk,
+                    "country_name": "Country",
+                    "country_code": "CO",
+                    "total_funded": "35.50",
+                    "active_profiles": 1,
+                    "lenders": 2,
+                }
+            ],
+        )
+
+    def test_stats_cached(self):
+        """Test the statistics are served from the cache."""
+        refresh_stats()
+        self.client.get(STATS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data["total_funded"], "35.50")
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("max-age=", res["Cache-Control"])
+
+    def test_stats_predating_invalidation_not_cached(self):
+        """Test statistics from a replica behind the cache are not cached."""
+        refresh_stats()
+        with patch.object(replicas, "may_predate", return_value=True):
+            self.client.get(STATS_URL)
+
+        self.assertIsNone(cache.get_stats())
+
+    @override_settings(STATS_REFRESH_DELAY=0)
+    def test_refresh_queued_on_change(self):
+        """Test a funding change queues one refresh of the statistics."""
+        lender = get_user_model().objects.get(email="lender0@example.com")
+        loan_profile = LoanProfile.objects.order_by("pk").first()
+        self.client.get(STATS_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=loan_profile,
+                amount=Decimal("4.50"),
+                status=TransactionStatus.COMPLETED,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            loan_profile.save()
+
+        job = Job.objects.get()
+        self.assertEqual(job.task, "stats.tasks.refresh_stats")
+        jobs.run(jobs.claim()[0])
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.data["total_funded"], "40.00")
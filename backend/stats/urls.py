@@ -0,0 +1,14 @@
+"""
+URL mappings for the stats app.
+"""
+
+from django.urls import path
+
+from stats import views
+
+
+app_name = "stats"
+
+urlpatterns = [
+    path("", views.StatsView.as_view(), name="stats"),
+]
@@ -0,0 +1,42 @@
+"""
+Views for the stats app.
+"""
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.models import CountryStats, PlatformStats
+from core.replicas import ReplicaReadMixin
+from stats import cache
+from stats.serializers import CountryStatsSerializer, PlatformStatsSerializer
+
+
+class StatsView(ReplicaReadMixin, APIView):
+    """
+    Show the platform and per-country funding statistics as of the last
+    refresh, given by refreshed_at.
+    """
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    def get(self, request):
+        """Return the statistics, from the cache when possible."""
+        data = cache.get_stats()
+        if data is None:
+            data = PlatformStatsSerializer(PlatformStats.objects.get()).data
+            data["countries"] = CountryStatsSerializer(
+                CountryStats.objects.select_related("country").order_by(
+                    "-total_funded", "country"
+                ),
+                many=True,
+            ).data
+            cache.set_stats(data)
+        response = Response(data)
+        patch_cache_control(
+            response, public=True, max_age=settings.STATS_CACHE_TIMEOUT
+        )
+        return response
@@ -0,0 +1,147 @@
+"""
+Streaming export of the transaction ledger.
+
+Rows are read as tuples through a server-side cursor and written out as
+they arrive, so an export holds one chunk of the ledger in memory
+however large the ledger is. Where server-side cursors are disabled,
+as behind PgBouncer in transaction pooling mode, the chunks are read by
+id instead.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.utils import timezone
+
+from core.models import PaymentMethod, Transaction, TransactionStatus
+
+
+COLUMNS = (
+    ("id", "pk"),
+    ("created_at", "created_at"),
+    ("status_changed_at", "status_changed_at"),
+    ("status", "status"),
+    ("amount", "amount"),
+    ("payment_method", "payment_method"),
+    ("idempotency_key", "idempotency_key"),
+    ("lender_id", "user_id"),
+    ("lender_email", "user__email"),
+    ("lender_name", "user__name"),
+    ("loan_profile_id", "loan_profile_id"),
+    ("loan_profile_title", "loan_profile__title"),
+    ("borrower_id", "loan_profile__user_id"),
+)
+HEADER = tuple(name for name, _ in COLUMNS)
+
+STATUS_LABELS = dict(TransactionStatus.choices)
+PAYMENT_METHOD_LABELS = dict(PaymentMethod.choices)
+STATUS_COLUMN = HEADER.index("status")
+PAYMENT_METHOD_COLUMN = HEADER.index("payment_method")
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def ledger(since=None, until=None, statuses=None):
+    """
+    Return the ledger rows, in id order, of the transactions made from
+    the since date through the until date with one of the statuses.
+    """
+    transactions = Transaction.objects.all()
+    # Day boundaries instead of __date keep the filter sargable.
+    if since:
+        transactions = transactions.filter(
+            created_at__gte=_start_of_day(since)
+        )
+    if until:
+        transactions = transactions.filter(
+            created_at__lt=_start_of_day(until + timedelta(days=1))
+        )
+    if statuses:
+        transactions = transactions.filter(status__in=statuses)
+    return transactions.order_by("pk").values_list(
+        *(lookup for _, lookup in COLUMNS)
+    )
+
+
+def _by_id(queryset, chunk_size):
+    """Yield the rows of a ledger queryset, chunk_size at a time."""
+    last_id = None
+    while True:
+        chunk = queryset
+        if last_id is not None:
+            chunk = chunk.filter(pk__gt=last_id)
+        chunk = list(chunk[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def rows(queryset, chunk_size=2000):
+    """Yield ledger rows with choice values replaced by their labels."""
+    settings_dict = connections[queryset.db].settings_dict
+    if settings_dict["DISABLE_SERVER_SIDE_CURSORS"]:
+        results = _by_id(queryset, chunk_size)
+    else:
+        results = queryset.iterator(chunk_size=chunk_size)
+    for row in results:
+        row = list(row)
+        row[STATUS_COLUMN] = STATUS_LABELS[row[STATUS_COLUMN]]
+        row[PAYMENT_METHOD_COLUMN] = PAYMENT_METHOD_LABELS[
+            row[PAYMENT_METHOD_COLUMN]
+        ]
+        yield row
+
+
+class _Echo:
+    """A file-like object returning what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lines, size):
+    """Join lines into strings of size lines."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _with_header(ledger_rows):
+    yield HEADER
+    yield from ledger_rows
+
+
+def to_csv(queryset, chunk_size=2000):
+    """Yield the ledger as CSV, a chunk of rows at a time."""
+    writer = csv.writer(_Echo())
+    lines = (
+        writer.writerow(row)
+        for row in _with_header(rows(queryset, chunk_size))
+    )
+    return _chunked(lines, chunk_size)
+
+
+def to_ndjson(queryset, chunk_size=2000):
+    """Yield the ledger as newline-delimited JSON objects."""
+    lines = (
+        json.dumps(dict(zip(HEADER, row)), cls=DjangoJSONEncoder) + "\n"
+        for row in rows(queryset, chunk_size)
+    )
+    return _chunked(lines, chunk_size)
+
+
+FORMATS = {
+    "csv": ("text/csv", to_csv),
+    "ndjson": ("application/x-ndjson", to_ndjson),
+}
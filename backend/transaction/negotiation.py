@@ -0,0 +1,18 @@
+"""
+Content negotiation for the transaction app.
+"""
+
+from rest_framework.negotiation import BaseContentNegotiation
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Select the first renderer whatever the client accepts, for views
+    that stream their own content and only render errors.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
@@ -0,0 +1,45 @@
+"""
+Serializers for the transaction app.
+"""
+
+from rest_framework import serializers
+
+from core.metrics import TimedSerializerMixin
+from core.models import PaymentMethod, TransactionStatus
+from transaction import export
+
+
+class BulkTransactionSerializer(
+    TimedSerializerMixin, serializers.Serializer
+):
+    """
+    Serializer for one item of a transaction batch. Lenders and loan
+    profiles are plain ids, checked for the whole batch at once by
+    TransactionManager.bulk_create_transactions.
+    """
+
+    user = serializers.IntegerField(source="user_id")
+    loan_profile = serializers.IntegerField(source="loan_profile_id")
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0
+    )
+    payment_method = serializers.ChoiceField(
+        choices=PaymentMethod.choices, default=PaymentMethod.PAYPAL
+    )
+    status = serializers.ChoiceField(
+        choices=TransactionStatus.choices, default=TransactionStatus.PENDING
+    )
+    idempotency_key = serializers.CharField(max_length=255, required=False)
+
+
+class TransactionExportSerializer(serializers.Serializer):
+    """Serializer for the transaction export query parameters."""
+
+    output = serializers.ChoiceField(
+        choices=list(export.FORMATS), default="csv"
+    )
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    status = serializers.MultipleChoiceField(
+        choices=TransactionStatus.choices, required=False
+    )
@@ -0,0 +1,180 @@
+"""
+Tests for the transaction API.
+"""
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    LoanProfile,
+    LoanProfileStatus,
+    Transaction,
+    TransactionStatus,
+    UserRole,
+)
+
+
+BULK_URL = reverse("transaction:bulk")
+
+
+def create_user(**params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**params)
+
+
+class PrivateBulkTransactionApiTests(TestCase):
+    """Test the bulk transaction API for non-admin users."""
+
+    def test_admin_required(self):
+        """Test lenders cannot create transactions in bulk."""
+        client = APIClient()
+        client.force_authenticate(
+            create_user(
+                email="lender@example.com",
+                password="testpass123",
+                role=UserRole.LENDER,
+            )
+        )
+
+        res = client.post(BULK_URL, [], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminBulkTransactionApiTests(TestCase):
+    """Test the bulk transaction API for admins."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+        self.lender = create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=UserRole.LENDER,
+        )
+        self.loan_profile = LoanProfile.objects.create(
+            user=create_user(
+                email="borrower@example.com", password="testpass123"
+            ),
+            photoURL="www.example.com/photo.jpg",
+            title="Test title",
+            description="Test description",
+            business_type="Food",
+            loan_duration_months=12,
+            total_amount_required=Decimal("500.00"),
+            deadline_to_receive_loan=date.today() + timedelta(days=30),
+            status=LoanProfileStatus.APPROVED,
+        )
+
+    def item(self, **params):
+        defaults = {
+            "user": self.lender.pk,
+            "loan_profile": self.loan_profile.pk,
+            "amount": "25.00",
+            "status": TransactionStatus.COMPLETED,
+        }
+        defaults.update(params)
+        return defaults
+
+    def test_create_from_json(self):
+        """Test creating a JSON array of transactions."""
+        res = self.client.post(
+            BULK_URL, [self.item(), self.item()], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["index"] for item in res.data["created"]], [0, 1]
+        )
+        self.assertEqual(res.data["errors"], [])
+        self.assertEqual(
+            set(Transaction.objects.values_list("pk", flat=True)),
+            {item["id"] for item in res.data["created"]},
+        )
+        self.loan_profile.refresh_from_db()
+        self.assertEqual(
+            self.loan_profile.amount_lended_to_date, Decimal("50.00")
+        )
+
+    def test_create_from_ndjson(self):
+        """Test creating newline-delimited JSON transactions."""
+        body = "\n".join(json.dumps(self.item()) for _ in range(3)) + "\n"
+
+        res = self.client.post(
+            BULK_URL, body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["created"]), 3)
+
+    def test_invalid_ndjson(self):
+        """Test malformed NDJSON reports the offending line."""
+        body = json.dumps(self.item()) + "\n{not json\n"
+
+        res = self.client.post(
+            BULK_URL, body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("line 2", str(res.data["detail"]))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_per_item_errors(self):
+        """Test invalid items are reported without rejecting the batch."""
+        items = [
+            self.item(amount="not a number"),
+            self.item(user=self.loan_profile.user_id),
+            self.item(),
+            "not an object",
+        ]
+
+        res = self.client.post(BULK_URL, items, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"][0]["index"], 2)
+        errors = {item["index"]: item["errors"] for item in res.data["errors"]}
+        self.assertEqual(set(errors), {0, 1, 3})
+        self.assertIn("amount", errors[0])
+        self.assertIn("user", errors[1])
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_body_must_be_a_list(self):
+        """Test a single object is rejected."""
+        res = self.client.post(BULK_URL, self.item(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TRANSACTION_BATCH_MAX_SIZE=2)
+    def test_batch_size_limit(self):
+        """Test batches larger than the limit are rejected."""
+        res = self.client.post(BULK_URL, [self.item()] * 3, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_retried_batch(self):
+        """Test retrying a batch with idempotency keys creates nothing."""
+        items = [
+            self.item(idempotency_key="payment-1"),
+            self.item(idempotency_key="payment-2"),
+        ]
+        first = self.client.post(BULK_URL, items, format="json")
+
+        res = self.client.post(BULK_URL, items, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], [])
+        self.assertEqual(res.data["existing"], first.data["created"])
+        self.assertEqual(Transaction.objects.count(), 2)
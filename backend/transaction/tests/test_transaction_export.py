@@ -0,0 +1,248 @@
+"""
+Tests for the transaction ledger export.
+"""
+
+import csv
+import io
+import json
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import asyncdb
+from core.asgi import ASGIHandler
+from core.models import (
+    LoanProfile,
+    LoanProfileStatus,
+    Transaction,
+    TransactionStatus,
+    UserRole,
+)
+from transaction import export
+
+
+EXPORT_URL = reverse("transaction:export")
+
+
+def create_ledger():
+    """Create a loan profile with three transactions on three days."""
+    lender = get_user_model().objects.create_user(
+        email="lender@example.com",
+        password="testpass123",
+        name="Lender",
+        role=UserRole.LENDER,
+    )
+    loan_profile = LoanProfile.objects.create(
+        user=get_user_model().objects.create_user(
+            email="borrower@example.com", password="testpass123"
+        ),
+        photoURL="www.example.com/photo.jpg",
+        title="Bakery",
+        description="Test description",
+        business_type="Food",
+        total_amount_required=Decimal("500.00"),
+        deadline_to_receive_loan=date.today() + timedelta(days=30),
+        status=LoanProfileStatus.APPROVED,
+    )
+    created, _, _ = Transaction.objects.bulk_create_transactions(
+        [
+            {
+                "user_id": lender.pk,
+                "loan_profile_id": loan_profile.pk,
+                "amount": Decimal(amount),
+                "status": transaction_status,
+            }
+            for amount, transaction_status in (
+                ("10.00", TransactionStatus.COMPLETED),
+                ("20.50", TransactionStatus.PENDING),
+                ("30.00", TransactionStatus.COMPLETED),
+            )
+        ]
+    )
+    for day, transaction in enumerate(created.values(), 1):
+        Transaction.objects.filter(pk=transaction.pk).update(
+            created_at=timezone.make_aware(datetime(2024, 1, day, 12))
+        )
+    return [transaction.pk for transaction in created.values()]
+
+
+def parse_csv(content):
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+class TransactionExportTests(TestCase):
+    """Test exporting the ledger."""
+
+    def setUp(self):
+        self.ids = create_ledger()
+
+    def test_csv(self):
+        """Test the ledger is written with a header and labels."""
+        content = "".join(export.to_csv(export.ledger()))
+
+        rows = parse_csv(content)
+        self.assertEqual(tuple(rows[0]), export.HEADER)
+        self.assertEqual([int(row["id"]) for row in rows], self.ids)
+        self.assertEqual(rows[1]["status"], "Pending")
+        self.assertEqual(rows[1]["amount"], "20.50")
+        self.assertEqual(rows[1]["payment_method"], "PayPal")
+        self.assertEqual(rows[1]["lender_email"], "lender@example.com")
+        self.assertEqual(rows[1]["loan_profile_title"], "Bakery")
+
+    def test_ndjson(self):
+        """Test the ledger is written as one JSON object per line."""
+        content = "".join(export.to_ndjson(export.ledger()))
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["id"] for row in rows], self.ids)
+        self.assertEqual(rows[0]["amount"], "10.00")
+        self.assertEqual(rows[0]["status"], "Completed")
+
+    def test_filters(self):
+        """Test filtering by an inclusive date range and statuses."""
+        ledger = export.ledger(
+            since=date(2024, 1, 2),
+            until=date(2024, 1, 3),
+            statuses=[TransactionStatus.COMPLETED],
+        )
+
+        self.assertEqual([row[0] for row in ledger], [self.ids[2]])
+
+    def test_single_query(self):
+        """Test the export reads lenders and loan profiles in one query."""
+        with self.assertNumQueries(1):
+            content = "".join(export.to_csv(export.ledger(), chunk_size=1))
+
+        self.assertEqual(len(parse_csv(content)), 3)
+
+    def test_without_server_side_cursors(self):
+        """Test the ledger is read by id without server-side cursors."""
+        settings_dict = connection.settings_dict
+        with patch.dict(settings_dict, DISABLE_SERVER_SIDE_CURSORS=True):
+            with self.assertNumQueries(2):
+                content = "".join(
+                    export.to_csv(export.ledger(), chunk_size=2)
+                )
+
+        rows = parse_csv(content)
+        self.assertEqual([int(row["id"]) for row in rows], self.ids)
+
+
+class TransactionExportApiTests(TestCase):
+    """Test the ledger export API."""
+
+    def setUp(self):
+        self.ids = create_ledger()
+        self.client = APIClient()
+
+    def test_admin_required(self):
+        """Test non-staff users cannot export the ledger."""
+        self.client.force_authenticate(
+            get_user_model().objects.get(email="lender@example.com")
+        )
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_streaming_csv(self):
+        """Test admins get a streamed CSV attachment."""
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+
+        res = self.client.get(
+            EXPORT_URL,
+            {"since": "2024-01-02", "status": TransactionStatus.COMPLETED},
+            HTTP_ACCEPT="text/csv",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn("transactions.csv", res["Content-Disposition"])
+        rows = parse_csv(b"".join(res.streaming_content).decode())
+        self.assertEqual([int(row["id"]) for row in rows], [self.ids[2]])
+
+    def test_ndjson_and_invalid_params(self):
+        """Test the NDJSON output and validation of the parameters."""
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+
+        res = self.client.get(EXPORT_URL, {"output": "ndjson"})
+        invalid = self.client.get(EXPORT_URL, {"since": "yesterday"})
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("since", invalid.data)
+
+
+@override_settings(ASYNC_DB_THREADS=2)
+class TransactionExportAsgiTests(TransactionTestCase):
+    """Test streaming the ledger export over ASGI."""
+
+    def tearDown(self):
+        # Pool threads keep their connections, which would keep the test
+        # database from being dropped.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def close():
+            barrier.wait()
+            connections.close_all()
+
+        executor = asyncdb.get_executor()
+        for future in [executor.submit(close) for _ in range(2)]:
+            future.result()
+
+    def test_streaming_over_asgi(self):
+        """Test the export reads the database while it streams."""
+        ids = create_ledger()
+        token = Token.objects.create(
+            user=get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": EXPORT_URL,
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {token.key}".encode()),
+            ],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(ASGIHandler())(scope, receive, send)
+
+        self.assertEqual(messages[0]["status"], status.HTTP_200_OK)
+        body = b"".join(message.get("body", b"") for message in messages)
+        rows = parse_csv(body.decode())
+        self.assertEqual([int(row["id"]) for row in rows], ids)
+        self.assertFalse(messages[-1].get("more_body", False))
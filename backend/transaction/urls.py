@@ -0,0 +1,15 @@
+"""
+URL mappings for the transaction app.
+"""
+
+from django.urls import path
+
+from transaction import views
+
+
+app_name = "transaction"
+
+urlpatterns = [
+    path("bulk/", views.BulkTransactionView.as_view(), name="bulk"),
+    path("export/", views.TransactionExportView.as_view(), name="export"),
+]
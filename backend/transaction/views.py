@@ -0,0 +1,122 @@
+"""
+Views for the transaction app.
+"""
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from rest_framework import authentication, parsers, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.models import Transaction
+from transaction import export
+from transaction.negotiation import IgnoreClientContentNegotiation
+from transaction.parsers import NDJSONParser
+from transaction.serializers import (
+    BulkTransactionSerializer,
+    TransactionExportSerializer,
+)
+from user.authentication import CachedTokenAuthentication
+
+
+class BulkTransactionView(APIView):
+    """
+    Create transactions from a JSON array or NDJSON body. Every item is
+    reported back by its index, with the id of the created transaction,
+    the id of the existing transaction with its idempotency key, or
+    errors.
+    """
+
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAdminUser,)
+    parser_classes = (parsers.JSONParser, NDJSONParser)
+
+    def post(self, request):
+        """Validate and create a batch of transactions."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a list of transactions."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.TRANSACTION_BATCH_MAX_SIZE:
+            return Response(
+                {
+                    "detail": "A batch holds at most "
+                    f"{settings.TRANSACTION_BATCH_MAX_SIZE} transactions."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        valid = {}
+        errors = {}
+        for index, item in enumerate(items):
+            serializer = BulkTransactionSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+
+        indexes = list(valid)
+        (
+            created,
+            existing,
+            rejected,
+        ) = Transaction.objects.bulk_create_transactions(list(valid.values()))
+        for position, item_errors in rejected.items():
+            errors[indexes[position]] = item_errors
+
+        return Response(
+            {
+                "created": [
+                    {"index": indexes[position], "id": transaction.pk}
+                    for position, transaction in created.items()
+                ],
+                "existing": [
+                    {"index": indexes[position], "id": transaction.pk}
+                    for position, transaction in existing.items()
+                ],
+                "errors": [
+                    {"index": index, "errors": errors[index]}
+                    for index in sorted(errors)
+                ],
+            }
+        )
+
+
+class TransactionExportView(APIView):
+    """
+    Stream the transaction ledger as CSV or NDJSON, filtered by the
+    query parameters of TransactionExportSerializer.
+    """
+
+    authentication_classes = (
+        CachedTokenAuthentication,
+        authentication.SessionAuthentication,
+    )
+    permission_classes = (permissions.IsAdminUser,)
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request):
+        """Return a streaming ledger export."""
+        params = TransactionExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = params.validated_data
+        output = options["output"]
+        content_type, write = export.FORMATS[output]
+
+        response = StreamingHttpResponse(
+            write(
+                export.ledger(
+                    since=options.get("since"),
+                    until=options.get("until"),
+                    statuses=options.get("status"),
+                )
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="transactions.{output}"'
+        )
+        return response
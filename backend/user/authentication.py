@@ -0,0 +1,67 @@
+"""
+Token authentication backed by the cache.
+
+DRF's TokenAuthentication loads the token and its user on every
+request. CachedTokenAuthentication keeps the token, with its user, in
+the cache for AUTH_TOKEN_CACHE_TIMEOUT seconds. Entries are keyed by a
+hash of the token, so the cache never holds usable credentials, and
+the receivers in user.signals drop them once a token deletion or user
+change commits. A request that loaded the user just before a change
+committed may cache the old user, which the timeout bounds.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_cache():
+    """Return the cache backend holding authentication tokens."""
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def _token_key(key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"auth:token:{digest}"
+
+
+def _user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_token(key):
+    """Drop a cached token."""
+    get_cache().delete(_token_key(key))
+
+
+def invalidate_user(user_id):
+    """Drop the cached token of a user."""
+    cache = get_cache()
+    token_key = cache.get(_user_key(user_id))
+    if token_key is not None:
+        cache.delete_many([token_key, _user_key(user_id)])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication skipping the database for cached tokens."""
+
+    def authenticate_credentials(self, key):
+        cache = get_cache()
+        token_key = _token_key(key)
+        token = cache.get(token_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            timeout = settings.AUTH_TOKEN_CACHE_TIMEOUT
+            cache.set_many(
+                {token_key: token, _user_key(user.pk): token_key}, timeout
+            )
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        return (token.user, token)
@@ -0,0 +1,18 @@
+"""
+Pagination for the user API.
+"""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ContributionCursorPagination(CursorPagination):
+    """
+    Keyset pagination for a lender's contributions, read newest first
+    from the (user, created_at) index.
+    """
+
+    ordering = "-created_at"
+    page_size = settings.PORTFOLIO_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.PORTFOLIO_MAX_PAGE_SIZE
@@ -6,14 +6,23 @@ from django.contrib.auth import (
     get_user_model,
     authenticate,
 )
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext_lazy as _
+from psycopg2 import errorcodes
 
 from rest_framework import serializers
 
+from core.metrics import TimedSerializerMixin
+from core.models import Transaction
+from geo.fields import CityField, CountryField
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
+    country = CountryField(required=False, allow_null=True)
+    city = CityField(required=False, allow_null=True)
+
     class Meta:
         model = get_user_model()
         fields = (
@@ -34,12 +43,28 @@ class UserSerializer(serializers.ModelSerializer):
     def validate(self, data):
         """Check if city belongs to country."""
         if data.get("city") and data.get("country"):
-            if data["city"].country != data["country"]:
+            if data["city"].country_id != data["country"].pk:
                 raise serializers.ValidationError(
                     _("City must belong to the selected country.")
                 )
         return data
 
+    def save(self, **kwargs):
+        """
+        Save the user, unless its country or city was deleted since it
+        was checked against the geo index of this process.
+        """
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            pgcode = getattr(error.__cause__, "pgcode", None)
+            if pgcode != errorcodes.FOREIGN_KEY_VIOLATION:
+                raise
+            raise serializers.ValidationError(
+                _("The selected country or city no longer exists.")
+            ) from error
+
     def create(self, validated_data):
         """Create a new user with an encrypted password and return it."""
         return get_user_model().objects.create_user(**validated_data)
@@ -56,7 +81,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class AuthTokenSerializer(serializers.Serializer):
+class AuthTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for the user authentication token."""
 
     email = serializers.CharField()
@@ -80,3 +105,43 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class ContributionSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    """Serializer for a transaction in a lender's portfolio."""
+
+    loan_profile_title = serializers.CharField(
+        source="loan_profile.title", read_only=True
+    )
+
+    class Meta:
+        model = Transaction
+        fields = (
+            "id",
+            "loan_profile",
+            "loan_profile_title",
+            "amount",
+            "status",
+            "payment_method",
+            "created_at",
+            "status_changed_at",
+        )
+        read_only_fields = fields
+
+
+class PortfolioStatusSerializer(serializers.Serializer):
+    """Serializer for the transactions of a portfolio with one status."""
+
+    status = serializers.IntegerField()
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+class PortfolioSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for the totals of a lender's portfolio."""
+
+    total_lent = serializers.DecimalField(max_digits=None, decimal_places=2)
+    profiles_funded = serializers.IntegerField()
+    by_status = PortfolioStatusSerializer(many=True)
@@ -0,0 +1,30 @@
+"""
+Signal receivers for the user app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from core.models import User
+from user import authentication
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, using, **kwargs):
+    # The key is the primary key, which is cleared after deletion.
+    key = instance.key
+    transaction.on_commit(
+        lambda: authentication.invalidate_token(key), using=using
+    )
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, using, **kwargs):
+    if created:
+        return
+    transaction.on_commit(
+        lambda: authentication.invalidate_user(instance.pk), using=using
+    )
@@ -0,0 +1,93 @@
+"""
+Tests for cached token authentication.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import UserRole
+from user import authentication
+
+
+ME_URL = reverse("user:me")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating with cached tokens."""
+
+    def setUp(self):
+        authentication.get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cached_token_skips_the_database(self):
+        """Test authenticated requests after the first run no queries."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_invalid_token(self):
+        """Test an unknown token is rejected and not cached."""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(
+            authentication.get_cache().get(
+                authentication._token_key("invalid")
+            )
+        )
+
+    def test_cache_does_not_hold_the_token(self):
+        """Test cache keys are derived from, not made of, the token."""
+        self.client.get(ME_URL)
+
+        self.assertNotIn(
+            self.token.key, authentication._token_key(self.token.key)
+        )
+
+    def test_deleted_token(self):
+        """Test a deleted token stops authenticating once committed."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user(self):
+        """Test a deactivated user stops authenticating once committed."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change(self):
+        """Test requests see a changed role once committed."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = UserRole.LENDER
+            self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["role"], UserRole.LENDER)
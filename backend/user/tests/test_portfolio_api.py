@@ -0,0 +1,125 @@
+"""
+Tests for the lender portfolio API.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    LoanProfile,
+    LoanProfileStatus,
+    Transaction,
+    TransactionStatus,
+    UserRole,
+)
+
+
+PORTFOLIO_URL = reverse("user:portfolio")
+
+
+def create_loan_profile(user, title):
+    """Create and return a loan profile open to contributions."""
+    return LoanProfile.objects.create(
+        user=user,
+        photoURL="www.example.com/photo.jpg",
+        title=title,
+        description="Test description",
+        business_type="Food",
+        total_amount_required=Decimal("1000.00"),
+        deadline_to_receive_loan=date.today() + timedelta(days=30),
+        status=LoanProfileStatus.APPROVED,
+    )
+
+
+class PortfolioApiTests(TestCase):
+    """Test the lender portfolio API."""
+
+    def setUp(self):
+        self.lender = get_user_model().objects.create_user(
+            email="lender@example.com",
+            password="testpass123",
+            role=UserRole.LENDER,
+        )
+        other_lender = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpass123",
+            role=UserRole.LENDER,
+        )
+        borrower = get_user_model().objects.create_user(
+            email="borrower@example.com", password="testpass123"
+        )
+        self.loan_profiles = [
+            create_loan_profile(borrower, f"Profile {n}") for n in range(2)
+        ]
+        for lender, loan_profile, amount, transaction_status in (
+            (self.lender, 0, "10.00", TransactionStatus.COMPLETED),
+            (self.lender, 0, "15.00", TransactionStatus.COMPLETED),
+            (self.lender, 1, "20.00", TransactionStatus.COMPLETED),
+            (self.lender, 1, "5.00", TransactionStatus.PENDING),
+            (other_lender, 1, "100.00", TransactionStatus.COMPLETED),
+        ):
+            Transaction.objects.create_transaction(
+                lender=lender,
+                borrower=self.loan_profiles[loan_profile],
+                amount=Decimal(amount),
+                status=transaction_status,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.lender)
+
+    def test_auth_required(self):
+        """Test the portfolio requires authentication."""
+        res = APIClient().get(PORTFOLIO_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_portfolio_totals(self):
+        """Test the totals only count the user's own contributions."""
+        with self.assertNumQueries(2):
+            res = self.client.get(PORTFOLIO_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total_lent"], "45.00")
+        self.assertEqual(res.data["profiles_funded"], 2)
+        by_status = {row["status"]: row for row in res.data["by_status"]}
+        self.assertEqual(set(by_status), set(TransactionStatus.values))
+        self.assertEqual(by_status[TransactionStatus.COMPLETED]["count"], 3)
+        self.assertEqual(
+            by_status[TransactionStatus.PENDING]["amount"], "5.00"
+        )
+        self.assertEqual(by_status[TransactionStatus.FAILED]["count"], 0)
+
+    def test_portfolio_history_paginated(self):
+        """Test the history is paged newest first."""
+        res = self.client.get(PORTFOLIO_URL, {"page_size": 3})
+        next_page = self.client.get(res.data["next"])
+
+        amounts = [
+            row["amount"]
+            for page in (res, next_page)
+            for row in page.data["results"]
+        ]
+        self.assertEqual(amounts, ["5.00", "20.00", "15.00", "10.00"])
+        self.assertEqual(
+            res.data["results"][0]["loan_profile_title"], "Profile 1"
+        )
+        self.assertIsNone(next_page.data["next"])
+        self.assertEqual(next_page.data["total_lent"], "45.00")
+
+    def test_empty_portfolio(self):
+        """Test a user without contributions gets an empty portfolio."""
+        self.client.force_authenticate(
+            get_user_model().objects.get(email="borrower@example.com")
+        )
+
+        res = self.client.get(PORTFOLIO_URL)
+
+        self.assertEqual(res.data["total_lent"], "0.00")
+        self.assertEqual(res.data["profiles_funded"], 0)
+        self.assertEqual(res.data["results"], [])
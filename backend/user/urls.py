@@ -13,4 +13,7 @@ urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
     path("me/", views.ManageUserView.as_view(), name="me"),
+    path(
+        "me/portfolio/", views.PortfolioView.as_view(), name="portfolio"
+    ),
 ]
@@ -2,13 +2,18 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from core.models import Transaction
+from user.authentication import CachedTokenAuthentication
+from user.pagination import ContributionCursorPagination
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
+    ContributionSerializer,
+    PortfolioSerializer,
 )
 
 
@@ -29,9 +34,46 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
         return self.request.user
+
+
+class PortfolioView(generics.ListAPIView):
+    """
+    Show the totals of the authenticated user's contributions along with
+    a page of their contribution history.
+    """
+
+    serializer_class = ContributionSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = ContributionCursorPagination
+
+    def get_queryset(self):
+        """Return the contributions of the authenticated user."""
+        return (
+            Transaction.objects.filter(user=self.request.user)
+            .select_related("loan_profile")
+            .only(
+                "amount",
+                "status",
+                "payment_method",
+                "created_at",
+                "status_changed_at",
+                "user_id",
+                "loan_profile__title",
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        """Add the portfolio totals to the page of contributions."""
+        response = super().list(request, *args, **kwargs)
+        portfolio = PortfolioSerializer(
+            Transaction.objects.portfolio(request.user)
+        ).data
+        response.data = {**portfolio, **response.data}
+        return response
@@ -2,10 +2,11 @@ import { useQuery } from "@tanstack/react-query";
 import { Box } from "@mui/material";
 import LoanProfileCard from "../../components/LoanProfileCard";
 import LoanProfile from "../../types/LoanProfile";
+import CursorPage from "../../types/CursorPage";
 
 
 function LoanRequests() {
-  const { data, error, isLoading } = useQuery<LoanProfile[]>({
+  const { data, error, isLoading } = useQuery<CursorPage<LoanProfile>>({
     queryKey: ["loan-profiles"],
     queryFn: async () => {
       const response = await fetch("api/loanprofile/");
@@ -22,7 +23,7 @@ function LoanRequests() {
     <p>Error: {error.message}</p>
   ) : (
     <Box sx={{ display: "flex", gap: 2, flexDirection: "column" }}>
-      {data?.map((loanProfile) => (
+      {data?.results.map((loanProfile) => (
         <LoanProfileCard key={loanProfile.id} loanProfile={loanProfile} />
       ))}
     </Box>
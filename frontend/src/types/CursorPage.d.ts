@@ -0,0 +1,5 @@
+export default interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}